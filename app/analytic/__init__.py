@@ -1,15 +1,49 @@
 from .candle_analyzer import CandleAnalyzer
-from .orderbook_analyzer import OrderBookAnalyzer
-from .volume_analyzer import VolumeAnalyzer
+from .orderbook_analyzer import OrderBookAnalyzer, BookLevels
+from .volume_analyzer import VolumeAnalyzer, TradeTape
 from .derivatives_analyzer import DerivativesAnalyzer
 from .correlation_analyzer import CorrelationAnalyzer
 from .report_builder import ReportBuilder
+from .indicator_engine import IndicatorEngine, IndicatorValues
+from .indicator_frame import IndicatorFrame
+from .batch_indicators import BatchIndicators, compute_batch_indicators
+from .screener import MarketScreener, SCREEN_FILTERS
+from .correlation_matrix import CorrelationMatrix, CorrelationSnapshot
+from .peer_analyzer import PeerAnalyzer
+from .alerts import AlertBook, AlertCondition, MarketState
+from .trade_flow import TradeFlow, TradeRing
+from .timeframes import TimeframeMatrix, resample_candles
+from .backtest import BacktestAnalyzer, BacktestStats, SIGNAL_KINDS, expand_grid, sweep
 
 __all__ = (
     "CandleAnalyzer",
     "OrderBookAnalyzer",
+    "BookLevels",
     "VolumeAnalyzer",
+    "TradeTape",
     "DerivativesAnalyzer",
     "CorrelationAnalyzer",
     "ReportBuilder",
+    "IndicatorEngine",
+    "IndicatorValues",
+    "IndicatorFrame",
+    "BatchIndicators",
+    "compute_batch_indicators",
+    "MarketScreener",
+    "SCREEN_FILTERS",
+    "CorrelationMatrix",
+    "CorrelationSnapshot",
+    "PeerAnalyzer",
+    "AlertBook",
+    "AlertCondition",
+    "MarketState",
+    "TradeFlow",
+    "TradeRing",
+    "TimeframeMatrix",
+    "resample_candles",
+    "BacktestAnalyzer",
+    "BacktestStats",
+    "SIGNAL_KINDS",
+    "expand_grid",
+    "sweep",
 )
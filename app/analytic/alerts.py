@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+ALERT_KINDS = {
+    "rsi_above": "RSI пересёк уровень снизу вверх",
+    "rsi_below": "RSI пересёк уровень сверху вниз",
+    "trend": "смена тренда (цена / MA50 / MA200)",
+    "imbalance": "дисбаланс стакана (top20) по модулю выше порога, %",
+    "funding": "funding rate по модулю выше порога, %",
+}
+
+DEFAULT_THRESHOLDS = {
+    "rsi_above": 70.0,
+    "rsi_below": 30.0,
+    "trend": 0.0,
+    "imbalance": 30.0,
+    "funding": 0.05,
+}
+
+# Thresholds outside these bounds (exclusive) can never fire; RSI lives in
+# 0..100 and the book imbalance is a share of top-20 volume.
+THRESHOLD_RANGES = {
+    "rsi_above": (0.0, 100.0),
+    "rsi_below": (0.0, 100.0),
+    "imbalance": (0.0, 100.0),
+    "funding": (0.0, math.inf),
+}
+
+TREND_TITLES = {
+    "bullish": "бычий",
+    "bearish": "медвежий",
+    "sideways": "боковик",
+    "unknown": "не определён",
+}
+
+# Conditions that need market data beyond the candles.
+BOOK_KINDS = {"imbalance"}
+FUNDING_KINDS = {"funding"}
+
+
+@dataclass(frozen=True)
+class MarketState:
+    # Values at the close of one candle; book and funding are sampled then too.
+    close: float
+    rsi14: float
+    trend: str
+    imbalance: Optional[float] = None
+    funding: Optional[float] = None
+
+
+def _beyond(value: Optional[float], threshold: float) -> Optional[bool]:
+    if value is None or math.isnan(value):
+        return None
+    return abs(value) >= threshold
+
+
+@dataclass(frozen=True)
+class AlertCondition:
+    kind: str
+    threshold: float
+
+    def describe(self) -> str:
+        if self.kind == "trend":
+            return "смена тренда"
+        if self.kind in ("rsi_above", "rsi_below"):
+            arrow = "↑" if self.kind == "rsi_above" else "↓"
+            return f"RSI {arrow} {self.threshold:g}"
+        name = "дисбаланс стакана" if self.kind == "imbalance" else "funding"
+        return f"{name} от {self.threshold:g}%"
+
+    def triggered(self, prev: MarketState, cur: MarketState) -> bool:
+        # Edge-triggered: fires on the candle where the condition starts to
+        # hold, so a chat is not notified again while it persists.
+        if self.kind == "rsi_above":
+            return prev.rsi14 <= self.threshold < cur.rsi14
+        if self.kind == "rsi_below":
+            return prev.rsi14 >= self.threshold > cur.rsi14
+        if self.kind == "trend":
+            return cur.trend != prev.trend and "unknown" not in (cur.trend, prev.trend)
+
+        if self.kind == "imbalance":
+            before, after = prev.imbalance, cur.imbalance
+        else:
+            before, after = prev.funding, cur.funding
+        was = _beyond(before, self.threshold / 100)
+        return _beyond(after, self.threshold / 100) is True and was is False
+
+    def message(self, cur: MarketState) -> str:
+        if self.kind == "trend":
+            return f"тренд сменился на {TREND_TITLES.get(cur.trend, cur.trend)}"
+        if self.kind in ("rsi_above", "rsi_below"):
+            return f"{self.describe()} (RSI {cur.rsi14:.1f})"
+        value = cur.imbalance if self.kind == "imbalance" else cur.funding
+        precision = ".1%" if self.kind == "imbalance" else ".4%"
+        return f"{self.describe()} (сейчас {value:{precision}})"
+
+
+AlertKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class Subscription:
+    alert_id: int
+    chat_id: int
+    symbol: str
+    interval: str
+    condition: AlertCondition
+
+
+class AlertBook:
+    # Subscriptions grouped by (symbol, interval) and then by condition, so
+    # every distinct condition is checked once per candle whatever the
+    # number of chats behind it.
+    def __init__(self):
+        self._by_key: Dict[AlertKey, Dict[AlertCondition, Set[int]]] = {}
+        self._by_id: Dict[int, Subscription] = {}
+        self._by_chat: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, sub: Subscription) -> None:
+        self._by_id[sub.alert_id] = sub
+        self._by_chat.setdefault(sub.chat_id, []).append(sub.alert_id)
+        conditions = self._by_key.setdefault((sub.symbol, sub.interval), {})
+        conditions.setdefault(sub.condition, set()).add(sub.chat_id)
+
+    def remove(self, alert_id: int) -> Optional[Subscription]:
+        sub = self._by_id.pop(alert_id, None)
+        if sub is None:
+            return None
+
+        ids = self._by_chat[sub.chat_id]
+        ids.remove(alert_id)
+        if not ids:
+            del self._by_chat[sub.chat_id]
+
+        key = (sub.symbol, sub.interval)
+        chats = self._by_key[key][sub.condition]
+        # Another subscription of the same chat may share the condition.
+        if not any(
+            self._by_id[i].condition == sub.condition and (self._by_id[i].symbol, self._by_id[i].interval) == key
+            for i in self._by_chat.get(sub.chat_id, ())
+        ):
+            chats.discard(sub.chat_id)
+        if not chats:
+            del self._by_key[key][sub.condition]
+            if not self._by_key[key]:
+                del self._by_key[key]
+        return sub
+
+    def for_chat(self, chat_id: int) -> List[Subscription]:
+        return [self._by_id[i] for i in self._by_chat.get(chat_id, ())]
+
+    def keys(self) -> List[AlertKey]:
+        return list(self._by_key)
+
+    def intervals(self) -> Set[str]:
+        return {interval for _, interval in self._by_key}
+
+    def symbols(self, interval: str, kinds: Optional[Iterable[str]] = None) -> List[str]:
+        kinds = set(kinds) if kinds is not None else None
+        return sorted(
+            symbol for (symbol, key_interval), conditions in self._by_key.items()
+            if key_interval == interval and (kinds is None or any(c.kind in kinds for c in conditions))
+        )
+
+    def evaluate(
+        self, symbol: str, interval: str, prev: MarketState, cur: MarketState
+    ) -> Dict[int, List[AlertCondition]]:
+        matched: Dict[int, List[AlertCondition]] = {}
+        for condition, chats in self._by_key.get((symbol, interval), {}).items():
+            if condition.triggered(prev, cur):
+                for chat_id in chats:
+                    matched.setdefault(chat_id, []).append(condition)
+        return matched
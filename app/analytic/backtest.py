@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .base import BaseAnalyzer, AnalysisResult
+from .indicator_frame import IndicatorFrame
+
+SIGNAL_KINDS = {
+    "trend": "тренд: цена / быстрая MA / медленная MA",
+    "rsi": "RSI: перепроданность — покупка, перекупленность — продажа",
+    "macd": "MACD относительно сигнальной линии",
+}
+
+# The readings CandleAnalyzer reports today.
+DEFAULT_PARAMS: Dict[str, Dict[str, int]] = {
+    "trend": {"fast": 50, "slow": 200},
+    "rsi": {"period": 14, "lower": 30, "upper": 70},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+}
+
+PARAM_GRIDS: Dict[str, Dict[str, Sequence[int]]] = {
+    "trend": {"fast": (10, 20, 30, 50, 75, 100), "slow": (100, 150, 200, 250, 300)},
+    "rsi": {"period": (7, 14, 21), "lower": (20, 25, 30, 35), "upper": (65, 70, 75, 80)},
+    "macd": {"fast": (8, 12, 16), "slow": (21, 26, 34), "signal": (5, 9, 12)},
+}
+
+# Forward return horizons, in candles.
+HORIZONS = (1, 4, 12, 24)
+# Combinations with fewer signals are not ranked.
+MIN_SIGNALS = 30
+
+
+@dataclass
+class BacktestStats:
+    params: Dict[str, int]
+    horizon: int
+    signals: int
+    hit_rate: float
+    avg_return: float
+    # Holding the signal's side candle by candle, flat on no signal.
+    total_return: float
+    max_drawdown: float
+    exposure: float
+
+
+def expand_grid(kind: str, grid: Optional[Dict[str, Sequence[int]]] = None) -> List[Dict[str, int]]:
+    grid = grid or PARAM_GRIDS[kind]
+    combos = [dict(zip(grid, values)) for values in product(*grid.values())]
+    if kind == "rsi":
+        return [c for c in combos if c["lower"] < c["upper"]]
+    return [c for c in combos if c["fast"] < c["slow"]]
+
+
+def signal(frame: IndicatorFrame, kind: str, params: Dict[str, int]) -> np.ndarray:
+    # +1 bullish, -1 bearish, 0 neutral; the same readings as CandleAnalyzer
+    # (classify_trend, _interpret_rsi, _interpret_macd) on every candle.
+    if kind == "trend":
+        close = frame["close"].to_numpy()
+        fast = frame[f"ma{params['fast']}"].to_numpy()
+        slow = frame[f"ma{params['slow']}"].to_numpy()
+        bull = (close > fast) & (fast > slow)
+        bear = (close < fast) & (fast < slow)
+    elif kind == "rsi":
+        rsi = frame[f"rsi{params['period']}"].to_numpy()
+        bull = rsi < params["lower"]
+        bear = rsi > params["upper"]
+    elif kind == "macd":
+        macd = frame[f"macd_{params['fast']}_{params['slow']}"].to_numpy()
+        line = frame[f"macd_signal_{params['fast']}_{params['slow']}_{params['signal']}"].to_numpy()
+        hist = macd - line
+        bull = (hist > 0) & (macd > line)
+        bear = (hist < 0) & (macd < line)
+    else:
+        raise ValueError(f"Unknown signal: {kind}")
+    return bull.astype(np.int8) - bear.astype(np.int8)
+
+
+def _forward_returns(close: np.ndarray, horizon: int) -> np.ndarray:
+    out = np.full(len(close), np.nan)
+    if horizon < len(close):
+        out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def sweep(
+    close: np.ndarray, kind: str, combos: List[Dict[str, int]], horizons: Sequence[int] = HORIZONS
+) -> List[BacktestStats]:
+    # One row of signals per combination; every metric is then a reduction
+    # over the (combos, candles) matrix. Indicators shared by several
+    # combinations are computed once by the frame.
+    frame = IndicatorFrame(pd.DataFrame({"close": close}))
+    signals = np.stack([signal(frame, kind, params) for params in combos])
+
+    # A signal on candle t is acted on from its close to the next one.
+    bar_returns = close[1:] / close[:-1] - 1
+    # A short can lose more than everything in one candle; stop at zero.
+    pnl = np.maximum(signals[:, :-1] * bar_returns, -1 + 1e-12)
+    equity = np.cumsum(np.log1p(pnl), axis=1)
+    drawdown = np.expm1((equity - np.maximum.accumulate(equity, axis=1)).min(axis=1, initial=0.0))
+    total = np.expm1(equity[:, -1]) if equity.shape[1] else np.zeros(len(combos))
+    exposure = (signals != 0).mean(axis=1)
+
+    stats: List[BacktestStats] = []
+    per_horizon = []
+    for horizon in horizons:
+        fwd = _forward_returns(close, horizon)
+        active = (signals != 0) & ~np.isnan(fwd)
+        count = active.sum(axis=1)
+        hits = ((np.sign(fwd) == signals) & active).sum(axis=1)
+        moved = np.where(active, signals * np.nan_to_num(fwd), 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            per_horizon.append((horizon, count, hits / count, moved / count))
+
+    for i, params in enumerate(combos):
+        for horizon, count, hit_rate, avg_return in per_horizon:
+            stats.append(BacktestStats(
+                params=params,
+                horizon=horizon,
+                signals=int(count[i]),
+                hit_rate=float(hit_rate[i]),
+                avg_return=float(avg_return[i]),
+                total_return=float(total[i]),
+                max_drawdown=float(drawdown[i]),
+                exposure=float(exposure[i]),
+            ))
+    return stats
+
+
+def _describe_params(kind: str, params: Dict[str, int]) -> str:
+    if kind == "trend":
+        return f"MA{params['fast']}/MA{params['slow']}"
+    if kind == "rsi":
+        return f"RSI{params['period']} {params['lower']}/{params['upper']}"
+    return f"MACD {params['fast']}/{params['slow']}/{params['signal']}"
+
+
+def _pct(value: float) -> str:
+    return "—" if np.isnan(value) else f"{value * 100:+.2f}%"
+
+
+def _rate(value: float) -> str:
+    return "—" if np.isnan(value) else f"{value:.1%}"
+
+
+class BacktestAnalyzer(BaseAnalyzer):
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        kind: str,
+        stats: List[BacktestStats],
+        index: pd.DatetimeIndex,
+        top: int = 5,
+    ):
+        super().__init__(symbol)
+        self.interval = interval
+        self.kind = kind
+        self.stats = stats
+        self.index = index
+        self.top = top
+
+    def analyze(self) -> AnalysisResult:
+        if not self.stats or not len(self.index):
+            return AnalysisResult(summary=f"Бэктест {self.symbol}: данных нет.", data={})
+
+        default = DEFAULT_PARAMS[self.kind]
+        current = [s for s in self.stats if s.params == default]
+        combos = len({tuple(s.params.items()) for s in self.stats})
+        lines = [
+            f"Бэктест {self.symbol} (TF {self.interval}, свечей: {len(self.index)})",
+            f"Период: {self.index[0].strftime('%Y-%m-%d')} → {self.index[-1].strftime('%Y-%m-%d')}",
+            f"Сигнал: {SIGNAL_KINDS[self.kind]}",
+            "",
+        ]
+
+        if current:
+            lines.append(f"<b>Текущие настройки ({_describe_params(self.kind, default)})</b>")
+            lines.extend(
+                f"• через {s.horizon} св.: сигналов {s.signals}, попаданий {_rate(s.hit_rate)}, "
+                f"средний ход {_pct(s.avg_return)}"
+                for s in current
+            )
+            s = current[0]
+            lines.append(
+                f"• по сигналу: доходность {_pct(s.total_return)}, макс. просадка {_pct(s.max_drawdown)}, "
+                f"в позиции {s.exposure:.0%} времени"
+            )
+            lines.append("")
+
+        horizon = max(s.horizon for s in self.stats)
+        ranked = sorted(
+            (s for s in self.stats if s.horizon == horizon and s.signals >= MIN_SIGNALS),
+            key=lambda s: s.avg_return,
+            reverse=True,
+        )[:self.top]
+        lines.append(f"<b>Лучшие из {combos} комбинаций</b> (средний ход через {horizon} св.)")
+        if not ranked:
+            lines.append("Недостаточно сигналов для сравнения.")
+        lines.extend(
+            f"{n}. {_describe_params(self.kind, s.params)}: ход {_pct(s.avg_return)}, "
+            f"попаданий {_rate(s.hit_rate)}, просадка {_pct(s.max_drawdown)}"
+            for n, s in enumerate(ranked, start=1)
+        )
+        lines.append("")
+        lines.append("Прошлые результаты не гарантируют будущих.")
+
+        data: Dict[str, Any] = {
+            "combos": combos,
+            "current": [vars(s) for s in current],
+            "best": [vars(s) for s in ranked],
+        }
+        return AnalysisResult(summary="\n".join(lines), data=data)
@@ -1,8 +1,31 @@
+import time
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
 import pandas as pd
 
+# Called with (analyzer class name, seconds) after every analyze().
+_analyze_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_analyze_observer(observer: Optional[Callable[[str, float], None]]) -> None:
+    global _analyze_observer
+    _analyze_observer = observer
+
+
+def _timed(analyze: Callable[..., "AnalysisResult"]) -> Callable[..., "AnalysisResult"]:
+    @wraps(analyze)
+    def wrapper(self, *args: Any, **kwargs: Any) -> "AnalysisResult":
+        if _analyze_observer is None:
+            return analyze(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return analyze(self, *args, **kwargs)
+        finally:
+            _analyze_observer(type(self).__name__, time.perf_counter() - started)
+    return wrapper
+
 
 @dataclass
 class AnalysisResult:
@@ -13,6 +36,11 @@ class BaseAnalyzer(ABC):
     def __init__(self, symbol: str):
         self.symbol = symbol
 
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        if "analyze" in cls.__dict__:
+            cls.analyze = _timed(cls.analyze)
+
     @abstractmethod
     def analyze(self) -> AnalysisResult:
         ...
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+NAN = float("nan")
+
+
+@dataclass(frozen=True)
+class BatchIndicators:
+    close: np.ndarray
+    ma20: np.ndarray
+    ma50: np.ndarray
+    ma200: np.ndarray
+    rsi14: np.ndarray
+    macd: np.ndarray
+    macd_signal: np.ndarray
+    macd_hist: np.ndarray
+    macd_hist_prev: np.ndarray
+    atr14: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+def _tail_mean(values: np.ndarray, window: int, lengths: np.ndarray) -> np.ndarray:
+    if values.shape[1] < window:
+        return np.full(values.shape[0], NAN)
+    out = values[:, -window:].mean(axis=1)
+    out[lengths < window] = NAN
+    return out
+
+
+def _ema_step(prev: np.ndarray, x: np.ndarray, alpha: float) -> np.ndarray:
+    # Series are right-aligned; the EMA starts at each row's first valid value.
+    return np.where(np.isnan(prev), x, alpha * x + (1 - alpha) * prev)
+
+
+def compute_batch_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> BatchIndicators:
+    # Inputs are (symbols x time), right-aligned on the latest candle and
+    # NaN-padded on the left for symbols with shorter history.
+    n_symbols, n_bars = close.shape
+    lengths = np.count_nonzero(~np.isnan(close), axis=1)
+    last_close = close[:, -1] if n_bars else np.full(n_symbols, NAN)
+
+    prev_close = np.empty_like(close)
+    prev_close[:, :1] = NAN
+    prev_close[:, 1:] = close[:, :-1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = close - prev_close
+        gain = _tail_mean(np.where(delta > 0, delta, 0.0), 14, lengths)
+        loss = _tail_mean(np.where(delta < 0, -delta, 0.0), 14, lengths)
+        rsi = 100 - (100 / (1 + gain / loss))
+
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        atr = _tail_mean(tr, 14, lengths)
+
+    ema12 = np.full(n_symbols, NAN)
+    ema26 = np.full(n_symbols, NAN)
+    signal = np.full(n_symbols, NAN)
+    macd = np.full(n_symbols, NAN)
+    hist = np.full(n_symbols, NAN)
+    hist_prev = hist
+    for t in range(n_bars):
+        x = close[:, t]
+        ema12 = _ema_step(ema12, x, 2.0 / 13)
+        ema26 = _ema_step(ema26, x, 2.0 / 27)
+        macd = ema12 - ema26
+        signal = _ema_step(signal, macd, 2.0 / 10)
+        hist_prev, hist = hist, macd - signal
+
+    return BatchIndicators(
+        close=last_close,
+        ma20=_tail_mean(close, 20, lengths),
+        ma50=_tail_mean(close, 50, lengths),
+        ma200=_tail_mean(close, 200, lengths),
+        rsi14=rsi,
+        macd=macd,
+        macd_signal=signal,
+        macd_hist=hist,
+        macd_hist_prev=hist_prev,
+        atr14=atr,
+    )
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 
 import numpy as np
 import pandas as pd
 
 from .base import BaseAnalyzer, AnalysisResult
+from .indicator_engine import IndicatorValues
+from .indicator_frame import IndicatorFrame
 
 
 @dataclass
@@ -30,45 +32,50 @@ class VolatilityInfo:
     description: str
 
 
-class CandleAnalyzer(BaseAnalyzer):
-    def __init__(self, symbol: str, df: pd.DataFrame, interval: str):
-        super().__init__(symbol)
-        self.df = df.copy()
-        self.interval = interval
-        self._ensure_sorted()
-        self._add_indicators()
-
-    def _ensure_sorted(self) -> None:
-        self.df = self.df.sort_index()
-
-    def _add_indicators(self) -> None:
-        close = self.df["close"]
+INDICATOR_COLUMNS = ("ma20", "ma50", "ma200", "rsi14", "macd", "macd_signal", "macd_hist", "atr14")
 
-        self.df["ma20"] = close.rolling(window=20).mean()
-        self.df["ma50"] = close.rolling(window=50).mean()
-        self.df["ma200"] = close.rolling(window=200).mean()
+TREND_DESCRIPTIONS = {
+    "unknown": "Недостаточно данных для оценки долгосрочного тренда (MA50/MA200).",
+    "bullish": "Цена выше MA50, а MA50 выше MA200 — преобладает среднесрочный бычий тренд.",
+    "bearish": "Цена ниже MA50, а MA50 ниже MA200 — преобладает среднесрочный медвежий тренд.",
+    "sideways": "Цена и скользящие средние переплетены — вероятен боковик или фаза смены тренда.",
+}
 
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        self.df["rsi14"] = 100 - (100 / (1 + rs))
 
-        ema12 = close.ewm(span=12, adjust=False).mean()
-        ema26 = close.ewm(span=26, adjust=False).mean()
-        self.df["macd"] = ema12 - ema26
-        self.df["macd_signal"] = self.df["macd"].ewm(span=9, adjust=False).mean()
-        self.df["macd_hist"] = self.df["macd"] - self.df["macd_signal"]
+def classify_trend(close: float, ma50: float, ma200: float) -> str:
+    if pd.isna(ma50) or pd.isna(ma200):
+        return "unknown"
+    if close > ma50 > ma200:
+        return "bullish"
+    if close < ma50 < ma200:
+        return "bearish"
+    return "sideways"
 
-        high = self.df["high"]
-        low = self.df["low"]
-        prev_close = close.shift(1)
 
-        tr1 = high - low
-        tr2 = (high - prev_close).abs()
-        tr3 = (low - prev_close).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        self.df["atr14"] = tr.rolling(window=14).mean()
+class CandleAnalyzer(BaseAnalyzer):
+    def __init__(
+        self,
+        symbol: str,
+        df: Union[pd.DataFrame, IndicatorFrame],
+        interval: str,
+        indicators: Optional[IndicatorValues] = None,
+    ):
+        super().__init__(symbol)
+        self.interval = interval
+        self.indicators = indicators
+        # Frame comes sorted from the kline store; with indicator values from
+        # the streaming engine no column is computed here at all.
+        self.frame = IndicatorFrame.wrap(df)
+        self.df = self.frame.df
+
+    def _latest(self, *names: str) -> Dict[str, float]:
+        names = names or INDICATOR_COLUMNS
+        if self.indicators is not None:
+            values = {name: getattr(self.indicators, name) for name in names}
+        else:
+            values = {name: self.frame.last(name) for name in names}
+        values["close"] = self.df["close"].iloc[-1]
+        return values
 
     def get_levels(self, lookback: int = 50) -> Optional[TechnicalLevels]:
         if len(self.df) < lookback:
@@ -88,37 +95,12 @@ class CandleAnalyzer(BaseAnalyzer):
         )
 
     def get_trend(self) -> TrendInfo:
-        last = self.df.iloc[-1]
-        close = last["close"]
-        ma50 = last["ma50"]
-        ma200 = last["ma200"]
-
-        if pd.isna(ma50) or pd.isna(ma200):
-            return TrendInfo(
-                trend="unknown",
-                description="Недостаточно данных для оценки долгосрочного тренда (MA50/MA200).",
-            )
-
-        if close > ma50 > ma200:
-            trend = "bullish"
-            desc = (
-                "Цена выше MA50, а MA50 выше MA200 — преобладает среднесрочный бычий тренд."
-            )
-        elif close < ma50 < ma200:
-            trend = "bearish"
-            desc = (
-                "Цена ниже MA50, а MA50 ниже MA200 — преобладает среднесрочный медвежий тренд."
-            )
-        else:
-            trend = "sideways"
-            desc = (
-                "Цена и скользящие средние переплетены — вероятен боковик или фаза смены тренда."
-            )
-
-        return TrendInfo(trend=trend, description=desc)
+        last = self._latest("ma50", "ma200")
+        trend = classify_trend(last["close"], last["ma50"], last["ma200"])
+        return TrendInfo(trend=trend, description=TREND_DESCRIPTIONS[trend])
 
     def get_volatility(self) -> VolatilityInfo:
-        last = self.df.iloc[-1]
+        last = self._latest("atr14")
         close = last["close"]
         atr = last["atr14"]
 
@@ -168,7 +150,7 @@ class CandleAnalyzer(BaseAnalyzer):
                 data={},
             )
 
-        last = self.df.iloc[-1]
+        last = self._latest()
         start_time = self.df.index[0]
         end_time = self.df.index[-1]
         candles_count = len(self.df)
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
 import pandas as pd
 import numpy as np
 
 from .base import BaseAnalyzer, AnalysisResult
+from .indicator_frame import IndicatorFrame
 
 
 class CorrelationAnalyzer(BaseAnalyzer):
@@ -13,21 +14,18 @@ class CorrelationAnalyzer(BaseAnalyzer):
     def __init__(
         self,
         symbol: str,
-        main_df: pd.DataFrame,
+        main_df: Union[pd.DataFrame, IndicatorFrame],
         bench_dfs: Dict[str, pd.DataFrame],
         window: int = 100,
         interval: str = "1h",
     ):
         super().__init__(symbol)
-        self.main_df = main_df.copy()
-        self.bench_dfs = bench_dfs
+        # Shares the candles (and any computed columns) with CandleAnalyzer.
+        self.main_df = IndicatorFrame.wrap(main_df).df
+        self.bench_dfs = {k: IndicatorFrame.wrap(df).df for k, df in bench_dfs.items()}
         self.window = window
         self.interval = interval
 
-        self.main_df = self.main_df.sort_index()
-        for k in list(self.bench_dfs.keys()):
-            self.bench_dfs[k] = self.bench_dfs[k].sort_index()
-
     def analyze(self) -> AnalysisResult:
         if self.main_df.empty:
             return AnalysisResult(
@@ -61,6 +59,9 @@ class CorrelationAnalyzer(BaseAnalyzer):
         corr_data: Dict[str, float] = {}
 
         for name, df in self.bench_dfs.items():
+            if name == self.symbol:
+                # Correlation with itself is 1 and the shared name breaks the join.
+                continue
             if "close" not in df.columns:
                 lines.append(f"- {name}: нет колонки 'close', пропускаю.")
                 continue
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CorrelationSnapshot:
+    symbols: List[str]
+    corr: np.ndarray
+    window: int
+
+    def index(self, symbol: str) -> Optional[int]:
+        try:
+            return self.symbols.index(symbol)
+        except ValueError:
+            return None
+
+    def peers(self, symbol: str, n: int = 5) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
+        i = self.index(symbol)
+        if i is None:
+            return [], []
+
+        row = self.corr[i]
+        others = np.flatnonzero(~np.isnan(row))
+        others = others[others != i]
+        ordered = others[np.argsort(-row[others], kind="stable")]
+
+        top = [(self.symbols[j], float(row[j])) for j in ordered[:n] if row[j] > 0]
+        anti = [(self.symbols[j], float(row[j])) for j in ordered[::-1][:n] if row[j] < 0]
+        return top, anti
+
+    def clusters(self, threshold: float = 0.8) -> List[List[str]]:
+        # Connected components of the "corr >= threshold" graph.
+        parent = list(range(len(self.symbols)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        with np.errstate(invalid="ignore"):
+            pairs = np.argwhere(np.triu(self.corr >= threshold, k=1))
+        for i, j in pairs:
+            ri, rj = find(int(i)), find(int(j))
+            if ri != rj:
+                parent[rj] = ri
+
+        groups: Dict[int, List[str]] = {}
+        for i, symbol in enumerate(self.symbols):
+            groups.setdefault(find(i), []).append(symbol)
+        clusters = [members for members in groups.values() if len(members) > 1]
+        clusters.sort(key=len, reverse=True)
+        return clusters
+
+
+class CorrelationMatrix:
+    def __init__(self, symbols: Sequence[str], closes: np.ndarray):
+        # closes is (symbols x window + 1) without gaps; the matrix is over
+        # the window of simple returns, like pct_change in CorrelationAnalyzer.
+        if closes.shape[1] < 3:
+            raise ValueError("At least three closes are required")
+        self.symbols = list(symbols)
+        self.window = closes.shape[1] - 1
+        self._returns = np.ascontiguousarray((closes[:, 1:] / closes[:, :-1] - 1).T)
+        self._head = 0
+        self._prev_close = closes[:, -2].copy()
+        self._last_close = closes[:, -1].copy()
+        self._updates = 0
+        self._corr: Optional[np.ndarray] = None
+        self._recompute()
+
+    def _recompute(self) -> None:
+        self._sum = self._returns.sum(axis=0)
+        self._cross = self._returns.T @ self._returns
+
+    def _replace(self, slot: int, new: np.ndarray) -> None:
+        old = self._returns[slot]
+        self._sum += new - old
+        self._cross += np.outer(new, new) - np.outer(old, old)
+        self._returns[slot] = new
+        self._corr = None
+
+        # Rebuilding the sums once per window keeps float drift bounded.
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._recompute()
+
+    def push(self, close: np.ndarray) -> None:
+        self._replace(self._head, close / self._last_close - 1)
+        self._head = (self._head + 1) % self.window
+        self._prev_close, self._last_close = self._last_close, close.copy()
+
+    def revise(self, close: np.ndarray) -> None:
+        self._replace((self._head - 1) % self.window, close / self._prev_close - 1)
+        self._last_close = close.copy()
+
+    def matrix(self) -> np.ndarray:
+        if self._corr is None:
+            cov = self._cross - np.outer(self._sum, self._sum) / self.window
+            std = np.sqrt(np.clip(np.diag(cov), 0, None))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                corr = cov / np.outer(std, std)
+            corr[:, std == 0] = np.nan
+            corr[std == 0, :] = np.nan
+            np.clip(corr, -1.0, 1.0, out=corr)
+            self._corr = corr
+        return self._corr
+
+    def snapshot(self) -> CorrelationSnapshot:
+        return CorrelationSnapshot(self.symbols, self.matrix().copy(), self.window)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+import pandas as pd
+
+NAN = float("nan")
+
+
+@dataclass(frozen=True)
+class IndicatorValues:
+    ma20: float
+    ma50: float
+    ma200: float
+    rsi14: float
+    macd: float
+    macd_signal: float
+    macd_hist: float
+    atr14: float
+
+
+class _RollingMean:
+    def __init__(self, window: int):
+        self.window = window
+        self._values: Deque[float] = deque()
+        self._sum = 0.0
+        self._commits = 0
+
+    def peek(self, x: float) -> float:
+        if len(self._values) < self.window - 1:
+            return NAN
+        return (self._sum + x) / self.window
+
+    def commit(self, x: float) -> None:
+        self._values.append(x)
+        self._sum += x
+        if len(self._values) > self.window - 1:
+            self._sum -= self._values.popleft()
+
+        # Re-summing once per window keeps float drift bounded at O(1) amortized.
+        self._commits += 1
+        if self._commits % max(self.window, 64) == 0:
+            self._sum = math.fsum(self._values)
+
+
+class _Ema:
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self._prev: Optional[float] = None
+
+    def peek(self, x: float) -> float:
+        if self._prev is None:
+            return x
+        return self.alpha * x + (1 - self.alpha) * self._prev
+
+    def commit(self, x: float) -> None:
+        self._prev = self.peek(x)
+
+
+class IndicatorEngine:
+    # Follows one candle series: append() commits the previous bar and opens
+    # a new one, revise() replaces the open bar, each in O(1). Rolling values
+    # equal a batch pass over any window at least as long as theirs; EMAs
+    # carry every bar appended since the engine was seeded.
+    def __init__(self):
+        self._ma = {w: _RollingMean(w) for w in (20, 50, 200)}
+        self._gain = _RollingMean(14)
+        self._loss = _RollingMean(14)
+        self._tr = _RollingMean(14)
+        self._ema12 = _Ema(12)
+        self._ema26 = _Ema(26)
+        self._signal = _Ema(9)
+        self._prev_close: Optional[float] = None
+        self._tip: Optional[tuple] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IndicatorEngine":
+        engine = cls()
+        for high, low, close in zip(df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy()):
+            engine.append(float(high), float(low), float(close))
+        return engine
+
+    def append(self, high: float, low: float, close: float) -> None:
+        if self._tip is not None:
+            self._commit(*self._tip)
+        self._tip = (high, low, close)
+
+    def revise(self, high: float, low: float, close: float) -> None:
+        if self._tip is None:
+            self.append(high, low, close)
+        else:
+            self._tip = (high, low, close)
+
+    def _inputs(self, high: float, low: float, close: float) -> tuple:
+        if self._prev_close is None:
+            return 0.0, 0.0, high - low
+
+        delta = close - self._prev_close
+        tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        return max(delta, 0.0), max(-delta, 0.0), tr
+
+    def _commit(self, high: float, low: float, close: float) -> None:
+        gain, loss, tr = self._inputs(high, low, close)
+        macd = self._ema12.peek(close) - self._ema26.peek(close)
+
+        for ma in self._ma.values():
+            ma.commit(close)
+        self._gain.commit(gain)
+        self._loss.commit(loss)
+        self._tr.commit(tr)
+        self._ema12.commit(close)
+        self._ema26.commit(close)
+        self._signal.commit(macd)
+        self._prev_close = close
+
+    def _ma_value(self, window: int, close: float, max_bars: Optional[int]) -> float:
+        if max_bars is not None and window > max_bars:
+            return NAN
+        return self._ma[window].peek(close)
+
+    def latest(self, max_bars: Optional[int] = None) -> Optional[IndicatorValues]:
+        # max_bars hides averages longer than the window a report shows.
+        if self._tip is None:
+            return None
+
+        high, low, close = self._tip
+        gain, loss, tr = self._inputs(high, low, close)
+
+        avg_gain = self._gain.peek(gain)
+        avg_loss = self._loss.peek(loss)
+        if avg_loss == 0:
+            rsi = NAN if avg_gain == 0 else 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        macd = self._ema12.peek(close) - self._ema26.peek(close)
+        signal = self._signal.peek(macd)
+
+        return IndicatorValues(
+            ma20=self._ma_value(20, close, max_bars),
+            ma50=self._ma_value(50, close, max_bars),
+            ma200=self._ma_value(200, close, max_bars),
+            rsi14=rsi,
+            macd=macd,
+            macd_signal=signal,
+            macd_hist=macd - signal,
+            atr14=self._tr.peek(tr),
+        )
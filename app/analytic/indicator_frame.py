@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Indicator:
+    deps: Tuple[str, ...]
+    compute: Callable[..., pd.Series]
+    # Fewer bars than this give an all-NaN column, which is not computed.
+    min_bars: int = 1
+
+
+def _sma(window: int) -> Callable[[pd.Series], pd.Series]:
+    return lambda series: series.rolling(window=window).mean()
+
+
+def _ema(span: int) -> Callable[[pd.Series], pd.Series]:
+    return lambda series: series.ewm(span=span, adjust=False).mean()
+
+
+def _rsi(period: int) -> Callable[[pd.Series], pd.Series]:
+    def compute(delta: pd.Series) -> pd.Series:
+        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    return compute
+
+
+def _true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    prev_close = close.shift(1)
+    tr1 = high - low
+    tr2 = (high - prev_close).abs()
+    tr3 = (low - prev_close).abs()
+    return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+
+# Indicators with their lengths in the name: ma50, ema12, rsi14, atr14,
+# macd_12_26 and macd_signal_12_26_9. Keyed by prefix and number count.
+FAMILIES: Dict[Tuple[str, int], Callable[..., Indicator]] = {
+    ("ma", 1): lambda n: Indicator(("close",), _sma(n), n),
+    ("ema", 1): lambda n: Indicator(("close",), _ema(n)),
+    ("rsi", 1): lambda n: Indicator(("delta",), _rsi(n), n),
+    ("atr", 1): lambda n: Indicator(("tr",), _sma(n), n),
+    ("macd", 2): lambda fast, slow: Indicator((f"ema{fast}", f"ema{slow}"), lambda a, b: a - b),
+    ("macd_signal", 3): lambda fast, slow, span: Indicator((f"macd_{fast}_{slow}",), _ema(span)),
+}
+
+_FAMILY_NAME = re.compile(r"([a-z_]+?)_?(\d+(?:_\d+)*)")
+
+
+def _same(series: pd.Series) -> pd.Series:
+    return series
+
+
+INDICATORS: Dict[str, Indicator] = {
+    "delta": Indicator(("close",), lambda close: close.diff()),
+    "tr": Indicator(("high", "low", "close"), _true_range),
+    "macd": Indicator(("macd_12_26",), _same),
+    "macd_signal": Indicator(("macd_signal_12_26_9",), _same),
+    "macd_hist": Indicator(("macd", "macd_signal"), lambda macd, signal: macd - signal),
+}
+
+
+@lru_cache(maxsize=1024)
+def resolve(name: str) -> Optional[Indicator]:
+    if name in INDICATORS:
+        return INDICATORS[name]
+    match = _FAMILY_NAME.fullmatch(name)
+    if match is None:
+        return None
+    numbers = [int(n) for n in match.group(2).split("_")]
+    family = FAMILIES.get((match.group(1), len(numbers)))
+    return family(*numbers) if family is not None else None
+
+
+class IndicatorFrame:
+    # Candles plus indicator columns computed on first use, together with
+    # whatever they depend on. Columns are kept beside the frame instead of
+    # being written into it, so analyzers handed the same candles share one
+    # instance and the frame itself is never copied.
+    def __init__(self, df: pd.DataFrame):
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        self.df = df
+        self._columns: Dict[str, pd.Series] = {}
+
+    @classmethod
+    def wrap(cls, df: "pd.DataFrame | IndicatorFrame") -> "IndicatorFrame":
+        return df if isinstance(df, IndicatorFrame) else cls(df)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        indicator = resolve(name)
+        if indicator is None:
+            return self.df[name]
+
+        column = self._columns.get(name)
+        if column is None:
+            if len(self.df) < indicator.min_bars:
+                column = pd.Series(np.nan, index=self.df.index)
+            else:
+                column = indicator.compute(*(self[dep] for dep in indicator.deps))
+            self._columns[name] = column
+        return column
+
+    def last(self, name: str) -> float:
+        return float(self[name].iloc[-1])
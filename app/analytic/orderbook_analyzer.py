@@ -1,10 +1,17 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
 from .base import BaseAnalyzer, AnalysisResult
 
+DEPTH_BANDS_PCT = (0.1, 0.5, 1.0, 2.0)
+FILL_SIZES_USDT = (10_000, 100_000, 1_000_000)
+WALL_FACTOR = 5.0
+WALLS_PER_SIDE = 3
+WALL_BAND_PCT = 2.0
+
 
 @dataclass
 class OrderBookSummary:
@@ -15,43 +22,252 @@ class OrderBookSummary:
     top_ask: float
 
 
-class OrderBookAnalyzer(BaseAnalyzer):
-    def __init__(self, symbol: str, bids: pd.DataFrame, asks: pd.DataFrame):
-        super().__init__(symbol)
-        self.bids = bids.copy()
-        self.asks = asks.copy()
+@dataclass
+class BandLiquidity:
+    pct: float
+    bid_notional: float
+    ask_notional: float
+    # False when the loaded depth ends inside the band.
+    bid_complete: bool
+    ask_complete: bool
 
-        self.bids.sort_values("price", ascending=False, inplace=True)
-        self.asks.sort_values("price", ascending=True, inplace=True)
 
-    def _summarize(self, depth: int = 20) -> OrderBookSummary:
-        bids_slice = self.bids.head(depth)
-        asks_slice = self.asks.head(depth)
+@dataclass
+class FillEstimate:
+    side: str
+    notional: float
+    filled_notional: float
+    qty: float
+    avg_price: float
+    slippage_pct: float
+    levels: int
+    complete: bool
+
+
+@dataclass
+class Wall:
+    side: str
+    price: float
+    notional: float
+    distance_pct: float
+    ratio: float
+
+
+@dataclass
+class BookLevels:
+    # Bids are ordered best (highest) first, asks best (lowest) first.
+    bid_prices: np.ndarray
+    bid_qty: np.ndarray
+    ask_prices: np.ndarray
+    ask_qty: np.ndarray
+
+    @classmethod
+    def from_frames(cls, bids: pd.DataFrame, asks: pd.DataFrame) -> "BookLevels":
+        bids = bids.sort_values("price", ascending=False)
+        asks = asks.sort_values("price", ascending=True)
+        return cls(
+            bid_prices=bids["price"].to_numpy(dtype=np.float64),
+            bid_qty=bids["qty"].to_numpy(dtype=np.float64),
+            ask_prices=asks["price"].to_numpy(dtype=np.float64),
+            ask_qty=asks["qty"].to_numpy(dtype=np.float64),
+        )
 
-        bid_liq = float((bids_slice["price"] * bids_slice["qty"]).sum())
-        ask_liq = float((asks_slice["price"] * asks_slice["qty"]).sum())
+    def frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        bids = pd.DataFrame({"price": self.bid_prices, "qty": self.bid_qty})
+        asks = pd.DataFrame({"price": self.ask_prices, "qty": self.ask_qty})
+        return bids, asks
 
-        denom = bid_liq + ask_liq
-        if denom == 0:
-            imbalance = 0.0
+    # Prefix sums are built once per snapshot; every query after that is a
+    # binary search plus O(1) arithmetic.
+    @cached_property
+    def _bid_cum(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.cumsum(self.bid_prices * self.bid_qty), np.cumsum(self.bid_qty)
+
+    @cached_property
+    def _ask_cum(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.cumsum(self.ask_prices * self.ask_qty), np.cumsum(self.ask_qty)
+
+    @cached_property
+    def _bid_keys(self) -> np.ndarray:
+        # Negated so bids become ascending for searchsorted.
+        return -self.bid_prices
+
+    @property
+    def mid(self) -> float:
+        if not len(self.bid_prices) or not len(self.ask_prices):
+            return float("nan")
+        return float(self.bid_prices[0] + self.ask_prices[0]) / 2
+
+    def top_liquidity(self, depth: int = 20) -> Tuple[float, float]:
+        bid = float(np.dot(self.bid_prices[:depth], self.bid_qty[:depth]))
+        ask = float(np.dot(self.ask_prices[:depth], self.ask_qty[:depth]))
+        return bid, ask
+
+    def imbalance(self, depth: int = 20) -> float:
+        bid, ask = self.top_liquidity(depth)
+        return (bid - ask) / (bid + ask) if bid + ask else 0.0
+
+    def _band_counts(self, pct: float) -> Tuple[int, int]:
+        mid = self.mid
+        n_bid = int(np.searchsorted(self._bid_keys, -mid * (1 - pct / 100), side="right"))
+        n_ask = int(np.searchsorted(self.ask_prices, mid * (1 + pct / 100), side="right"))
+        return n_bid, n_ask
+
+    def liquidity_within(self, pct: float) -> BandLiquidity:
+        n_bid, n_ask = self._band_counts(pct)
+        bid_cum, ask_cum = self._bid_cum[0], self._ask_cum[0]
+        return BandLiquidity(
+            pct=pct,
+            bid_notional=float(bid_cum[n_bid - 1]) if n_bid else 0.0,
+            ask_notional=float(ask_cum[n_ask - 1]) if n_ask else 0.0,
+            bid_complete=n_bid < len(self.bid_prices),
+            ask_complete=n_ask < len(self.ask_prices),
+        )
+
+    def fill(self, side: str, notional: float) -> Optional[FillEstimate]:
+        # A market buy walks the asks, a market sell walks the bids.
+        if side == "buy":
+            prices, (cum_notional, cum_qty) = self.ask_prices, self._ask_cum
+        else:
+            prices, (cum_notional, cum_qty) = self.bid_prices, self._bid_cum
+        if not len(prices):
+            return None
+
+        k = int(np.searchsorted(cum_notional, notional, side="left"))
+        if k >= len(prices):
+            filled, qty, levels, complete = float(cum_notional[-1]), float(cum_qty[-1]), len(prices), False
         else:
-            imbalance = (bid_liq - ask_liq) / denom
+            prev_notional = float(cum_notional[k - 1]) if k else 0.0
+            prev_qty = float(cum_qty[k - 1]) if k else 0.0
+            filled = notional
+            qty = prev_qty + (notional - prev_notional) / float(prices[k])
+            levels, complete = k + 1, True
+
+        avg_price = filled / qty
+        best = float(prices[0])
+        slippage = (avg_price / best - 1) * 100 if side == "buy" else (1 - avg_price / best) * 100
+        return FillEstimate(
+            side=side,
+            notional=notional,
+            filled_notional=filled,
+            qty=qty,
+            avg_price=avg_price,
+            slippage_pct=slippage,
+            levels=levels,
+            complete=complete,
+        )
+
+    def walls(
+        self,
+        factor: float = WALL_FACTOR,
+        top: int = WALLS_PER_SIDE,
+        within_pct: float = WALL_BAND_PCT,
+    ) -> List[Wall]:
+        # Only levels near mid matter; far-out orders are compared to their
+        # neighbours, not to the whole book.
+        mid = self.mid
+        n_bid, n_ask = self._band_counts(within_pct)
+        found: List[Wall] = []
+        for side, prices, qty in (
+            ("bid", self.bid_prices[:n_bid], self.bid_qty[:n_bid]),
+            ("ask", self.ask_prices[:n_ask], self.ask_qty[:n_ask]),
+        ):
+            if len(prices) < 2:
+                continue
+            notional = prices * qty
+            median = float(np.median(notional))
+            candidates = np.flatnonzero(notional >= factor * median)
+            if not len(candidates) or median <= 0:
+                continue
+            biggest = candidates[np.argsort(-notional[candidates], kind="stable")[:top]]
+            found.extend(
+                Wall(
+                    side=side,
+                    price=float(prices[i]),
+                    notional=float(notional[i]),
+                    distance_pct=(float(prices[i]) / mid - 1) * 100,
+                    ratio=float(notional[i]) / median,
+                )
+                for i in biggest
+            )
+        return found
+
+
+class OrderBookAnalyzer(BaseAnalyzer):
+    def __init__(
+        self,
+        symbol: str,
+        bids: Optional[pd.DataFrame] = None,
+        asks: Optional[pd.DataFrame] = None,
+        levels: Optional[BookLevels] = None,
+    ):
+        super().__init__(symbol)
+        if levels is None:
+            levels = BookLevels.from_frames(bids, asks)
+        self.levels = levels
+
+    def _summarize(self, depth: int = 20) -> OrderBookSummary:
+        bid_liq, ask_liq = self.levels.top_liquidity(depth)
+        bid_px = self.levels.bid_prices
+        ask_px = self.levels.ask_prices
 
-        top_bid = float(bids_slice["price"].iloc[0]) if not bids_slice.empty else float("nan")
-        top_ask = float(asks_slice["price"].iloc[0]) if not asks_slice.empty else float("nan")
+        top_bid = float(bid_px[0]) if len(bid_px) else float("nan")
+        top_ask = float(ask_px[0]) if len(ask_px) else float("nan")
 
         return OrderBookSummary(
             bid_liquidity=bid_liq,
             ask_liquidity=ask_liq,
-            imbalance=imbalance,
+            imbalance=self.levels.imbalance(depth),
             top_bid=top_bid,
             top_ask=top_ask,
         )
 
+    def _bands_text(self, bands: List[BandLiquidity]) -> List[str]:
+        lines = ["", "Ликвидность около mid (USDT):"]
+        for band in bands:
+            bid = f"{'≥' if not band.bid_complete else ''}{band.bid_notional:,.0f}"
+            ask = f"{'≥' if not band.ask_complete else ''}{band.ask_notional:,.0f}"
+            lines.append(f"- ±{band.pct:g}%: BID {bid} / ASK {ask}")
+        if any(not (b.bid_complete and b.ask_complete) for b in bands):
+            lines.append("  (≥ — полоса шире загруженной глубины стакана)")
+        return lines
+
+    def _fill_text(self, fill: Optional[FillEstimate]) -> str:
+        if fill is None:
+            return "нет уровней"
+        if not fill.complete:
+            return f"не хватает глубины (исполнится {fill.filled_notional:,.0f})"
+        return f"{fill.avg_price:.4f} ({fill.slippage_pct:.3f}%)"
+
+    def _fills_text(self, fills: List[Tuple[FillEstimate, FillEstimate]]) -> List[str]:
+        lines = ["", "Рыночная заявка (средняя цена / проскальзывание):"]
+        for size, (buy, sell) in zip(FILL_SIZES_USDT, fills):
+            lines.append(f"- {size:,} USDT: покупка {self._fill_text(buy)}, продажа {self._fill_text(sell)}")
+        return lines
+
+    def _walls_text(self, walls: List[Wall]) -> List[str]:
+        lines = ["", f"Крупные стены в ±{WALL_BAND_PCT:g}% (от {WALL_FACTOR:g}× медианы уровня):"]
+        if not walls:
+            lines.append("- не найдено.")
+        for wall in walls:
+            lines.append(
+                f"- {wall.side.upper()} {wall.price:.4f} — {wall.notional:,.0f} USDT "
+                f"({wall.distance_pct:+.2f}% от mid, ×{wall.ratio:.1f})"
+            )
+        return lines
+
     def analyze(self) -> AnalysisResult:
         summary_struct = self._summarize(depth=20)
         imb = summary_struct.imbalance
 
+        data: Dict[str, Any] = {
+            "bid_liquidity": summary_struct.bid_liquidity,
+            "ask_liquidity": summary_struct.ask_liquidity,
+            "imbalance": summary_struct.imbalance,
+            "top_bid": summary_struct.top_bid,
+            "top_ask": summary_struct.top_ask,
+        }
+
         if np.isnan(summary_struct.top_bid) or np.isnan(summary_struct.top_ask):
             text = f"Стакан по {self.symbol}: недостаточно данных."
         else:
@@ -71,12 +287,13 @@ class OrderBookAnalyzer(BaseAnalyzer):
                 f"- Дисбаланс: {imb:.2%} — преимущество у {side}."
             )
 
-        data: Dict[str, Any] = {
-            "bid_liquidity": summary_struct.bid_liquidity,
-            "ask_liquidity": summary_struct.ask_liquidity,
-            "imbalance": summary_struct.imbalance,
-            "top_bid": summary_struct.top_bid,
-            "top_ask": summary_struct.top_ask,
-        }
+            bands = [self.levels.liquidity_within(pct) for pct in DEPTH_BANDS_PCT]
+            fills = [(self.levels.fill("buy", size), self.levels.fill("sell", size)) for size in FILL_SIZES_USDT]
+            walls = self.levels.walls()
+            text = "\n".join([text, *self._bands_text(bands), *self._fills_text(fills), *self._walls_text(walls)])
+
+            data["bands"] = bands
+            data["fills"] = fills
+            data["walls"] = walls
 
         return AnalysisResult(summary=text, data=data)
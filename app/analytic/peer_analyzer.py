@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from .base import BaseAnalyzer, AnalysisResult
+from .correlation_matrix import CorrelationSnapshot
+
+
+class PeerAnalyzer(BaseAnalyzer):
+    def __init__(
+        self,
+        symbol: str,
+        snapshot: CorrelationSnapshot,
+        interval: str,
+        top: int = 5,
+        cluster_threshold: float = 0.8,
+    ):
+        super().__init__(symbol)
+        self.snapshot = snapshot
+        self.interval = interval
+        self.top = top
+        self.cluster_threshold = cluster_threshold
+
+    def analyze(self) -> AnalysisResult:
+        if self.snapshot.index(self.symbol) is None:
+            return AnalysisResult(
+                summary=f"Похожие монеты для {self.symbol}: недостаточно истории для расчёта.",
+                data={},
+            )
+
+        top, anti = self.snapshot.peers(self.symbol, self.top)
+        clusters = self.snapshot.clusters(self.cluster_threshold)
+        own = next((members for members in clusters if self.symbol in members), [])
+
+        lines: List[str] = [
+            f"Похожие монеты для {self.symbol} "
+            f"(пар в выборке: {len(self.snapshot.symbols)}, "
+            f"доходностей: {self.snapshot.window}, TF {self.interval})",
+            "",
+            "Сильнее всего коррелируют:",
+        ]
+        lines.extend(f"- {name}: {corr:.2f}" for name, corr in top)
+        if not top:
+            lines.append("- нет пар с положительной корреляцией.")
+
+        lines.append("")
+        lines.append("Антикорреляция:")
+        lines.extend(f"- {name}: {corr:.2f}" for name, corr in anti)
+        if not anti:
+            lines.append("- нет пар с отрицательной корреляцией.")
+
+        lines.append("")
+        lines.append(f"Кластеры (корреляция от {self.cluster_threshold:.2f}): {len(clusters)}")
+        if own:
+            others = [name for name in own if name != self.symbol]
+            lines.append(f"{self.symbol} в кластере из {len(own)} пар: {', '.join(others[:15])}"
+                         + (" ..." if len(others) > 15 else ""))
+        else:
+            lines.append(f"{self.symbol} движется обособленно и не входит ни в один кластер.")
+
+        for n, members in enumerate(clusters[:3], start=1):
+            tail = " ..." if len(members) > 8 else ""
+            lines.append(f"{n}. {len(members)} пар: {', '.join(members[:8])}{tail}")
+
+        data: Dict[str, Any] = {
+            "top": top,
+            "anti": anti,
+            "cluster": own,
+            "clusters": clusters,
+        }
+        return AnalysisResult(summary="\n".join(lines), data=data)
@@ -8,6 +8,13 @@ from .derivatives_analyzer import DerivativesAnalyzer
 from .correlation_analyzer import CorrelationAnalyzer
 
 
+def unavailable_section(symbol: str, title: str) -> AnalysisResult:
+    return AnalysisResult(
+        summary=f"{title} по {symbol}: данные временно недоступны.",
+        data={"unavailable": True},
+    )
+
+
 class ReportBuilder:
     def __init__(self, symbol: str):
         self.symbol = symbol
@@ -33,6 +40,14 @@ class ReportBuilder:
         self._sections.append(analyzer.analyze())
         return self
 
+    def add_section(self, result: AnalysisResult) -> "ReportBuilder":
+        self._sections.append(result)
+        return self
+
+    def add_unavailable(self, title: str) -> "ReportBuilder":
+        self._sections.append(unavailable_section(self.symbol, title))
+        return self
+
     def build_text_report(self) -> str:
         parts = [f"Сводный отчёт по {self.symbol}:"]
         for section in self._sections:
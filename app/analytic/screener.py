@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .base import AnalysisResult
+from .batch_indicators import BatchIndicators
+
+
+@dataclass(frozen=True)
+class ScreenFilter:
+    title: str
+    mask: Callable[[BatchIndicators], np.ndarray]
+    score: Callable[[BatchIndicators], np.ndarray]
+
+
+SCREEN_FILTERS: Dict[str, ScreenFilter] = {
+    "bull": ScreenFilter(
+        "бычий тренд (цена выше MA50, MA50 выше MA200)",
+        lambda b: (b.close > b.ma50) & (b.ma50 > b.ma200),
+        lambda b: b.close / b.ma50 - 1,
+    ),
+    "bear": ScreenFilter(
+        "медвежий тренд (цена ниже MA50, MA50 ниже MA200)",
+        lambda b: (b.close < b.ma50) & (b.ma50 < b.ma200),
+        lambda b: 1 - b.close / b.ma50,
+    ),
+    "oversold": ScreenFilter(
+        "RSI ниже 30 (перепроданность)",
+        lambda b: b.rsi14 < 30,
+        lambda b: -b.rsi14,
+    ),
+    "overbought": ScreenFilter(
+        "RSI выше 70 (перекупленность)",
+        lambda b: b.rsi14 > 70,
+        lambda b: b.rsi14,
+    ),
+    "macd_up": ScreenFilter(
+        "MACD пересёк сигнальную снизу вверх",
+        lambda b: (b.macd_hist > 0) & (b.macd_hist_prev <= 0),
+        lambda b: b.macd_hist / b.close,
+    ),
+    "macd_down": ScreenFilter(
+        "MACD пересёк сигнальную сверху вниз",
+        lambda b: (b.macd_hist < 0) & (b.macd_hist_prev >= 0),
+        lambda b: -b.macd_hist / b.close,
+    ),
+}
+
+
+class MarketScreener:
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        indicators: BatchIndicators,
+        interval: str,
+        filters: Sequence[str],
+        top: int = 20,
+    ):
+        unknown = [name for name in filters if name not in SCREEN_FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown screen filters: {', '.join(unknown)}")
+        if not filters:
+            raise ValueError("At least one screen filter is required")
+
+        self.symbols = list(symbols)
+        self.indicators = indicators
+        self.interval = interval
+        self.filters = list(filters)
+        self.top = top
+
+    def rank(self) -> np.ndarray:
+        b = self.indicators
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mask = np.ones(len(b), dtype=bool)
+            for name in self.filters:
+                mask &= SCREEN_FILTERS[name].mask(b)
+            # Matches are ordered by how strongly the first filter applies.
+            score = SCREEN_FILTERS[self.filters[0]].score(b)
+
+        matched = np.flatnonzero(mask & ~np.isnan(score))
+        return matched[np.argsort(-score[matched], kind="stable")]
+
+    def _row(self, place: int, i: int) -> str:
+        b = self.indicators
+        close = b.close[i]
+        atr_pct = b.atr14[i] / close * 100
+        return (
+            f"{place}. {self.symbols[i]}: {close:.6g} USDT | RSI {b.rsi14[i]:.1f} | "
+            f"MACD hist {b.macd_hist[i]:+.4g} | ATR {atr_pct:.2f}%"
+        )
+
+    def analyze(self) -> AnalysisResult:
+        ranked = self.rank()
+        shown = ranked[:self.top]
+
+        lines: List[str] = [
+            f"Скринер рынка (TF {self.interval}, проверено пар: {len(self.symbols)})",
+            "Фильтры: " + "; ".join(SCREEN_FILTERS[name].title for name in self.filters),
+            "",
+        ]
+        if len(shown):
+            lines.append(f"Подходит пар: {len(ranked)}, топ-{len(shown)}:")
+            lines.extend(self._row(place, i) for place, i in enumerate(shown, start=1))
+        else:
+            lines.append("Ни одна пара не подходит под выбранные фильтры.")
+
+        return AnalysisResult(
+            summary="\n".join(lines),
+            data={
+                "filters": self.filters,
+                "scanned": len(self.symbols),
+                "matched": [self.symbols[i] for i in ranked],
+            },
+        )
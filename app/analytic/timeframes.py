@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .alerts import TREND_TITLES
+from .base import BaseAnalyzer, AnalysisResult
+from .candle_analyzer import CandleAnalyzer, classify_trend
+from .indicator_frame import IndicatorFrame
+
+# (label, candle length, offset of the candle grid from the epoch), all in ms.
+Timeframe = Tuple[str, int, int]
+
+MACD_TITLES = {1: "бычий", -1: "медвежий", 0: "нейтральный"}
+
+
+def resample_candles(df: pd.DataFrame, step_ms: int, offset_ms: int = 0) -> pd.DataFrame:
+    # Base candles are grouped by the open time of the higher-timeframe candle
+    # they fall into, on the same grid Binance uses, so every closed candle
+    # equals the one /klines would return. A leading group that starts
+    # mid-candle is dropped; the last one is in progress, as on Binance.
+    if df.empty:
+        return df
+    times = df.index.values.astype("datetime64[ms]").astype(np.int64)
+    opens = (times - offset_ms) // step_ms * step_ms + offset_ms
+    starts = np.flatnonzero(np.r_[True, opens[1:] != opens[:-1]])
+    if times[0] != opens[0]:
+        starts = starts[1:]
+        if not len(starts):
+            return df.iloc[:0]
+    first = starts[0]
+    bounds = starts - first
+    ends = np.r_[starts[1:], len(times)] - 1
+
+    high = df["high"].to_numpy()[first:]
+    low = df["low"].to_numpy()[first:]
+    volume = df["volume"].to_numpy()[first:]
+    values = np.column_stack([
+        df["open"].to_numpy()[starts],
+        np.maximum.reduceat(high, bounds),
+        np.minimum.reduceat(low, bounds),
+        df["close"].to_numpy()[ends],
+        np.add.reduceat(volume, bounds),
+    ])
+    index = pd.DatetimeIndex(opens[starts].view("datetime64[ms]"), name=df.index.name)
+    return pd.DataFrame(values, index=index, columns=["open", "high", "low", "close", "volume"])
+
+
+def _macd_state(hist: float, macd: float, signal: float) -> int:
+    # Same reading as CandleAnalyzer._interpret_macd.
+    if hist > 0 and macd > signal:
+        return 1
+    if hist < 0 and macd < signal:
+        return -1
+    return 0
+
+
+class TimeframeMatrix(BaseAnalyzer):
+    # Trend, RSI and MACD on several timeframes, all aggregated from one
+    # base series instead of a download per timeframe.
+    def __init__(
+        self,
+        symbol: str,
+        base: Union[pd.DataFrame, IndicatorFrame],
+        base_interval: str,
+        timeframes: Sequence[Timeframe],
+    ):
+        super().__init__(symbol)
+        self.base = IndicatorFrame.wrap(base)
+        self.base_interval = base_interval
+        self.timeframes = timeframes
+
+    def analyzers(self) -> List[CandleAnalyzer]:
+        result = []
+        for label, step_ms, offset_ms in self.timeframes:
+            frame = self.base if label == self.base_interval else resample_candles(self.base.df, step_ms, offset_ms)
+            result.append(CandleAnalyzer(self.symbol, frame, label))
+        return result
+
+    def analyze(self) -> AnalysisResult:
+        if not len(self.base):
+            return AnalysisResult(summary=f"Мультитаймфрейм по {self.symbol}: данных нет.", data={})
+
+        lines = [f"Мультитаймфрейм по {self.symbol} (из {len(self.base)} свечей {self.base_interval}):"]
+        data: Dict[str, Any] = {}
+        trends: List[str] = []
+        for analyzer in self.analyzers():
+            if analyzer.df.empty:
+                lines.append(f"• {analyzer.interval}: недостаточно данных.")
+                continue
+            # Only the columns shown here are computed for each timeframe.
+            last = analyzer._latest("ma50", "ma200", "rsi14", "macd", "macd_signal", "macd_hist")
+            trend = classify_trend(last["close"], last["ma50"], last["ma200"])
+            macd = _macd_state(last["macd_hist"], last["macd"], last["macd_signal"])
+            rsi = last["rsi14"]
+            rsi_text = "—" if np.isnan(rsi) else f"{rsi:.1f}"
+            lines.append(
+                f"• {analyzer.interval} ({len(analyzer.df)} св.): тренд {TREND_TITLES[trend]}, "
+                f"RSI {rsi_text}, MACD {MACD_TITLES[macd]}"
+            )
+            trends.append(trend)
+            data[analyzer.interval] = {
+                "candles": len(analyzer.df),
+                "trend": trend,
+                "rsi14": None if np.isnan(rsi) else float(rsi),
+                "macd": macd,
+            }
+
+        known = [t for t in trends if t != "unknown"]
+        if known:
+            leader = max(sorted(set(known)), key=known.count)
+            lines.append("")
+            lines.append(
+                f"Согласие трендов: {TREND_TITLES[leader]} на {known.count(leader)} из {len(trends)} таймфреймов."
+            )
+        return AnalysisResult(summary="\n".join(lines), data=data)
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .volume_analyzer import TradeTape
+
+
+@dataclass
+class FlowWindow:
+    label: str
+    buy_volume: float
+    sell_volume: float
+    delta: float
+    delta_pct: float
+    trades: int
+    # Shorter than the window when the buffer does not reach that far back.
+    covered_ms: int
+    window_ms: int
+
+
+@dataclass
+class TradeFlow:
+    windows: List[FlowWindow]
+    # Cumulative delta over the longest window, sampled at equal time steps.
+    cvd: np.ndarray
+    cvd_label: str
+
+
+class TradeRing:
+    # Recent aggregated trades of one symbol, as trade time plus cumulative
+    # buy and sell volume before each trade. Arrays hold twice the capacity
+    # and are compacted when full, so any window is one contiguous slice and
+    # its volume is a difference of two cumulative values.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        size = capacity * 2
+        self._time = np.empty(size, dtype=np.int64)
+        self._buy_before = np.empty(size, dtype=np.float64)
+        self._sell_before = np.empty(size, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        self._buy_total = 0.0
+        self._sell_total = 0.0
+        self._origin = 0
+        self.last_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self, origin_ms: int) -> None:
+        # origin_ms: no trade after this moment is missing from the buffer.
+        self._start = self._end = 0
+        self._buy_total = self._sell_total = 0.0
+        self._origin = origin_ms
+        self.last_id = None
+
+    def extend(self, tape: "TradeTape") -> int:
+        ids, times, qty, is_sell = tape.agg_id, tape.time, tape.qty, tape.is_sell
+        if self.last_id is not None:
+            # Pages may overlap; ids are sequential, so the new trades are a tail.
+            fresh = slice(int(np.searchsorted(ids, self.last_id, side="right")), None)
+            ids, times, qty, is_sell = ids[fresh], times[fresh], qty[fresh], is_sell[fresh]
+        n = len(ids)
+        if not n:
+            return 0
+        if n > self.capacity:
+            tail = slice(-self.capacity, None)
+            ids, times, qty, is_sell = ids[tail], times[tail], qty[tail], is_sell[tail]
+            self.clear(int(times[0]))
+            n = self.capacity
+        if self._end + n > len(self._time):
+            self._compact(self.capacity - n)
+
+        buys = np.where(is_sell, 0.0, qty)
+        sells = np.where(is_sell, qty, 0.0)
+        end = self._end + n
+        self._time[self._end:end] = times
+        self._buy_before[self._end] = self._buy_total
+        self._sell_before[self._end] = self._sell_total
+        np.cumsum(buys[:-1], out=self._buy_before[self._end + 1:end])
+        np.cumsum(sells[:-1], out=self._sell_before[self._end + 1:end])
+        self._buy_before[self._end + 1:end] += self._buy_total
+        self._sell_before[self._end + 1:end] += self._sell_total
+        self._buy_total += float(buys.sum())
+        self._sell_total += float(sells.sum())
+        self._end = end
+        self.last_id = int(ids[-1])
+
+        if len(self) > self.capacity:
+            self._start = self._end - self.capacity
+            self._origin = int(self._time[self._start])
+        return n
+
+    def _compact(self, keep: int) -> None:
+        # Move the newest `keep` trades to the front and rebase the sums so
+        # they do not grow for the lifetime of the process.
+        keep = min(keep, len(self))
+        first = self._end - keep
+        if keep and first > self._start:
+            self._origin = int(self._time[first])
+        base_buy = self._buy_before[first] if keep else self._buy_total
+        base_sell = self._sell_before[first] if keep else self._sell_total
+        self._time[:keep] = self._time[first:self._end]
+        self._buy_before[:keep] = self._buy_before[first:self._end] - base_buy
+        self._sell_before[:keep] = self._sell_before[first:self._end] - base_sell
+        self._buy_total -= base_buy
+        self._sell_total -= base_sell
+        self._start, self._end = 0, keep
+
+    def _before(self, ts_ms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Cumulative buy and sell volume of the trades older than ts_ms.
+        times = self._time[self._start:self._end]
+        idx = self._start + np.searchsorted(times, ts_ms, side="left")
+        inside = idx < self._end
+        safe = np.minimum(idx, self._end - 1)
+        buy = np.where(inside, self._buy_before[safe], self._buy_total)
+        sell = np.where(inside, self._sell_before[safe], self._sell_total)
+        return buy, sell
+
+    def window(self, label: str, window_ms: int, now_ms: int) -> FlowWindow:
+        since = max(now_ms - window_ms, self._origin)
+        if not len(self):
+            return FlowWindow(label, 0.0, 0.0, 0.0, 0.0, 0, now_ms - since, window_ms)
+        buy_before, sell_before = self._before(np.array([since]))
+        times = self._time[self._start:self._end]
+        trades = len(times) - int(np.searchsorted(times, since, side="left"))
+        buy = self._buy_total - float(buy_before[0])
+        sell = self._sell_total - float(sell_before[0])
+        total = buy + sell
+        delta = buy - sell
+        return FlowWindow(
+            label=label,
+            buy_volume=buy,
+            sell_volume=sell,
+            delta=delta,
+            delta_pct=delta / total * 100 if total > 0 else 0.0,
+            trades=trades,
+            covered_ms=now_ms - since,
+            window_ms=window_ms,
+        )
+
+    def cvd(self, window_ms: int, now_ms: int, points: int = 24) -> np.ndarray:
+        since = max(now_ms - window_ms, self._origin)
+        if not len(self):
+            return np.zeros(points)
+        steps = np.linspace(since, now_ms, points + 1).astype(np.int64)
+        # Trades up to each step, relative to the start of the window.
+        steps[1:] += 1
+        buy, sell = self._before(steps)
+        delta = buy - sell
+        return delta[1:] - delta[0]
+
+    def flow(self, windows: Sequence[Tuple[str, int]], now_ms: int, points: int = 24) -> TradeFlow:
+        label, longest = max(windows, key=lambda w: w[1])
+        return TradeFlow(
+            windows=[self.window(name, ms, now_ms) for name, ms in windows],
+            cvd=self.cvd(longest, now_ms, points),
+            cvd_label=label,
+        )
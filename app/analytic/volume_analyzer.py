@@ -1,8 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
+import numpy as np
 
 from .base import BaseAnalyzer, AnalysisResult
+from .trade_flow import FlowWindow, TradeFlow
+
+SPARK = "▁▂▃▄▅▆▇█"
 
 
 @dataclass
@@ -13,16 +17,59 @@ class VolumeFlowSummary:
     delta_pct: float
 
 
+@dataclass
+class TradeTape:
+    # Aggregated trades in exchange order, one array per field.
+    agg_id: np.ndarray
+    price: np.ndarray
+    qty: np.ndarray
+    time: np.ndarray
+    is_sell: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.agg_id)
+
+    @classmethod
+    def from_frame(cls, trades: pd.DataFrame) -> "TradeTape":
+        return cls(
+            agg_id=trades["a"].to_numpy(dtype=np.int64),
+            price=trades["price"].to_numpy(dtype=np.float64),
+            qty=trades["qty"].to_numpy(dtype=np.float64),
+            time=trades["T"].to_numpy(dtype=np.int64),
+            is_sell=trades["is_sell"].to_numpy(dtype=bool),
+        )
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "a": self.agg_id,
+            "price": self.price,
+            "qty": self.qty,
+            "T": self.time,
+            "is_sell": self.is_sell,
+            "side": np.where(self.is_sell, "sell", "buy"),
+        })
+
+
 class VolumeAnalyzer(BaseAnalyzer):
-    def __init__(self, symbol: str, trades: pd.DataFrame):
+    def __init__(
+        self,
+        symbol: str,
+        trades: Optional[pd.DataFrame] = None,
+        tape: Optional[TradeTape] = None,
+        flow: Optional[TradeFlow] = None,
+    ):
         super().__init__(symbol)
-        self.trades = trades.copy()
+        if tape is None and flow is None:
+            tape = TradeTape.from_frame(trades)
+        self.tape = tape
+        self.flow = flow
 
     def _calc(self, lookback: int = 1000) -> VolumeFlowSummary:
-        df = self.trades.tail(lookback)
+        qty = self.tape.qty[-lookback:]
+        is_sell = self.tape.is_sell[-lookback:]
 
-        buy_vol = float(df.loc[df["side"] == "buy", "qty"].sum())
-        sell_vol = float(df.loc[df["side"] == "sell", "qty"].sum())
+        buy_vol = float(qty[~is_sell].sum())
+        sell_vol = float(qty[is_sell].sum())
         delta = buy_vol - sell_vol
         total = buy_vol + sell_vol
         delta_pct = (delta / total * 100) if total > 0 else 0.0
@@ -35,13 +82,11 @@ class VolumeAnalyzer(BaseAnalyzer):
         )
 
     def analyze(self) -> AnalysisResult:
+        if self.flow is not None:
+            return self._analyze_flow(self.flow)
+
         s = self._calc(lookback=1000)
-        if s.delta > 0:
-            side = "покупателей"
-        elif s.delta < 0:
-            side = "продавцов"
-        else:
-            side = "баланс"
+        side = _side(s.delta)
 
         text = (
             f"Поток объёма по {self.symbol} (последние сделки):\n"
@@ -58,3 +103,52 @@ class VolumeAnalyzer(BaseAnalyzer):
         }
 
         return AnalysisResult(summary=text, data=data)
+
+    def _analyze_flow(self, flow: TradeFlow) -> AnalysisResult:
+        lines = [f"Поток объёма по {self.symbol}:"]
+        for w in flow.windows:
+            lines.append(
+                f"- {w.label}{_coverage(w)}: покупки {w.buy_volume:.2f}, продажи {w.sell_volume:.2f}, "
+                f"дельта {w.delta:+.2f} ({w.delta_pct:+.2f}%) — перевес у {_side(w.delta)}."
+            )
+        if len(flow.cvd) and flow.cvd.any():
+            lines.append(f"- CVD за {flow.cvd_label}: {_sparkline(flow.cvd)} ({flow.cvd[-1]:+.2f})")
+
+        data: Dict[str, Any] = {
+            "windows": {
+                w.label: {
+                    "buy_volume": w.buy_volume,
+                    "sell_volume": w.sell_volume,
+                    "delta": w.delta,
+                    "delta_pct": w.delta_pct,
+                    "trades": w.trades,
+                    "covered_ms": w.covered_ms,
+                }
+                for w in flow.windows
+            },
+            "cvd": flow.cvd.tolist(),
+        }
+        return AnalysisResult(summary="\n".join(lines), data=data)
+
+
+def _side(delta: float) -> str:
+    if delta > 0:
+        return "покупателей"
+    if delta < 0:
+        return "продавцов"
+    return "баланс"
+
+
+def _coverage(w: FlowWindow) -> str:
+    # The buffer may not reach back over the whole window yet.
+    if w.covered_ms >= w.window_ms:
+        return ""
+    return f" (данные за {max(w.covered_ms // 60_000, 1)} мин)"
+
+
+def _sparkline(values: np.ndarray) -> str:
+    low, high = float(values.min()), float(values.max())
+    if high == low:
+        return SPARK[0] * len(values)
+    idx = ((values - low) / (high - low) * (len(SPARK) - 1)).round().astype(int)
+    return "".join(SPARK[i] for i in idx)
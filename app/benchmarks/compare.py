@@ -0,0 +1,39 @@
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+
+def _index(path: str) -> Dict[Tuple[str, str, int], dict]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(r["case"], r["stage"], r["size"]): r for r in report["results"]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio counted as a regression")
+    parser.add_argument("--metric", default="wall_ms_median")
+    args = parser.parse_args(argv)
+
+    base = _index(args.baseline)
+    cand = _index(args.candidate)
+
+    regressions = 0
+    for key in sorted(base.keys() & cand.keys()):
+        old, new = base[key][args.metric], cand[key][args.metric]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        case, stage, size = key
+        print(f"{case:<32} {stage:<12} {size:>7} {old:>12.3f} -> {new:>12.3f}  x{ratio:.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
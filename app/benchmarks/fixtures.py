@@ -0,0 +1,122 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.intervals import interval_ms
+
+KLINES_END_MS = 1_700_000_000_000 // 3_600_000 * 3_600_000
+
+
+def synth_klines(symbol: str, interval: str, n: int, seed: int = 0) -> List[list]:
+    rng = np.random.default_rng(seed + sum(map(ord, symbol)))
+    step = interval_ms(interval)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.005)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.005)
+    volume = rng.gamma(2.0, 500.0, n)
+    times = KLINES_END_MS - step * np.arange(n - 1, -1, -1)
+
+    return [
+        [int(t), f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}",
+         int(t) + step - 1, f"{v * c:.8f}", 100, f"{v / 2:.8f}", f"{v * c / 2:.8f}", "0"]
+        for t, o, h, l, c, v in zip(times, open_, high, low, close, volume)
+    ]
+
+
+def synth_depth(levels: int, mid: float = 100.0, tick: float = 0.01, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    bid_qty = rng.gamma(1.5, 2.0, levels)
+    ask_qty = rng.gamma(1.5, 2.0, levels)
+    return {
+        "lastUpdateId": 1_000_000,
+        "bids": [[f"{mid - tick * (i + 1):.8f}", f"{q:.8f}"] for i, q in enumerate(bid_qty)],
+        "asks": [[f"{mid + tick * (i + 1):.8f}", f"{q:.8f}"] for i, q in enumerate(ask_qty)],
+    }
+
+
+def synth_agg_trades(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, n))
+    qty = rng.gamma(1.2, 0.5, n)
+    is_sell = rng.random(n) < 0.5
+    start = KLINES_END_MS - n * 50
+    return [
+        {"a": 10_000_000 + i, "p": f"{p:.8f}", "q": f"{q:.8f}", "f": i, "l": i,
+         "T": start + i * 50, "m": bool(m), "M": True}
+        for i, (p, q, m) in enumerate(zip(prices, qty, is_sell))
+    ]
+
+
+def synth_funding(symbol: str, n: int) -> List[Dict[str, Any]]:
+    return [
+        {"symbol": symbol, "fundingRate": f"{0.0001 * np.sin(i / 10):.8f}", "fundingTime": KLINES_END_MS - (n - i) * 28_800_000}
+        for i in range(n)
+    ]
+
+
+def synth_open_interest(symbol: str) -> Dict[str, Any]:
+    return {"symbol": symbol, "openInterest": "123456.789", "time": KLINES_END_MS}
+
+
+class FixtureSet:
+    def __init__(self, fixtures_dir: Optional[str] = None):
+        self.fixtures_dir = fixtures_dir
+
+    def _recorded(self, name: str) -> Optional[Any]:
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, f"{name}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def klines(self, symbol: str, interval: str, limit: int) -> List[list]:
+        recorded = self._recorded(f"klines_{symbol}_{interval}")
+        if recorded is not None and len(recorded) >= limit:
+            return recorded[-limit:]
+        return synth_klines(symbol, interval, limit)
+
+    def depth(self, symbol: str, limit: int) -> Dict[str, Any]:
+        recorded = self._recorded(f"depth_{symbol}")
+        if recorded is not None and len(recorded["bids"]) >= limit:
+            return {**recorded, "bids": recorded["bids"][:limit], "asks": recorded["asks"][:limit]}
+        return synth_depth(limit)
+
+    def agg_trades(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
+        recorded = self._recorded(f"aggTrades_{symbol}")
+        if recorded is not None and len(recorded) >= limit:
+            return recorded[-limit:]
+        return synth_agg_trades(limit)
+
+    def funding(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
+        recorded = self._recorded(f"fundingRate_{symbol}")
+        return recorded[-limit:] if recorded is not None else synth_funding(symbol, limit)
+
+    def open_interest(self, symbol: str) -> Dict[str, Any]:
+        recorded = self._recorded(f"openInterest_{symbol}")
+        return recorded if recorded is not None else synth_open_interest(symbol)
+
+
+def record(fixtures_dir: str, symbols: List[str], interval: str = "1h") -> None:
+    import requests
+
+    api = os.environ.get("BINANCE_API", "https://api.binance.com/api/v3")
+    fapi = os.environ.get("BINANCE_FAPI", "https://fapi.binance.com/fapi/v1")
+    os.makedirs(fixtures_dir, exist_ok=True)
+
+    def save(name: str, url: str, params: Dict[str, Any]) -> None:
+        resp = requests.get(url, params=params, timeout=30)
+        resp.raise_for_status()
+        with open(os.path.join(fixtures_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            f.write(resp.text)
+
+    for symbol in symbols:
+        save(f"klines_{symbol}_{interval}", f"{api}/klines", {"symbol": symbol, "interval": interval, "limit": 1000})
+        save(f"depth_{symbol}", f"{api}/depth", {"symbol": symbol, "limit": 5000})
+        save(f"aggTrades_{symbol}", f"{api}/aggTrades", {"symbol": symbol, "limit": 1000})
+        save(f"fundingRate_{symbol}", f"{fapi}/fundingRate", {"symbol": symbol, "limit": 1000})
+        save(f"openInterest_{symbol}", f"{fapi}/openInterest", {"symbol": symbol})
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from analytic import (
+    BookLevels,
+    CandleAnalyzer,
+    CorrelationAnalyzer,
+    DerivativesAnalyzer,
+    IndicatorEngine,
+    MarketScreener,
+    OrderBookAnalyzer,
+    VolumeAnalyzer,
+    compute_batch_indicators,
+)
+from .fixtures import FixtureSet, record, synth_klines
+from .stub_server import BinanceStub
+
+CANDLE_SIZES = (100, 200, 500, 1000, 10_000, 100_000)
+DEPTH_SIZES = (100, 1000, 5000)
+TRADE_SIZES = (500, 1000, 100_000)
+REPORT_SIZES = (100, 200, 500)
+SCREENER_SIZES = (10, 100, 300)
+SCREENER_BARS = 250
+# Report builders compare against BTCUSDT/ETHUSDT, so they run on a different symbol.
+REPORT_SYMBOL = "SOLUSDT"
+
+
+@dataclass
+class StageResult:
+    case: str
+    stage: str
+    size: int
+    repeats: int
+    wall_ms_min: float
+    wall_ms_median: float
+    alloc_peak_bytes: int
+    alloc_net_bytes: int
+    rss_peak_kb: int
+
+
+class Bench:
+    def __init__(self, repeats: int):
+        self.repeats = repeats
+        self.results: List[StageResult] = []
+
+    def stage(self, case: str, stage: str, size: int, fn: Callable[[], Any]) -> Any:
+        repeats = self.repeats if size <= 10_000 else max(1, self.repeats // 3)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            out = fn()
+            times.append((time.perf_counter() - start) * 1000)
+
+        # Allocations are measured on a separate run; tracemalloc skews timings.
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        out = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = StageResult(
+            case=case,
+            stage=stage,
+            size=size,
+            repeats=repeats,
+            wall_ms_min=min(times),
+            wall_ms_median=statistics.median(times),
+            alloc_peak_bytes=peak - before,
+            alloc_net_bytes=current - before,
+            rss_peak_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        )
+        self.results.append(result)
+        print(
+            f"{case:<24} {stage:<12} {size:>7} {result.wall_ms_median:>10.3f} ms "
+            f"{result.alloc_peak_bytes / 1024:>10.1f} KiB",
+            file=sys.stderr,
+        )
+        return out
+
+
+def _fetch(base: str, endpoint: str, params: Dict[str, Any]) -> bytes:
+    from services.binance_api import _session
+
+    resp = _session.get(f"{base}/{endpoint}", params=params, timeout=60)
+    resp.raise_for_status()
+    return resp.content
+
+
+def _reset_caches() -> None:
+    from services.kline_store import _stores
+    from services.market_cache import market_cache
+    from services.report_cache import report_cache
+
+    market_cache.clear()
+    report_cache.clear()
+    _stores.clear()
+
+
+def bench_candles(bench: Bench, api: str, sizes) -> None:
+    from services.binance_api import klines_to_df
+    from services.decoders import decode_klines, kline_frame
+
+    for n in sizes:
+        params = {"symbol": "BTCUSDT", "interval": "1h", "limit": n}
+        body = bench.stage("candles", "fetch", n, lambda: _fetch(api, "klines", params))
+        bench.stage("candles", "parse_json", n, lambda: klines_to_df(json.loads(body)))
+        arrays = bench.stage("candles", "parse", n, lambda: decode_klines(body))
+        df = bench.stage("candles", "frame", n, lambda: kline_frame(*arrays))
+        # Columns are computed on first use, so "indicators" reads them all once.
+        bench.stage("candles", "indicators", n, lambda: CandleAnalyzer("BTCUSDT", df, "1h")._latest())
+        analyzer = CandleAnalyzer("BTCUSDT", df, "1h")
+        analyzer._latest()
+        bench.stage("candles", "render", n, analyzer.analyze)
+
+        engine = bench.stage("candles_stream", "indicators", n, lambda: IndicatorEngine.from_frame(df))
+        bench.stage("candles_stream", "update", n, lambda: (engine.revise(1.0, 1.0, 1.0), engine.latest(n)))
+        values = engine.latest(n)
+        bench.stage("candles_stream", "render", n, lambda: CandleAnalyzer("BTCUSDT", df, "1h", values).analyze())
+        bench.stage("candles_stream", "append", n, lambda: (engine.append(1.0, 1.0, 1.0), engine.latest(n)))
+
+        bench_dfs = {
+            name: kline_frame(*decode_klines(_fetch(api, "klines", {**params, "symbol": name})))
+            for name in ("ETHUSDT", "BNBUSDT")
+        }
+        bench.stage(
+            "correlation",
+            "render",
+            n,
+            lambda: CorrelationAnalyzer("BTCUSDT", df, dict(bench_dfs), window=n, interval="1h").analyze(),
+        )
+
+
+def _book_queries(levels: BookLevels) -> tuple:
+    # A fresh instance so the prefix sums are rebuilt, as for every new snapshot.
+    book = BookLevels(levels.bid_prices, levels.bid_qty, levels.ask_prices, levels.ask_qty)
+    return (
+        [book.liquidity_within(pct) for pct in (0.1, 0.5, 1.0, 2.0)],
+        [book.fill(side, size) for side in ("buy", "sell") for size in (1e4, 1e5, 1e6)],
+        book.walls(),
+    )
+
+
+def bench_orderbook(bench: Bench, api: str, sizes) -> None:
+    from services.binance_api import orderbook_to_dfs
+    from services.decoders import decode_depth
+
+    for n in sizes:
+        body = bench.stage("orderbook", "fetch", n, lambda: _fetch(api, "depth", {"symbol": "BTCUSDT", "limit": n}))
+        bench.stage(
+            "orderbook", "parse_json", n, lambda: BookLevels.from_frames(*orderbook_to_dfs(json.loads(body)))
+        )
+        levels = bench.stage("orderbook", "parse", n, lambda: decode_depth(body))
+        bench.stage("orderbook", "queries", n, lambda: _book_queries(levels))
+        bench.stage("orderbook", "render", n, lambda: OrderBookAnalyzer("BTCUSDT", levels=levels).analyze())
+
+
+def bench_volume(bench: Bench, api: str, sizes) -> None:
+    from services.binance_api import trades_to_df
+    from services.decoders import decode_agg_trades
+
+    for n in sizes:
+        body = bench.stage("volume", "fetch", n, lambda: _fetch(api, "aggTrades", {"symbol": "BTCUSDT", "limit": n}))
+        bench.stage("volume", "parse_json", n, lambda: trades_to_df(json.loads(body)))
+        tape = bench.stage("volume", "parse", n, lambda: decode_agg_trades(body))
+        bench.stage("volume", "render", n, lambda: VolumeAnalyzer("BTCUSDT", tape=tape).analyze())
+
+
+def bench_derivatives(bench: Bench, fapi: str) -> None:
+    from services.binance_api import funding_to_df, oi_to_df
+
+    n = 500
+    bodies = bench.stage(
+        "derivatives",
+        "fetch",
+        n,
+        lambda: (
+            _fetch(fapi, "fundingRate", {"symbol": "BTCUSDT", "limit": n}),
+            _fetch(fapi, "openInterest", {"symbol": "BTCUSDT"}),
+        ),
+    )
+    funding, oi = bench.stage(
+        "derivatives", "parse", n, lambda: (funding_to_df(json.loads(bodies[0])), oi_to_df(json.loads(bodies[1])))
+    )
+    bench.stage("derivatives", "render", n, lambda: DerivativesAnalyzer("BTCUSDT", funding, oi).analyze())
+
+
+def bench_screener(bench: Bench, sizes) -> None:
+    from services.binance_api import klines_to_df
+    from services.screener_service import stack_hlc
+
+    for n in sizes:
+        symbols = [f"SYM{i}USDT" for i in range(n)]
+        rows = {symbol: synth_klines(symbol, "1h", SCREENER_BARS) for symbol in symbols}
+        arrays = {
+            symbol: (np.array([r[0] for r in data], dtype=np.int64), np.array([r[1:6] for r in data], dtype=np.float64))
+            for symbol, data in rows.items()
+        }
+        frames = {symbol: klines_to_df(data) for symbol, data in rows.items()}
+
+        stacked = bench.stage("screener", "stack", n, lambda: stack_hlc(arrays))
+        batch = bench.stage("screener", "indicators", n, lambda: compute_batch_indicators(*stacked[1:]))
+        bench.stage("screener", "render", n, lambda: MarketScreener(stacked[0], batch, "1h", ["bull"]).analyze())
+        bench.stage(
+            "screener_per_symbol",
+            "indicators",
+            n,
+            lambda: [CandleAnalyzer(symbol, df, "1h")._latest() for symbol, df in frames.items()],
+        )
+
+
+def bench_reports(bench: Bench, sizes) -> None:
+    import services.analytic_service as s
+    from services.async_binance_api import AsyncBinanceApi
+
+    def cold(fn: Callable[[], Any]) -> Callable[[], Any]:
+        return lambda: (_reset_caches(), fn())[1]
+
+    loop = asyncio.new_event_loop()
+    try:
+        for n in sizes:
+            sync_builds = {
+                "build_candle_report": lambda: s.build_candle_report(REPORT_SYMBOL, "1h", n),
+                "build_orderbook_report": lambda: s.build_orderbook_report(REPORT_SYMBOL),
+                "build_volume_report": lambda: s.build_volume_report(REPORT_SYMBOL),
+                "build_derivatives_report": lambda: s.build_derivatives_report(REPORT_SYMBOL),
+                "build_correlation_report": lambda: s.build_correlation_report(REPORT_SYMBOL, "1h", n),
+                "build_full_report": lambda: s.build_full_report(REPORT_SYMBOL, "1h", n),
+            }
+            for name, fn in sync_builds.items():
+                bench.stage(name, "total", n, cold(fn))
+
+            async_builds = {
+                "build_candle_report_async": lambda: s.build_candle_report_async(REPORT_SYMBOL, "1h", n),
+                "build_correlation_report_async": lambda: s.build_correlation_report_async(REPORT_SYMBOL, "1h", n),
+                "build_full_report_async": lambda: s.build_full_report_async(REPORT_SYMBOL, "1h", n),
+            }
+            for name, coro_fn in async_builds.items():
+                bench.stage(name, "total", n, cold(lambda: loop.run_until_complete(coro_fn())))
+                bench.stage(name, "warm", n, lambda: loop.run_until_complete(coro_fn()))
+    finally:
+        loop.run_until_complete(AsyncBinanceApi.close())
+        loop.close()
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline CryptoScope benchmarks")
+    parser.add_argument("--fixtures", help="directory with recorded Binance payloads")
+    parser.add_argument("--record", action="store_true", help="record fixtures from Binance into --fixtures and exit")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="skip sizes above 1000 candles or trades")
+    parser.add_argument("--only", nargs="*", default=None, help="candles orderbook volume derivatives screener reports")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        if not args.fixtures:
+            parser.error("--record requires --fixtures")
+        record(args.fixtures, ["BTCUSDT", "ETHUSDT", "BNBUSDT"])
+        return 0
+
+    stub = BinanceStub(FixtureSet(args.fixtures)).start()
+    api = f"{stub.base_url}/api/v3"
+    fapi = f"{stub.base_url}/fapi/v1"
+    os.environ["BINANCE_API"] = api
+    os.environ["BINANCE_FAPI"] = fapi
+
+    candle_sizes = [n for n in CANDLE_SIZES if not args.quick or n <= 1000]
+    groups = set(args.only or ("candles", "orderbook", "volume", "derivatives", "screener", "reports"))
+    bench = Bench(args.repeats)
+    try:
+        if "candles" in groups:
+            bench_candles(bench, api, candle_sizes)
+        if "orderbook" in groups:
+            bench_orderbook(bench, api, DEPTH_SIZES)
+        if "volume" in groups:
+            bench_volume(bench, api, [n for n in TRADE_SIZES if not args.quick or n <= 1000])
+        if "derivatives" in groups:
+            bench_derivatives(bench, fapi)
+        if "screener" in groups:
+            bench_screener(bench, SCREENER_SIZES)
+        if "reports" in groups:
+            bench_reports(bench, REPORT_SIZES)
+    finally:
+        stub.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeats": args.repeats,
+            "fixtures": args.fixtures or "synthetic",
+        },
+        "results": [asdict(r) for r in bench.results],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import FixtureSet
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs under fan-out and adds 1s retransmits.
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class BinanceStub:
+    def __init__(self, fixtures: FixtureSet, host: str = "127.0.0.1", port: int = 0):
+        self.fixtures = fixtures
+        self._bodies: Dict[Tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _payload(self, endpoint: str, q: Dict[str, str]):
+        symbol = q.get("symbol", "BTCUSDT")
+        limit = int(q.get("limit", 500))
+        builders: Dict[str, Callable[[], object]] = {
+            "klines": lambda: self.fixtures.klines(symbol, q.get("interval", "1h"), limit),
+            "depth": lambda: self.fixtures.depth(symbol, limit),
+            "aggTrades": lambda: self.fixtures.agg_trades(symbol, limit),
+            "fundingRate": lambda: self.fixtures.funding(symbol, limit),
+            "openInterest": lambda: self.fixtures.open_interest(symbol),
+        }
+        return builders[endpoint]()
+
+    def body(self, endpoint: str, q: Dict[str, str]) -> bytes:
+        # Payloads are encoded once so fetch timings measure transport, not fixture generation.
+        key = (endpoint, tuple(sorted(q.items())))
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                body = json.dumps(self._payload(endpoint, q)).encode()
+                self._bodies[key] = body
+            return body
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; Nagle would add ~40ms per request.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = url.path.rsplit("/", 1)[-1]
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    body = stub.body(endpoint, q)
+                except KeyError:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "BinanceStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,12 +1,24 @@
 from os import environ
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import FrozenSet, List
 
 @dataclass
 class BotConfig:
     token: str
+    live_orderbook_symbols: List[str] = field(default_factory=list)
+
+def admin_ids() -> FrozenSet[int]:
+    return frozenset(
+        int(s) for s in environ.get("ADMIN_IDS", "").replace(" ", "").split(",") if s.lstrip("-").isdigit()
+    )
 
 def load_config() -> BotConfig:
     token = environ.get("TELEGRAM_BOT_TOKEN")
     if not token:
         raise RuntimeError("TELEGRAM_BOT_TOKEN is not set")
-    return BotConfig(token=token)
+    live_symbols = [
+        s.strip().upper()
+        for s in environ.get("LIVE_ORDERBOOK_SYMBOLS", "").split(",")
+        if s.strip()
+    ]
+    return BotConfig(token=token, live_orderbook_symbols=live_symbols)
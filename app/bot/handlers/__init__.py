@@ -1,10 +1,14 @@
-from . import start, analytics, help, support_author
+from . import start, analytics, help, support_author, screener, alerts, stats, backtest
 
 all_routers = (
     start.router,
     analytics.router,
     help.router,
-    support_author.router
+    support_author.router,
+    screener.router,
+    alerts.router,
+    stats.router,
+    backtest.router,
 )
 
 __all__ = (
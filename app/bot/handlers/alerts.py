@@ -0,0 +1,97 @@
+import math
+
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from analytic.alerts import ALERT_KINDS, DEFAULT_THRESHOLDS, THRESHOLD_RANGES, AlertCondition
+from services.alert_service import ALERTS_PER_CHAT, AlertLimitReached, add_alert, alert_book, remove_alerts
+from services.user_settings import get_user_settings
+
+router = Router()
+
+
+def _usage() -> str:
+    kinds = "\n".join(
+        f"• <code>{kind}</code> — {title} (по умолчанию {DEFAULT_THRESHOLDS[kind]:g})"
+        if kind != "trend" else f"• <code>{kind}</code> — {title}"
+        for kind, title in ALERT_KINDS.items()
+    )
+    return (
+        "Использование: <code>/alert тип [порог]</code>\n"
+        "Алерт ставится на текущие символ и таймфрейм и проверяется на закрытии каждой свечи.\n"
+        "Например: <code>/alert rsi_above 70</code>, <code>/alert trend</code>\n\n"
+        f"Типы:\n{kinds}\n\n"
+        "Список алертов: <code>/alerts</code>\n"
+        "Удалить: <code>/unalert 2</code> или <code>/unalert all</code>"
+    )
+
+
+@router.message(Command("alert"))
+async def cmd_alert(message: types.Message):
+    parts = message.text.split()[1:]
+    kind = parts[0].lower() if parts else ""
+    if kind not in ALERT_KINDS or len(parts) > 2:
+        await message.answer(_usage())
+        return
+
+    try:
+        threshold = float(parts[1].replace(",", ".")) if len(parts) == 2 else DEFAULT_THRESHOLDS[kind]
+    except ValueError:
+        await message.answer(_usage())
+        return
+    if kind != "trend":
+        low, high = THRESHOLD_RANGES[kind]
+        if not low < threshold < high:
+            bounds = f"больше {low:g}" if math.isinf(high) else f"больше {low:g} и меньше {high:g}"
+            await message.answer(f"Порог для {kind} должен быть {bounds}.")
+            return
+
+    chat_id = message.chat.id
+    settings = get_user_settings(chat_id)
+    condition = AlertCondition(kind, 0.0 if kind == "trend" else threshold)
+    try:
+        sub = await add_alert(chat_id, settings.symbol, settings.interval, condition)
+    except AlertLimitReached:
+        await message.answer(f"Можно держать не больше {ALERTS_PER_CHAT} алертов. Удалите лишние: <code>/alerts</code>")
+        return
+    if sub is None:
+        await message.answer("Такой алерт уже есть.")
+        return
+
+    await message.answer(
+        f"Алерт добавлен: <b>{sub.symbol}</b> {sub.interval} — {condition.describe()}.\n"
+        "Проверка на закрытии каждой свечи."
+    )
+
+
+@router.message(Command("alerts"))
+async def cmd_alerts(message: types.Message):
+    subs = alert_book.for_chat(message.chat.id)
+    if not subs:
+        await message.answer("Алертов нет. Добавить: <code>/alert</code>")
+        return
+
+    lines = ["Ваши алерты:"]
+    lines.extend(
+        f"{n}. <b>{sub.symbol}</b> {sub.interval} — {sub.condition.describe()}"
+        for n, sub in enumerate(subs, start=1)
+    )
+    lines.append("\nУдалить: <code>/unalert номер</code> или <code>/unalert all</code>")
+    await message.answer("\n".join(lines))
+
+
+@router.message(Command("unalert"))
+async def cmd_unalert(message: types.Message):
+    args = message.text.split()[1:]
+    if args == ["all"]:
+        removed = await remove_alerts(message.chat.id)
+    elif args and all(arg.isdigit() for arg in args):
+        removed = await remove_alerts(message.chat.id, [int(arg) for arg in args])
+    else:
+        await message.answer("Использование: <code>/unalert 2</code> или <code>/unalert all</code>")
+        return
+
+    if not removed:
+        await message.answer("Таких алертов нет. Список: <code>/alerts</code>")
+        return
+    await message.answer(f"Удалено алертов: {len(removed)}.")
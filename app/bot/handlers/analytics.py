@@ -1,18 +1,27 @@
+import time
+
 from aiogram import Router
 from aiogram.types import CallbackQuery
 
 from services.user_settings import get_user_settings, set_interval, set_candles_limit
 from bot.keyboards import main_menu_kb
+from bot.outbox import outbox
+from services.analytics_executor import AnalyticsOverloaded, AnalyticsTimeout
 
 import services.analytic_service as s
+from services.correlation_service import build_peers_report_async
+from services.metrics import errors_total, stage_seconds
+from services.prefetch import demand
 
 router = Router()
 
 @router.callback_query(lambda c: c.data.startswith("an_"))
 async def handle_analytics_buttons(callback: CallbackQuery):
+    started = time.perf_counter()
     code = callback.data
     chat_id = callback.message.chat.id
     settings = get_user_settings(chat_id)
+    report = code[len("an_"):]
 
     await callback.answer("Готовлю аналитику...")
 
@@ -20,27 +29,38 @@ async def handle_analytics_buttons(callback: CallbackQuery):
     interval = settings.interval
     limit = settings.candles_limit
 
-    if code == "an_candles":
-        text = s.build_candle_report(symbol, interval, limit)
-    elif code == "an_orderbook":
-        text = s.build_orderbook_report(symbol)
-    elif code == "an_volume":
-        text = s.build_volume_report(symbol)
-    elif code == "an_derivatives":
-        text = s.build_derivatives_report(symbol)
-    elif code == "an_correlation":
-        text = s.build_correlation_report(symbol, interval, limit)
-    elif code == "an_full":
-        text = s.build_full_report(symbol, interval, limit)
-    else:
-        text = "Неизвестная команда."
-
-    if len(text) > 4000:
-        chunks = [text[i:i+4000] for i in range(0, len(text), 4000)]
-        for chunk in chunks:
-            await callback.message.answer(chunk)
-    else:
-        await callback.message.answer(text, reply_markup=main_menu_kb())
+    if code in ("an_candles", "an_correlation", "an_full"):
+        demand.record(symbol, interval, limit)
+
+    try:
+        if code == "an_candles":
+            text = await s.build_candle_report_async(symbol, interval, limit)
+        elif code == "an_orderbook":
+            text = await s.build_orderbook_report_async(symbol)
+        elif code == "an_volume":
+            text = await s.build_volume_report_async(symbol)
+        elif code == "an_derivatives":
+            text = await s.build_derivatives_report_async(symbol)
+        elif code == "an_correlation":
+            text = await s.build_correlation_report_async(symbol, interval, limit)
+        elif code == "an_peers":
+            text = await build_peers_report_async(symbol, interval, limit)
+        elif code == "an_timeframes":
+            text = await s.build_timeframes_report_async(symbol)
+        elif code == "an_full":
+            text = await s.build_full_report_async(symbol, interval, limit)
+        else:
+            text = "Неизвестная команда."
+    except AnalyticsOverloaded:
+        errors_total.inc(stage="analytics", error="overloaded")
+        text = "Сейчас слишком много запросов на аналитику. Попробуйте через минуту."
+    except AnalyticsTimeout:
+        errors_total.inc(stage="analytics", error="timeout")
+        text = "Аналитика считается слишком долго. Попробуйте позже или уменьшите количество свечей."
+
+    with stage_seconds.time(stage="send", report=report):
+        await outbox.send(chat_id, text, reply_markup=main_menu_kb())
+    stage_seconds.observe(time.perf_counter() - started, stage="total", report=report)
 
 
 @router.callback_query(lambda c: c.data.startswith("tf_"))
@@ -80,6 +100,10 @@ async def handle_candles_limit_buttons(callback: CallbackQuery):
         limit = 200
     elif code == "cl_500":
         limit = 500
+    elif code == "cl_1000":
+        limit = 1000
+    elif code == "cl_5000":
+        limit = 5000
     else:
         await callback.answer("Неизвестное количество свечей")
         return
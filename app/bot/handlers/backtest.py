@@ -0,0 +1,59 @@
+import time
+
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from analytic import SIGNAL_KINDS
+from bot.keyboards import main_menu_kb
+from bot.outbox import INTERACTIVE, outbox
+from services.analytics_executor import AnalyticsOverloaded, AnalyticsTimeout
+from services.backtest_service import BACKTEST_CANDLES, MAX_BACKTEST_CANDLES, run_backtest
+from services.metrics import errors_total, stage_seconds
+from services.user_settings import get_user_settings
+
+router = Router()
+
+
+def _usage() -> str:
+    kinds = "\n".join(f"• <code>{name}</code> — {title}" for name, title in SIGNAL_KINDS.items())
+    return (
+        "Использование: <code>/backtest тип [свечей]</code>\n"
+        "Например: <code>/backtest rsi 20000</code>\n\n"
+        f"Типы сигналов:\n{kinds}\n\n"
+        f"По умолчанию {BACKTEST_CANDLES} свечей, максимум {MAX_BACKTEST_CANDLES}."
+    )
+
+
+@router.message(Command("backtest"))
+async def cmd_backtest(message: types.Message):
+    args = message.text.split()[1:]
+    if not 1 <= len(args) <= 2 or args[0].lower() not in SIGNAL_KINDS:
+        await message.answer(_usage())
+        return
+    try:
+        candles = int(args[1]) if len(args) == 2 else BACKTEST_CANDLES
+    except ValueError:
+        await message.answer(_usage())
+        return
+    if not 100 <= candles <= MAX_BACKTEST_CANDLES:
+        await message.answer(_usage())
+        return
+
+    started = time.perf_counter()
+    settings = get_user_settings(message.chat.id)
+    # Queued, not awaited: the sweep starts at once, and the outbox keeps the
+    # notice ahead of the result in this chat.
+    outbox.post(message.chat.id, "Считаю бэктест, это может занять до пары минут...", INTERACTIVE)
+
+    try:
+        text = await run_backtest(settings.symbol, settings.interval, args[0].lower(), candles)
+    except AnalyticsOverloaded:
+        errors_total.inc(stage="analytics", error="overloaded")
+        text = "Сейчас уже считается другой бэктест. Попробуйте через минуту."
+    except AnalyticsTimeout:
+        errors_total.inc(stage="analytics", error="timeout")
+        text = "Бэктест считается слишком долго. Попробуйте меньше свечей."
+
+    with stage_seconds.time(stage="send", report="backtest"):
+        await outbox.send(message.chat.id, text, reply_markup=main_menu_kb())
+    stage_seconds.observe(time.perf_counter() - started, stage="total", report="backtest")
@@ -24,14 +24,35 @@ HELP_TEXT = (
     "Кнопки:\n"
     "• 100 🕯 — последние 100 свечей\n"
     "• 200 🕯 — последние 200 свечей\n"
-    "• 500 🕯 — последние 500 свечей\n\n"
+    "• 500 🕯 — последние 500 свечей\n"
+    "• 1000 🕯 / 5000 🕯 — глубокая история, подгружается страницами и хранится на диске\n\n"
     "<b>4. Кнопки аналитики</b>\n"
     "• 📊 Свечи — тренд, уровни, волатильность, RSI, MACD\n"
     "• 📘 Стакан — дисбаланс Bid/Ask и ликвидность\n"
-    "• 📈 Объём — дельта покупок/продаж (taker buy/sell)\n"
+    "• 📈 Объём — дельта покупок/продаж (taker buy/sell) за 1m/5m/1h и CVD\n"
     "• ⚙️ Фьючи — funding rate и открытый интерес (OI)\n"
     "• 🔗 Корреляции — связь с BTC и ETH по доходности\n"
-    "• 🧾 Полный отчёт — объединяет все виды аналитики\n\n"
+    "• 🧾 Полный отчёт — объединяет все виды аналитики\n"
+    "• 🧭 Похожие монеты — самые коррелирующие и антикоррелирующие пары и кластеры рынка\n"
+    "• 🧮 Таймфреймы — тренд, RSI и MACD сразу на 1h/4h/1d из одной истории 1h\n\n"
+    "<b>5. Скринер рынка</b>\n"
+    "Команда: <code>/scan фильтр [фильтр ...]</code>\n"
+    "Проверяет сразу все ликвидные USDT-пары на выбранном таймфрейме.\n"
+    "Фильтры: <code>bull</code>, <code>bear</code>, <code>oversold</code>, "
+    "<code>overbought</code>, <code>macd_up</code>, <code>macd_down</code>\n"
+    "Пример: <code>/scan oversold macd_up</code>\n\n"
+    "<b>6. Алерты</b>\n"
+    "Команда: <code>/alert тип [порог]</code> — на текущие символ и таймфрейм.\n"
+    "Типы: <code>rsi_above</code>, <code>rsi_below</code>, <code>trend</code>, "
+    "<code>imbalance</code>, <code>funding</code>\n"
+    "Проверяются на закрытии каждой свечи, уведомление приходит один раз при срабатывании.\n"
+    "Список: <code>/alerts</code>, удалить: <code>/unalert номер</code>\n\n"
+    "<b>7. Бэктест сигналов</b>\n"
+    "Команда: <code>/backtest тип [свечей]</code> — на текущие символ и таймфрейм.\n"
+    "Типы: <code>trend</code>, <code>rsi</code>, <code>macd</code>\n"
+    "Показывает, как сигнал с текущими настройками отрабатывал на истории, "
+    "и лучшие комбинации параметров.\n"
+    "Пример: <code>/backtest rsi 20000</code>\n\n"
     "Бот запоминает для каждого пользователя отдельно:\n"
     "— выбранный символ\n"
     "— таймфрейм\n"
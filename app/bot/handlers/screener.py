@@ -0,0 +1,50 @@
+import time
+
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from analytic import SCREEN_FILTERS
+from bot.keyboards import main_menu_kb
+from bot.outbox import outbox
+from services.analytics_executor import AnalyticsOverloaded, AnalyticsTimeout
+from services.metrics import errors_total, stage_seconds
+from services.screener_service import build_scan_report_async
+from services.user_settings import get_user_settings
+
+router = Router()
+
+
+def _usage() -> str:
+    filters = "\n".join(
+        f"• <code>{name}</code> — {f.title}" for name, f in SCREEN_FILTERS.items()
+    )
+    return (
+        "Использование: <code>/scan фильтр [фильтр ...]</code>\n"
+        "Например: <code>/scan bull macd_up</code>\n\n"
+        f"Доступные фильтры:\n{filters}"
+    )
+
+
+@router.message(Command("scan"))
+async def cmd_scan(message: types.Message):
+    filters = tuple(name.lower() for name in message.text.split()[1:])
+    if not filters or any(name not in SCREEN_FILTERS for name in filters):
+        await message.answer(_usage())
+        return
+
+    started = time.perf_counter()
+    settings = get_user_settings(message.chat.id)
+    await message.answer("Сканирую рынок...")
+
+    try:
+        text = await build_scan_report_async(settings.interval, filters)
+    except AnalyticsOverloaded:
+        errors_total.inc(stage="analytics", error="overloaded")
+        text = "Сейчас слишком много запросов на аналитику. Попробуйте через минуту."
+    except AnalyticsTimeout:
+        errors_total.inc(stage="analytics", error="timeout")
+        text = "Скан считается слишком долго. Попробуйте позже."
+
+    with stage_seconds.time(stage="send", report="scan"):
+        await outbox.send(message.chat.id, text, reply_markup=main_menu_kb())
+    stage_seconds.observe(time.perf_counter() - started, stage="total", report="scan")
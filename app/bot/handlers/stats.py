@@ -0,0 +1,18 @@
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from bot.config import admin_ids
+from bot.outbox import outbox
+from services.metrics import render_stats
+
+router = Router()
+
+ADMIN_IDS = admin_ids()
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: types.Message):
+    # Not advertised in /help; everyone else gets no reply at all.
+    if message.from_user is None or message.from_user.id not in ADMIN_IDS:
+        return
+    await outbox.send(message.chat.id, render_stats())
@@ -15,11 +15,19 @@ def main_menu_kb() -> InlineKeyboardMarkup:
             InlineKeyboardButton(text="🔗 Корреляции", callback_data="an_correlation"),
             InlineKeyboardButton(text="🧾 Полный отчёт", callback_data="an_full"),
         ],
+        [
+            InlineKeyboardButton(text="🧭 Похожие монеты", callback_data="an_peers"),
+            InlineKeyboardButton(text="🧮 Таймфреймы", callback_data="an_timeframes"),
+        ],
         [
             InlineKeyboardButton(text="100 🕯", callback_data="cl_100"),
             InlineKeyboardButton(text="200 🕯", callback_data="cl_200"),
             InlineKeyboardButton(text="500 🕯", callback_data="cl_500"),
         ],
+        [
+            InlineKeyboardButton(text="1000 🕯", callback_data="cl_1000"),
+            InlineKeyboardButton(text="5000 🕯", callback_data="cl_5000"),
+        ],
         [
             InlineKeyboardButton(text="⏱ 1h", callback_data="tf_1h"),
             InlineKeyboardButton(text="⏱ 4h", callback_data="tf_4h"),
@@ -0,0 +1,21 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.user_settings import load_user_settings
+
+
+class SettingsMiddleware(BaseMiddleware):
+    # Loads the chat's settings off the event loop before any handler runs,
+    # so the synchronous get_user_settings() in handlers is a cache hit.
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        if chat is not None:
+            await load_user_settings(chat.id)
+        return await handler(event, data)
@@ -0,0 +1,191 @@
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from os import environ
+from typing import Any, Dict, List, Optional, Set
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4000
+
+# Telegram allows about 30 messages per second overall, one per second in a
+# private chat and 20 per minute in a group.
+GLOBAL_RATE = float(environ.get("TELEGRAM_GLOBAL_RATE", "30"))
+CHAT_RATE = float(environ.get("TELEGRAM_CHAT_RATE", "1"))
+GROUP_RATE = float(environ.get("TELEGRAM_GROUP_RATE", str(20 / 60)))
+CHAT_BURST = 3
+MAX_ATTEMPTS = 5
+MAX_IDLE_BUCKETS = 10_000
+
+INTERACTIVE = 0
+BULK = 1
+
+
+class TokenBucket:
+    # Tokens may go negative: every take() reserves the next free slot and
+    # returns how long the caller has to wait for it.
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def take(self) -> float:
+        self._refill(time.monotonic())
+        self._tokens -= 1
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def pause(self, seconds: float) -> None:
+        self._refill(time.monotonic())
+        self._tokens = -seconds * self.rate
+
+    def idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self._tokens >= self.burst
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    # Cut on line boundaries so HTML tags, which never span lines in our
+    # reports, stay balanced; only a single overlong line is cut mid-line.
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:limit])
+            line = line[limit:]
+
+        extra = len(line) + (1 if current else 0)
+        if current and size + extra > limit:
+            chunks.append("\n".join(current))
+            current, size, extra = [], 0, len(line)
+        current.append(line)
+        size += extra
+
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()] or [text[:limit]]
+
+
+@dataclass(order=True)
+class _Outgoing:
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    text: str = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False)
+    done: asyncio.Future = field(compare=False)
+    after: Optional[asyncio.Future] = field(compare=False)
+
+
+class Outbox:
+    def __init__(self):
+        self._bot: Optional[Bot] = None
+        self._global = TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._last: Dict[int, asyncio.Future] = {}
+        self._flooded: Set[int] = set()
+        self._ready: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self, bot: Bot) -> asyncio.Task:
+        self._bot = bot
+        self._ready = asyncio.PriorityQueue()
+        return asyncio.create_task(self._run())
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > MAX_IDLE_BUCKETS:
+                for idle in [key for key, b in self._chats.items() if b.idle()]:
+                    del self._chats[idle]
+            bucket = TokenBucket(GROUP_RATE if chat_id < 0 else CHAT_RATE, CHAT_BURST)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def post(
+        self, chat_id: int, text: str, priority: int = BULK, **kwargs: Any
+    ) -> List[asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        chunks = split_message(text)
+        futures = []
+        for n, chunk in enumerate(chunks):
+            # Keyboards and similar markup go on the last chunk only.
+            extra = kwargs if n == len(chunks) - 1 else {}
+            done = loop.create_future()
+            # Mark failures as retrieved; callers that await still get them.
+            done.add_done_callback(lambda f: f.cancelled() or f.exception())
+            job = _Outgoing(priority, next(self._seq), chat_id, chunk, extra, done, self._last.get(chat_id))
+            self._last[chat_id] = done
+            done.add_done_callback(lambda f, chat_id=chat_id: self._forget(chat_id, f))
+
+            delay = self._chat_bucket(chat_id).take()
+            if delay:
+                loop.call_later(delay, self._ready.put_nowait, job)
+            else:
+                self._ready.put_nowait(job)
+            futures.append(done)
+        return futures
+
+    async def send(self, chat_id: int, text: str, priority: int = INTERACTIVE, **kwargs: Any) -> None:
+        await asyncio.gather(*self.post(chat_id, text, priority, **kwargs))
+
+    def _forget(self, chat_id: int, done: asyncio.Future) -> None:
+        if self._last.get(chat_id) is done:
+            del self._last[chat_id]
+            self._flooded.discard(chat_id)
+
+    async def _run(self) -> None:
+        while True:
+            job = await self._ready.get()
+            delay = self._global.take()
+            if delay:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._deliver(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _deliver(self, job: _Outgoing) -> None:
+        if job.after is not None:
+            # Chunks of one chat go out in the order they were posted.
+            await asyncio.wait([job.after])
+        if job.chat_id in self._flooded:
+            # Slots reserved before a flood error are stale; pace the rest of
+            # the chat's queue against the paused bucket again.
+            await asyncio.sleep(self._chat_bucket(job.chat_id).take())
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                await self._bot.send_message(job.chat_id, job.text, **job.kwargs)
+                job.done.set_result(None)
+                return
+            except TelegramRetryAfter as e:
+                if attempt == MAX_ATTEMPTS:
+                    error: Exception = e
+                    break
+                logger.info("chat %s flood limited for %ss", job.chat_id, e.retry_after)
+                self._flooded.add(job.chat_id)
+                self._chat_bucket(job.chat_id).pause(e.retry_after)
+                await asyncio.sleep(max(e.retry_after, self._global.take()))
+            except Exception as e:
+                error = e
+                break
+
+        logger.warning("send to chat %s failed: %r", job.chat_id, error)
+        job.done.set_exception(error)
+
+
+outbox = Outbox()
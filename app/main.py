@@ -4,6 +4,16 @@ from aiogram.client.default import DefaultBotProperties
 
 from bot.config import load_config
 from bot.handlers import all_routers
+from bot.middlewares import SettingsMiddleware
+from bot.outbox import outbox
+from services import AsyncBinanceApi
+from services.alert_service import start_alerts
+from services.live_orderbook import start_live_books
+from services.metrics import start_metrics_server
+from services.analytics_executor import analytics_executor
+from services.backtest_service import shutdown_backtests
+from services.prefetch import start_prefetch
+from services.user_settings import settings_store, start_settings_writer
 
 
 async def main():
@@ -15,11 +25,30 @@ async def main():
     )
 
     dp = Dispatcher()
+    dp.update.outer_middleware(SettingsMiddleware())
 
     for router in all_routers:
         dp.include_router(router)
 
-    await dp.start_polling(bot)
+    background = start_live_books(config.live_orderbook_symbols)
+    background.append(start_settings_writer())
+    background.append(outbox.start(bot))
+    background.append(start_prefetch())
+    background.append(start_alerts(outbox.post))
+    metrics_runner = await start_metrics_server()
+
+    try:
+        await dp.start_polling(bot)
+    finally:
+        for task in background:
+            task.cancel()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await AsyncBinanceApi.close()
+        analytics_executor.shutdown()
+        shutdown_backtests()
+        # Whatever the writer had not flushed yet.
+        settings_store.close()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,9 @@
 from .binance_api import BinanceApi
+from .async_binance_api import AsyncBinanceApi
+from .market_cache import market_cache
 
 __all__ = (
     "BinanceApi",
+    "AsyncBinanceApi",
+    "market_cache",
 )
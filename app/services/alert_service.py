@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from functools import partial
+from os import environ
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analytic import BatchIndicators, compute_batch_indicators
+from analytic.alerts import (
+    BOOK_KINDS,
+    FUNDING_KINDS,
+    AlertBook,
+    AlertCondition,
+    AlertKey,
+    MarketState,
+    Subscription,
+)
+from analytic.candle_analyzer import classify_trend
+from .analytics_executor import analytics_executor
+from .async_binance_api import AsyncBinanceApi
+from .fetch_planner import FetchPlan
+from .intervals import next_close
+from .kline_store import load_candle_arrays_async
+from .live_orderbook import get_live_book
+from .metrics import stage_seconds
+from .screener_service import stack_hlc
+from .user_settings import SETTINGS_DB
+from .weight_governor import BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+# MA200 on the closed candle and on the one before it.
+ALERT_CANDLES = int(environ.get("ALERT_CANDLES", "260"))
+ALERTS_PER_CHAT = int(environ.get("ALERTS_PER_CHAT", "20"))
+ALERT_DELAY = float(environ.get("ALERT_DELAY", "2"))
+ALERT_BOOK_DEPTH = 100
+
+
+class AlertLimitReached(RuntimeError):
+    pass
+
+
+class AlertStore:
+    # Subscriptions change rarely, so they are written through right away.
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "alert_id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER NOT NULL, "
+                "symbol TEXT NOT NULL, interval TEXT NOT NULL, kind TEXT NOT NULL, threshold REAL NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    def load(self) -> List[Subscription]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT alert_id, chat_id, symbol, interval, kind, threshold FROM alerts ORDER BY alert_id"
+            ).fetchall()
+        return [
+            Subscription(alert_id, chat_id, symbol, interval, AlertCondition(kind, threshold))
+            for alert_id, chat_id, symbol, interval, kind, threshold in rows
+        ]
+
+    def insert(self, chat_id: int, symbol: str, interval: str, condition: AlertCondition) -> Subscription:
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO alerts (chat_id, symbol, interval, kind, threshold) VALUES (?, ?, ?, ?, ?)",
+                (chat_id, symbol, interval, condition.kind, condition.threshold),
+            )
+        return Subscription(cursor.lastrowid, chat_id, symbol, interval, condition)
+
+    def delete(self, alert_ids: List[int]) -> None:
+        with self._lock:
+            self._connect().executemany("DELETE FROM alerts WHERE alert_id = ?", [(i,) for i in alert_ids])
+
+
+alert_store = AlertStore(SETTINGS_DB)
+alert_book = AlertBook()
+
+# Writes go to SQLite off the event loop; held across the write so a
+# duplicate check and its insert are not interleaved with another change.
+_changes = asyncio.Lock()
+
+# Book and funding readings from the previous evaluation of each key.
+_last_states: Dict[AlertKey, MarketState] = {}
+
+
+def load_alerts() -> int:
+    for sub in alert_store.load():
+        alert_book.add(sub)
+    return len(alert_book)
+
+
+async def add_alert(chat_id: int, symbol: str, interval: str, condition: AlertCondition) -> Optional[Subscription]:
+    async with _changes:
+        existing = alert_book.for_chat(chat_id)
+        if any((s.symbol, s.interval, s.condition) == (symbol, interval, condition) for s in existing):
+            return None
+        if len(existing) >= ALERTS_PER_CHAT:
+            raise AlertLimitReached(f"chat {chat_id} has {len(existing)} alerts")
+        sub = await asyncio.to_thread(alert_store.insert, chat_id, symbol, interval, condition)
+        alert_book.add(sub)
+        return sub
+
+
+async def remove_alerts(chat_id: int, positions: Optional[List[int]] = None) -> List[Subscription]:
+    # Positions are 1-based, as listed by /alerts; None removes them all.
+    async with _changes:
+        subs = alert_book.for_chat(chat_id)
+        if positions is not None:
+            subs = [subs[n - 1] for n in sorted(set(positions)) if 1 <= n <= len(subs)]
+        await asyncio.to_thread(alert_store.delete, [sub.alert_id for sub in subs])
+        for sub in subs:
+            alert_book.remove(sub.alert_id)
+        return subs
+
+
+async def _book_imbalance(symbol: str) -> float:
+    book = get_live_book(symbol)
+    if book is not None:
+        levels = book.levels(ALERT_BOOK_DEPTH)
+    else:
+        levels = await AsyncBinanceApi(symbol, limit=ALERT_BOOK_DEPTH).load_levels()
+    return levels.imbalance()
+
+
+async def _last_funding(symbol: str) -> float:
+    funding = await AsyncBinanceApi(symbol, limit=1).load_funding()
+    return float(funding["funding_rate"].iloc[-1])
+
+
+def _closed(arrays: Tuple[np.ndarray, np.ndarray], boundary: int) -> Tuple[np.ndarray, np.ndarray]:
+    times, values = arrays
+    closed = times < boundary
+    return times[closed], values[closed]
+
+
+def candle_indicators(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray
+) -> Tuple[BatchIndicators, BatchIndicators]:
+    # Last closed candle and the one before it, for every symbol at once.
+    with stage_seconds.time(stage="indicators", report="alerts"):
+        return (
+            compute_batch_indicators(high, low, close),
+            compute_batch_indicators(high[:, :-1], low[:, :-1], close[:, :-1]),
+        )
+
+
+async def evaluate_interval(interval: str, boundary: int) -> Dict[int, List[str]]:
+    symbols = alert_book.symbols(interval)
+    plan = FetchPlan()
+    for symbol in symbols:
+        plan.add(symbol, partial(load_candle_arrays_async, symbol, interval, ALERT_CANDLES))
+    for symbol in alert_book.symbols(interval, BOOK_KINDS):
+        plan.add(f"book:{symbol}", partial(_book_imbalance, symbol))
+    for symbol in alert_book.symbols(interval, FUNDING_KINDS):
+        plan.add(f"funding:{symbol}", partial(_last_funding, symbol))
+    fetched = await plan.run_async()
+
+    candles = {s: _closed(fetched.values[s], boundary) for s in symbols if s in fetched.values}
+    stacked, high, low, close = stack_hlc(candles)
+    if not stacked or close.shape[1] < 2:
+        return {}
+    cur, prev = await analytics_executor.run(candle_indicators, high, low, close)
+
+    lines: Dict[int, List[str]] = {}
+    for i, symbol in enumerate(stacked):
+        key = (symbol, interval)
+        last = _last_states.get(key)
+        state = MarketState(
+            close=float(cur.close[i]),
+            rsi14=float(cur.rsi14[i]),
+            trend=classify_trend(cur.close[i], cur.ma50[i], cur.ma200[i]),
+            imbalance=fetched.values.get(f"book:{symbol}"),
+            funding=fetched.values.get(f"funding:{symbol}"),
+        )
+        before = MarketState(
+            close=float(prev.close[i]),
+            rsi14=float(prev.rsi14[i]),
+            trend=classify_trend(prev.close[i], prev.ma50[i], prev.ma200[i]),
+            imbalance=last.imbalance if last is not None else None,
+            funding=last.funding if last is not None else None,
+        )
+        _last_states[key] = state
+
+        for chat_id, conditions in alert_book.evaluate(symbol, interval, before, state).items():
+            chat_lines = lines.setdefault(chat_id, [])
+            chat_lines.append(f"<b>{symbol}</b> {interval}, цена {state.close:g}:")
+            chat_lines.extend(f"- {condition.message(state)}" for condition in conditions)
+    return lines
+
+
+async def run_alerts(post: Callable[[int, str], object]) -> None:
+    # Alert fetches yield Binance weight to interactive reports.
+    request_priority.set(BACKGROUND)
+    await asyncio.to_thread(load_alerts)
+    while True:
+        intervals = alert_book.intervals()
+        if not intervals:
+            await asyncio.sleep(60)
+            continue
+
+        now_ms = int(time.time() * 1000)
+        boundary, due = next_close(intervals, now_ms)
+        await asyncio.sleep(max(boundary - now_ms, 0) / 1000 + ALERT_DELAY)
+
+        # One message per chat for everything that fired on this boundary.
+        batch: Dict[int, List[str]] = {}
+        for interval in sorted(due):
+            try:
+                lines = await evaluate_interval(interval, boundary)
+            except Exception as e:
+                logger.warning("alerts for %s failed: %r", interval, e)
+                continue
+            for chat_id, chat_lines in lines.items():
+                batch.setdefault(chat_id, []).extend(chat_lines)
+
+        for chat_id, chat_lines in batch.items():
+            post(chat_id, "🔔 Сработали алерты\n" + "\n".join(chat_lines))
+        if batch:
+            logger.info("alerts fired for %d chats on %s", len(batch), ",".join(sorted(due)))
+
+
+def start_alerts(post: Callable[[int, str], object]) -> asyncio.Task:
+    return asyncio.create_task(run_alerts(post))
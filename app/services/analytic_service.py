@@ -1,3 +1,9 @@
+from functools import partial
+from os import environ
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
 from analytic import (
     CandleAnalyzer,
     OrderBookAnalyzer,
@@ -5,58 +11,98 @@ from analytic import (
     DerivativesAnalyzer,
     CorrelationAnalyzer,
     ReportBuilder,
+    IndicatorValues,
+    IndicatorFrame,
+    BookLevels,
+    TradeFlow,
+    TimeframeMatrix,
 )
+from analytic.base import AnalysisResult
+from analytic.report_builder import unavailable_section
 from .binance_api import BinanceApi
+from .async_binance_api import AsyncBinanceApi
+from .analytics_executor import analytics_executor
+from .single_flight import coalesced
+from .fetch_planner import FetchPlan
+from .intervals import interval_ms, interval_offset_ms
+from .live_orderbook import get_live_book
+from .metrics import stage_seconds
+from .report_cache import report_cache, section_key, section_expires_at
+from .trade_flow import load_trade_flow, load_trade_flow_async
+from .kline_store import (
+    load_candles,
+    load_candles_async,
+    load_candle_snapshot,
+    load_candle_snapshot_async,
+)
 
+BENCHMARKS = ("BTCUSDT", "ETHUSDT")
 
-def build_candle_report(symbol: str, interval: str, candles_limit: int) -> str:
-    api = BinanceApi(symbol, interval, candles_limit)
-    candles = api.load_klines()
+FULL_REPORT_SECTIONS = ("candles", "orderbook", "volume", "derivatives", "correlation")
 
-    analyzer = CandleAnalyzer(symbol, candles, interval)
-    result = analyzer.analyze()
-    return result.summary
+SECTION_TITLES = {
+    "candles": "Свечи",
+    "orderbook": "Стакан",
+    "volume": "Поток объёма",
+    "derivatives": "Деривативы",
+    "correlation": "Корреляции",
+    "timeframes": "Мультитаймфрейм",
+}
 
+# Higher timeframes are aggregated from one base series, not downloaded.
+MTF_BASE_INTERVAL = environ.get("MTF_BASE_INTERVAL", "1h")
+MTF_TIMEFRAMES = tuple(
+    (label, interval_ms(label), interval_offset_ms(label))
+    for label in environ.get("MTF_TIMEFRAMES", "1h,4h,1d").split(",")
+)
+# Enough 1h candles for MA200 on the daily timeframe.
+MTF_CANDLES = int(environ.get("MTF_CANDLES", "5000"))
 
-def build_orderbook_report(symbol: str) -> str:
-    api = BinanceApi(symbol)
-    bids, asks = api.load_orderbook()
+DEFAULT_FETCH_LIMIT = 500
+# aggTrades and fundingRate stop at 1000 rows whatever the candle depth is.
+MAX_FETCH_LIMIT = 1000
 
-    analyzer = OrderBookAnalyzer(symbol, bids, asks)
+
+def render_candle_report(
+    symbol: str,
+    candles: pd.DataFrame,
+    interval: str,
+    indicators: Optional[IndicatorValues] = None,
+) -> str:
+    analyzer = CandleAnalyzer(symbol, candles, interval, indicators)
     result = analyzer.analyze()
     return result.summary
 
 
-def build_volume_report(symbol: str) -> str:
-    api = BinanceApi(symbol)
-    trades = api.load_trades()
-
-    analyzer = VolumeAnalyzer(symbol, trades)
+def render_orderbook_report(symbol: str, levels: BookLevels) -> str:
+    analyzer = OrderBookAnalyzer(symbol, levels=levels)
     result = analyzer.analyze()
     return result.summary
 
 
-def build_derivatives_report(symbol: str) -> str:
-    api = BinanceApi(symbol)
-    funding = api.load_funding()
-    oi = api.load_oi()
-
-    analyzer = DerivativesAnalyzer(symbol, funding_df=funding, oi_df=oi)
+def render_volume_report(symbol: str, flow: TradeFlow) -> str:
+    analyzer = VolumeAnalyzer(symbol, flow=flow)
     result = analyzer.analyze()
     return result.summary
 
 
-def build_correlation_report(symbol: str, interval: str, candles_limit: int) -> str:
-    api_main = BinanceApi(symbol, interval, candles_limit)
-    candles = api_main.load_klines()
+def render_derivatives_report(symbol: str, funding: pd.DataFrame, oi: pd.DataFrame) -> str:
+    analyzer = DerivativesAnalyzer(symbol, funding_df=funding, oi_df=oi)
+    result = analyzer.analyze()
+    return result.summary
 
-    btc_df = BinanceApi("BTCUSDT", interval, candles_limit).load_klines()
-    eth_df = BinanceApi("ETHUSDT", interval, candles_limit).load_klines()
 
+def render_correlation_report(
+    symbol: str,
+    candles: pd.DataFrame,
+    bench_dfs: Dict[str, pd.DataFrame],
+    interval: str,
+    candles_limit: int,
+) -> str:
     analyzer = CorrelationAnalyzer(
         symbol,
         candles,
-        {"BTCUSDT": btc_df, "ETHUSDT": eth_df},
+        bench_dfs,
         window=candles_limit,
         interval=interval,
     )
@@ -64,35 +110,252 @@ def build_correlation_report(symbol: str, interval: str, candles_limit: int) ->
     return result.summary
 
 
+def _render_section(
+    name: str,
+    symbol: str,
+    data: Dict[str, Any],
+    interval: Optional[str],
+    candles_limit: Optional[int],
+) -> Optional[AnalysisResult]:
+    candles, indicators = data.get("candles", (None, None))
+
+    if name == "candles" and candles is not None:
+        return CandleAnalyzer(symbol, candles, interval, indicators).analyze()
+
+    if name == "orderbook" and "orderbook" in data:
+        return OrderBookAnalyzer(symbol, levels=data["orderbook"]).analyze()
+
+    if name == "volume" and "trades" in data:
+        return VolumeAnalyzer(symbol, flow=data["trades"]).analyze()
+
+    if name == "derivatives" and ("funding" in data or "oi" in data):
+        return DerivativesAnalyzer(symbol, funding_df=data.get("funding"), oi_df=data.get("oi")).analyze()
+
+    bench_dfs = {bench: data[bench] for bench in BENCHMARKS if bench in data}
+    if name == "correlation" and candles is not None and bench_dfs:
+        return CorrelationAnalyzer(
+            symbol,
+            candles,
+            bench_dfs,
+            window=candles_limit,
+            interval=interval,
+        ).analyze()
+
+    if name == "timeframes" and "base" in data:
+        return TimeframeMatrix(symbol, data["base"], interval, MTF_TIMEFRAMES).analyze()
+
+    return None
+
+
+def render_sections(
+    symbol: str,
+    data: Dict[str, Any],
+    sections: Iterable[str],
+    interval: Optional[str] = None,
+    candles_limit: Optional[int] = None,
+) -> Dict[str, AnalysisResult]:
+    candles, indicators = data.get("candles", (None, None))
+    if candles is not None:
+        # Candle and correlation sections read one set of lazily computed columns.
+        data = {**data, "candles": (IndicatorFrame(candles), indicators)}
+
+    results = {}
+    for name in sections:
+        result = _render_section(name, symbol, data, interval, candles_limit)
+        results[name] = result if result is not None else unavailable_section(symbol, SECTION_TITLES[name])
+    return results
+
+
+def assemble_full_report(symbol: str, sections: Dict[str, AnalysisResult]) -> str:
+    builder = ReportBuilder(symbol)
+    for name in FULL_REPORT_SECTIONS:
+        builder.add_section(sections[name])
+    return builder.build_text_report()
+
+
+def render_full_report(
+    symbol: str,
+    data: Dict[str, Any],
+    interval: str,
+    candles_limit: int,
+) -> str:
+    sections = render_sections(symbol, data, FULL_REPORT_SECTIONS, interval, candles_limit)
+    return assemble_full_report(symbol, sections)
+
+
+def _plan_sections(
+    api_cls: type,
+    snapshot_loader: Callable[[str, str, int], Any],
+    candles_loader: Callable[[str, str, int], Any],
+    levels_loader: Callable[[str, int], Any],
+    trades_loader: Callable[[str], Any],
+    sections: Iterable[str],
+    symbol: str,
+    interval: Optional[str],
+    candles_limit: Optional[int],
+    fetch_limit: int,
+) -> FetchPlan:
+    sections = set(sections)
+    api = api_cls(symbol, limit=fetch_limit)
+    plan = FetchPlan()
+
+    if sections & {"candles", "correlation"}:
+        plan.add("candles", partial(snapshot_loader, symbol, interval, candles_limit))
+    if "orderbook" in sections:
+        plan.add("orderbook", partial(levels_loader, symbol, fetch_limit))
+    if "volume" in sections:
+        plan.add("trades", partial(trades_loader, symbol))
+    if "derivatives" in sections:
+        plan.add("funding", api.load_funding)
+        plan.add("oi", api.load_oi)
+    if "timeframes" in sections:
+        plan.add("base", partial(candles_loader, symbol, interval, candles_limit))
+    if "correlation" in sections:
+        for name in BENCHMARKS:
+            plan.add(name, partial(candles_loader, name, interval, candles_limit))
+    return plan
+
+
+def _load_levels(symbol: str, limit: int = DEFAULT_FETCH_LIMIT) -> BookLevels:
+    return BinanceApi(symbol, limit=limit).load_levels()
+
+
+async def _load_levels_async(symbol: str, limit: int = DEFAULT_FETCH_LIMIT) -> BookLevels:
+    book = get_live_book(symbol)
+    if book is not None:
+        return book.levels(limit)
+    return await AsyncBinanceApi(symbol, limit=limit).load_levels()
+
+
+def build_candle_report(symbol: str, interval: str, candles_limit: int) -> str:
+    candles, indicators = load_candle_snapshot(symbol, interval, candles_limit)
+    return render_candle_report(symbol, candles, interval, indicators)
+
+
+def build_orderbook_report(symbol: str) -> str:
+    return render_orderbook_report(symbol, _load_levels(symbol))
+
+
+def build_volume_report(symbol: str) -> str:
+    return render_volume_report(symbol, load_trade_flow(symbol))
+
+
+def build_derivatives_report(symbol: str) -> str:
+    api = BinanceApi(symbol)
+    funding = api.load_funding()
+    oi = api.load_oi()
+    return render_derivatives_report(symbol, funding, oi)
+
+
+def build_correlation_report(symbol: str, interval: str, candles_limit: int) -> str:
+    candles = load_candles(symbol, interval, candles_limit)
+
+    btc_df = load_candles("BTCUSDT", interval, candles_limit)
+    eth_df = load_candles("ETHUSDT", interval, candles_limit)
+
+    return render_correlation_report(
+        symbol, candles, {"BTCUSDT": btc_df, "ETHUSDT": eth_df}, interval, candles_limit
+    )
+
+
 def build_full_report(symbol: str, interval: str, candles_limit: int) -> str:
-    api_main = BinanceApi(symbol, interval, candles_limit)
-    candles = api_main.load_klines()
-
-    bids, asks = api_main.load_orderbook()
-    trades = api_main.load_trades()
-    funding = api_main.load_funding()
-    oi = api_main.load_oi()
-
-    btc_df = BinanceApi("BTCUSDT", interval, candles_limit).load_klines()
-    eth_df = BinanceApi("ETHUSDT", interval, candles_limit).load_klines()
-
-    candle_analyzer = CandleAnalyzer(symbol, candles, interval)
-    orderbook_analyzer = OrderBookAnalyzer(symbol, bids, asks)
-    volume_analyzer = VolumeAnalyzer(symbol, trades)
-    derivatives_analyzer = DerivativesAnalyzer(symbol, funding_df=funding, oi_df=oi)
-    corr_analyzer = CorrelationAnalyzer(
+    results = _plan_sections(
+        BinanceApi,
+        load_candle_snapshot,
+        load_candles,
+        _load_levels,
+        load_trade_flow,
+        FULL_REPORT_SECTIONS,
         symbol,
-        candles,
-        {"BTCUSDT": btc_df, "ETHUSDT": eth_df},
-        window=candles_limit,
-        interval=interval,
-    )
+        interval,
+        candles_limit,
+        candles_limit,
+    ).run()
+    return render_full_report(symbol, results.values, interval, candles_limit)
 
-    builder = ReportBuilder(symbol)
-    builder.add_candle_analysis(candle_analyzer)
-    builder.add_orderbook_analysis(orderbook_analyzer)
-    builder.add_volume_analysis(volume_analyzer)
-    builder.add_derivatives_analysis(derivatives_analyzer)
-    builder.add_correlation_analysis(corr_analyzer)
 
-    return builder.build_text_report()
+async def build_sections_async(
+    symbol: str,
+    sections: Tuple[str, ...],
+    interval: Optional[str] = None,
+    candles_limit: Optional[int] = None,
+    fetch_limit: int = DEFAULT_FETCH_LIMIT,
+) -> Dict[str, AnalysisResult]:
+    keys = {
+        name: section_key(name, symbol, interval, candles_limit, fetch_limit)
+        for name in sections
+    }
+    results = {name: report_cache.get(key) for name, key in keys.items()}
+    stale = tuple(name for name, result in results.items() if result is None)
+    if not stale:
+        return results
+
+    # Only stale sections are fetched and rendered; fresh ones are reused as is.
+    report = "+".join(stale)
+    with stage_seconds.time(stage="fetch", report=report):
+        fetched = await _plan_sections(
+            AsyncBinanceApi,
+            load_candle_snapshot_async,
+            load_candles_async,
+            _load_levels_async,
+            load_trade_flow_async,
+            stale,
+            symbol,
+            interval,
+            candles_limit,
+            fetch_limit,
+        ).run_async()
+    with stage_seconds.time(stage="render", report=report):
+        rendered = await analytics_executor.run(
+            render_sections, symbol, fetched.values, stale, interval, candles_limit
+        )
+
+    for name, result in rendered.items():
+        if not result.data.get("unavailable"):
+            report_cache.put(keys[name], result, section_expires_at(name, interval))
+        results[name] = result
+    return results
+
+
+@coalesced("candles")
+async def build_candle_report_async(symbol: str, interval: str, candles_limit: int) -> str:
+    sections = await build_sections_async(symbol, ("candles",), interval, candles_limit)
+    return sections["candles"].summary
+
+
+@coalesced("orderbook")
+async def build_orderbook_report_async(symbol: str) -> str:
+    sections = await build_sections_async(symbol, ("orderbook",))
+    return sections["orderbook"].summary
+
+
+@coalesced("volume")
+async def build_volume_report_async(symbol: str) -> str:
+    sections = await build_sections_async(symbol, ("volume",))
+    return sections["volume"].summary
+
+
+@coalesced("derivatives")
+async def build_derivatives_report_async(symbol: str) -> str:
+    sections = await build_sections_async(symbol, ("derivatives",))
+    return sections["derivatives"].summary
+
+
+@coalesced("correlation")
+async def build_correlation_report_async(symbol: str, interval: str, candles_limit: int) -> str:
+    sections = await build_sections_async(symbol, ("correlation",), interval, candles_limit)
+    return sections["correlation"].summary
+
+
+@coalesced("timeframes")
+async def build_timeframes_report_async(symbol: str) -> str:
+    sections = await build_sections_async(symbol, ("timeframes",), MTF_BASE_INTERVAL, MTF_CANDLES)
+    return sections["timeframes"].summary
+
+
+@coalesced("full")
+async def build_full_report_async(symbol: str, interval: str, candles_limit: int) -> str:
+    sections = await build_sections_async(
+        symbol, FULL_REPORT_SECTIONS, interval, candles_limit, fetch_limit=min(candles_limit, MAX_FETCH_LIMIT)
+    )
+    return assemble_full_report(symbol, sections)
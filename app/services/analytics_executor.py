@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from os import environ
+from typing import Any, Callable, Optional
+
+# Pools are started lazily from a process that already runs aiohttp, SQLite
+# and executor threads; a forked worker could inherit a lock held by one.
+PROCESS_START_METHOD = environ.get("PROCESS_START_METHOD", "forkserver")
+
+
+class AnalyticsOverloaded(RuntimeError):
+    pass
+
+
+class AnalyticsTimeout(RuntimeError):
+    pass
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(PROCESS_START_METHOD))
+
+
+class AnalyticsExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+        max_pending: int = 64,
+        timeout: float = 20.0,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> "AnalyticsExecutor":
+        workers = environ.get("ANALYTICS_WORKERS")
+        return cls(
+            kind=environ.get("ANALYTICS_EXECUTOR", "thread"),
+            workers=int(workers) if workers else None,
+            max_pending=int(environ.get("ANALYTICS_MAX_PENDING", "64")),
+            timeout=float(environ.get("ANALYTICS_JOB_TIMEOUT", "20")),
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = process_pool(self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analytics")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Queued and running jobs share one bound; past it callers are
+        # rejected immediately instead of piling up behind the pool.
+        if self.pending >= self.max_pending:
+            raise AnalyticsOverloaded(f"{self.pending} analytics jobs pending")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_pool(), partial(func, *args))
+        # The slot is held until the job itself finishes, not until the
+        # caller stops waiting, so timed-out jobs still count.
+        self.pending += 1
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            # The worker cannot be interrupted; only the caller stops waiting.
+            raise AnalyticsTimeout(f"{getattr(func, '__name__', func)} exceeded {self.timeout}s")
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+analytics_executor = AnalyticsExecutor.from_env()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from os import environ
+
+import aiohttp
+import pandas as pd
+
+from analytic import BookLevels, TradeTape
+from .binance_api import ENDPOINT_TIMEOUTS, funding_to_df, oi_to_df, request_weight
+from .decoders import KlineArrays, decode_klines, decode_depth, decode_agg_trades, kline_frame
+from .market_cache import market_cache, cache_key, ttl_for
+from .metrics import decode_seconds, record_request
+from .weight_governor import MAX_RETRIES, RETRY_STATUSES, backoff_delay, governor_for, retry_wait
+
+
+class AsyncBinanceApi:
+    _session: Optional[aiohttp.ClientSession] = None
+
+    def __init__(self, symbol: str, interval: str = "1h", limit: int = 500):
+        self.interval = interval
+        self.symbol = symbol
+        self.limit = limit
+        self.binanc_api = environ.get('BINANCE_API')
+        self.binanc_fapi = environ.get('BINANCE_FAPI')
+
+    @classmethod
+    def session(cls) -> aiohttp.ClientSession:
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=int(environ.get("BINANCE_POOL_SIZE", "100")),
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            cls._session = aiohttp.ClientSession(connector=connector)
+        return cls._session
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+
+    def _api_name(self, base: str) -> str:
+        return "futures" if base == self.binanc_fapi else "spot"
+
+    async def _get_json(
+        self,
+        base: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        decode: Callable[[bytes], Any] = json.loads,
+        use_cache: bool = True,
+    ) -> Any:
+        key = cache_key(endpoint, params)
+        cached = market_cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached
+
+        timeout = aiohttp.ClientTimeout(total=ENDPOINT_TIMEOUTS[endpoint])
+        api = self._api_name(base)
+        governor = governor_for(api)
+        weight = request_weight(endpoint, params)
+        for attempt in range(MAX_RETRIES + 1):
+            await governor.acquire_async(weight)
+            started = time.perf_counter()
+            try:
+                async with self.session().get(f"{base}/{endpoint}", params=params, timeout=timeout) as resp:
+                    body = await resp.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                record_request(api, endpoint, "error", time.perf_counter() - started, weight)
+                if attempt == MAX_RETRIES:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            record_request(
+                api, endpoint, str(resp.status), time.perf_counter() - started, weight,
+                resp.headers.get("X-MBX-USED-WEIGHT-1M"),
+            )
+            governor.observe(resp.status, resp.headers)
+            if resp.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            await asyncio.sleep(retry_wait(resp.status, attempt))
+        resp.raise_for_status()
+
+        with decode_seconds.time(endpoint=endpoint):
+            data = decode(body)
+        if use_cache:
+            market_cache.put(key, data, len(body), ttl_for(endpoint, params))
+        return data
+
+    async def load_kline_arrays(
+        self, start_time: Optional[int] = None, end_time: Optional[int] = None
+    ) -> KlineArrays:
+        params: Dict[str, Any] = {"symbol": self.symbol, "interval": self.interval, "limit": self.limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return await self._get_json(self.binanc_api, "klines", params, decode_klines)
+
+    async def load_klines(self) -> pd.DataFrame:
+        return kline_frame(*await self.load_kline_arrays())
+
+    async def load_levels(self) -> BookLevels:
+        return await self._get_json(
+            self.binanc_api, "depth", {"symbol": self.symbol, "limit": self.limit}, decode_depth
+        )
+
+    async def load_orderbook(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        return (await self.load_levels()).frames()
+
+    async def load_depth_snapshot(self) -> Dict[str, Any]:
+        return await self._get_json(
+            self.binanc_api, "depth", {"symbol": self.symbol, "limit": self.limit}, use_cache=False
+        )
+
+    async def load_trade_tape(
+        self, from_id: Optional[int] = None, start_time: Optional[int] = None
+    ) -> TradeTape:
+        params: Dict[str, Any] = {"symbol": self.symbol, "limit": self.limit}
+        if from_id is not None:
+            params["fromId"] = from_id
+        if start_time is not None:
+            params["startTime"] = start_time
+        return await self._get_json(self.binanc_api, "aggTrades", params, decode_agg_trades)
+
+    async def load_trades(self) -> pd.DataFrame:
+        return (await self.load_trade_tape()).frame()
+
+    async def load_funding(self) -> pd.DataFrame:
+        data = await self._get_json(self.binanc_fapi, "fundingRate", {"symbol": self.symbol, "limit": self.limit})
+        return funding_to_df(data)
+
+    async def load_oi(self) -> pd.DataFrame:
+        data = await self._get_json(self.binanc_fapi, "openInterest", {"symbol": self.symbol})
+        return oi_to_df(data)
+
+    async def load_tickers_24hr(self) -> List[Dict[str, Any]]:
+        return await self._get_json(self.binanc_api, "ticker/24hr", {})
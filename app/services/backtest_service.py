@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from os import environ
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analytic import BacktestAnalyzer, BacktestStats, expand_grid, sweep
+from analytic.backtest import HORIZONS
+from .analytics_executor import AnalyticsOverloaded, AnalyticsTimeout, process_pool
+from .intervals import candle_open_ms, next_candle_open_ms
+from .kline_history import load_history_arrays_async
+from .metrics import stage_seconds
+from .report_cache import report_cache
+from .single_flight import coalesced
+from .weight_governor import BACKGROUND, request_priority
+
+BACKTEST_CANDLES = int(environ.get("BACKTEST_CANDLES", "20000"))
+# Ten years of hourly candles.
+MAX_BACKTEST_CANDLES = int(environ.get("MAX_BACKTEST_CANDLES", "87600"))
+BACKTEST_WORKERS = int(environ.get("BACKTEST_WORKERS", "0")) or os.cpu_count() or 1
+BACKTEST_TIMEOUT = float(environ.get("BACKTEST_TIMEOUT", "120"))
+# A sweep keeps every worker busy; further sweeps are turned away.
+BACKTEST_MAX_RUNNING = int(environ.get("BACKTEST_MAX_RUNNING", "1"))
+
+# Sweeps get their own pool so a long one never holds up reports.
+_pool: Optional[ProcessPoolExecutor] = None
+_running = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = process_pool(BACKTEST_WORKERS)
+    return _pool
+
+
+def shutdown_backtests() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _release(_: asyncio.Future) -> None:
+    global _running
+    _running -= 1
+
+
+async def _sweep(close: np.ndarray, kind: str) -> List[BacktestStats]:
+    # A sweep is admitted as a whole: one chunk per worker, each building
+    # only the indicators its combinations need and evaluating them as one
+    # (combos, candles) matrix.
+    global _running
+    if _running >= BACKTEST_MAX_RUNNING:
+        raise AnalyticsOverloaded(f"{_running} backtests running")
+
+    combos = expand_grid(kind)
+    chunks = [combos[i::BACKTEST_WORKERS] for i in range(min(BACKTEST_WORKERS, len(combos)))]
+    pool = _get_pool()
+    jobs: List[Future] = []
+    finished = False
+    try:
+        jobs.extend(pool.submit(sweep, close, kind, chunk, HORIZONS) for chunk in chunks)
+        waiters = [asyncio.wrap_future(job) for job in jobs]
+        # The slot is held until every chunk has finished or been dropped,
+        # not until the caller stops waiting.
+        _running += 1
+        asyncio.gather(*waiters, return_exceptions=True).add_done_callback(_release)
+
+        done, pending = await asyncio.wait(waiters, timeout=BACKTEST_TIMEOUT, return_when=asyncio.FIRST_EXCEPTION)
+        failed = next((w.exception() for w in done if w.exception() is not None), None)
+        if failed is not None:
+            raise failed
+        if pending:
+            raise AnalyticsTimeout(f"backtest {kind} exceeded {BACKTEST_TIMEOUT}s")
+        finished = True
+    finally:
+        if not finished:
+            # Chunks still queued are dropped; running ones cannot be interrupted.
+            for job in jobs:
+                job.cancel()
+    return [stats for w in waiters for stats in w.result()]
+
+
+@coalesced("backtest")
+async def run_backtest(symbol: str, interval: str, kind: str, candles: int) -> str:
+    candles = min(candles, MAX_BACKTEST_CANDLES)
+    now_ms = int(time.time() * 1000)
+    key = ("backtest", symbol, interval, kind, candles, next_candle_open_ms(interval, now_ms))
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Deep history is paged at background priority so reports stay fast.
+    token = request_priority.set(BACKGROUND)
+    try:
+        with stage_seconds.time(stage="fetch", report="backtest"):
+            times, values = await load_history_arrays_async(symbol, interval, candles + 1)
+    finally:
+        request_priority.reset(token)
+    closed = times < candle_open_ms(interval, now_ms)
+    times, close = times[closed], np.ascontiguousarray(values[closed, 3])
+
+    with stage_seconds.time(stage="sweep", report="backtest"):
+        stats = await _sweep(close, kind) if len(close) > max(HORIZONS) else []
+    index = pd.DatetimeIndex(times.view("datetime64[ms]"))
+    text = BacktestAnalyzer(symbol, interval, kind, stats, index).analyze().summary
+    report_cache.put(key, text, next_candle_open_ms(interval, now_ms) / 1000)
+    return text
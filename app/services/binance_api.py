@@ -1,9 +1,105 @@
-
-from typing import Literal, Tuple
+import json
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 import requests
 import pandas as pd
 from os import environ
 
+from analytic import BookLevels, TradeTape
+from .decoders import KlineArrays, decode_klines, decode_depth, decode_agg_trades, kline_frame
+from .market_cache import market_cache, cache_key, ttl_for
+from .metrics import decode_seconds, record_request
+from .weight_governor import MAX_RETRIES, RETRY_STATUSES, backoff_delay, governor_for, retry_wait
+
+
+ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "klines": 10,
+    "depth": 5,
+    "aggTrades": 5,
+    "fundingRate": 5,
+    "openInterest": 3,
+    "ticker/24hr": 10,
+}
+
+# Request weights from the Binance API docs; depth scales with the limit.
+ENDPOINT_WEIGHTS: Dict[str, int] = {
+    "klines": 2,
+    "aggTrades": 4,
+    "fundingRate": 1,
+    "openInterest": 1,
+}
+DEPTH_WEIGHTS = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+
+_session = requests.Session()
+
+
+def request_weight(endpoint: str, params: Dict[str, Any]) -> int:
+    if endpoint == "depth":
+        limit = int(params.get("limit", 100))
+        return next((weight for bound, weight in DEPTH_WEIGHTS if limit <= bound), DEPTH_WEIGHTS[-1][1])
+    if endpoint == "ticker/24hr":
+        return 2 if "symbol" in params else 80
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+def klines_to_df(data: Any) -> pd.DataFrame:
+    df = pd.DataFrame(data, columns=[
+        "open_time", "open", "high", "low", "close", "volume",
+        "close_time", "quote_asset_volume", "trades",
+        "taker_base_vol", "taker_quote_vol", "ignore"
+    ])
+
+    df["open"] = df["open"].astype(float)
+    df["high"] = df["high"].astype(float)
+    df["low"] = df["low"].astype(float)
+    df["close"] = df["close"].astype(float)
+    df["volume"] = df["volume"].astype(float)
+    df["time"] = pd.to_datetime(df["open_time"], unit="ms")
+
+    df = df[["time", "open", "high", "low", "close", "volume"]]
+    df.set_index("time", inplace=True)
+    return df
+
+
+def orderbook_to_dfs(data: Any) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    bids = pd.DataFrame(data["bids"], columns=["price", "qty"])
+    asks = pd.DataFrame(data["asks"], columns=["price", "qty"])
+
+    bids["price"] = bids["price"].astype(float)
+    bids["qty"] = bids["qty"].astype(float)
+
+    asks["price"] = asks["price"].astype(float)
+    asks["qty"] = asks["qty"].astype(float)
+
+    return bids, asks
+
+
+def trades_to_df(data: Any) -> pd.DataFrame:
+    df = pd.DataFrame(data)
+    df.rename(columns={"q": "qty", "p": "price", "m": "is_sell"}, inplace=True)
+
+    df["price"] = df["price"].astype(float)
+    df["qty"] = df["qty"].astype(float)
+
+    df["side"] = df["is_sell"].map(lambda x: "sell" if x else "buy")
+
+    return df
+
+
+def funding_to_df(data: Any) -> pd.DataFrame:
+    df = pd.DataFrame(data)
+    df["funding_rate"] = df["fundingRate"].astype(float)
+    df["time"] = pd.to_datetime(df["fundingTime"], unit="ms")
+    return df[["time", "funding_rate"]]
+
+
+def oi_to_df(data: Any) -> pd.DataFrame:
+    df = pd.DataFrame([data])
+    df["oi"] = df["openInterest"].astype(float)
+    df["time"] = pd.Timestamp.utcnow()
+    return df[["time", "oi"]]
+
+
 class BinanceApi():
 
     def __init__(self, symbol:str, interval: str = "1h", limit: int = 500):
@@ -13,70 +109,90 @@ class BinanceApi():
         self.binanc_api = environ.get('BINANCE_API')
         self.binanc_fapi= environ.get('BINANCE_FAPI')
 
-    def load_klines(self) -> pd.DataFrame:
-        url = f'{self.binanc_api}/klines?symbol={self.symbol}&interval={self.interval}&limit={self.limit}'
-        resp = requests.get(url, timeout=10)
+    def _api_name(self, base: str) -> str:
+        return "futures" if base == self.binanc_fapi else "spot"
+
+    def _get_json(
+        self,
+        base: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        decode: Callable[[bytes], Any] = json.loads,
+    ) -> Any:
+        # Each endpoint has a single decoder, so the cache holds decoded values.
+        key = cache_key(endpoint, params)
+        cached = market_cache.get(key)
+        if cached is not None:
+            return cached
+
+        api = self._api_name(base)
+        governor = governor_for(api)
+        weight = request_weight(endpoint, params)
+        for attempt in range(MAX_RETRIES + 1):
+            governor.acquire(weight)
+            started = time.perf_counter()
+            try:
+                resp = _session.get(
+                    f"{base}/{endpoint}",
+                    params=params,
+                    timeout=ENDPOINT_TIMEOUTS[endpoint],
+                )
+            except requests.RequestException:
+                record_request(api, endpoint, "error", time.perf_counter() - started, weight)
+                if attempt == MAX_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            record_request(
+                api, endpoint, str(resp.status_code), time.perf_counter() - started, weight,
+                resp.headers.get("X-MBX-USED-WEIGHT-1M"),
+            )
+            governor.observe(resp.status_code, resp.headers)
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            time.sleep(retry_wait(resp.status_code, attempt))
         resp.raise_for_status()
-        data = resp.json()
+        with decode_seconds.time(endpoint=endpoint):
+            data = decode(resp.content)
+        market_cache.put(key, data, len(resp.content), ttl_for(endpoint, params))
+        return data
+
+    def load_kline_arrays(
+        self, start_time: Optional[int] = None, end_time: Optional[int] = None
+    ) -> KlineArrays:
+        params: Dict[str, Any] = {"symbol": self.symbol, "interval": self.interval, "limit": self.limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return self._get_json(self.binanc_api, "klines", params, decode_klines)
 
-        df = pd.DataFrame(data, columns=[
-            "open_time", "open", "high", "low", "close", "volume",
-            "close_time", "quote_asset_volume", "trades",
-            "taker_base_vol", "taker_quote_vol", "ignore"
-        ])
-
-        df["open"] = df["open"].astype(float)
-        df["high"] = df["high"].astype(float)
-        df["low"] = df["low"].astype(float)
-        df["close"] = df["close"].astype(float)
-        df["volume"] = df["volume"].astype(float)
-        df["time"] = pd.to_datetime(df["open_time"], unit="ms")
+    def load_klines(self) -> pd.DataFrame:
+        return kline_frame(*self.load_kline_arrays())
 
-        df = df[["time", "open", "high", "low", "close", "volume"]]
-        df.set_index("time", inplace=True)
-        return df
+    def load_levels(self) -> BookLevels:
+        return self._get_json(self.binanc_api, "depth", {"symbol": self.symbol, "limit": self.limit}, decode_depth)
 
     def load_orderbook(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        url = f'{self.binanc_api}/depth?symbol={self.symbol}&limit={self.limit}'
-        resp = requests.get(url)
-        data = resp.json()
-
-        bids = pd.DataFrame(data["bids"], columns=["price", "qty"])
-        asks = pd.DataFrame(data["asks"], columns=["price", "qty"])
-
-        bids["price"] = bids["price"].astype(float)
-        bids["qty"] = bids["qty"].astype(float)
-
-        asks["price"] = asks["price"].astype(float)
-        asks["qty"] = asks["qty"].astype(float)
-
-        return bids, asks
-
-    def load_trades(self):
-        url = f'{self.binanc_api}/aggTrades?symbol={self.symbol}&limit={self.limit}'
-        data = requests.get(url).json()
-
-        df = pd.DataFrame(data)
-        df.rename(columns={"q": "qty", "p": "price", "m": "is_sell"}, inplace=True)
-
-        df["price"] = df["price"].astype(float)
-        df["qty"] = df["qty"].astype(float)
+        return self.load_levels().frames()
 
-        df["side"] = df["is_sell"].map(lambda x: "sell" if x else "buy")
+    def load_trade_tape(
+        self, from_id: Optional[int] = None, start_time: Optional[int] = None
+    ) -> TradeTape:
+        params: Dict[str, Any] = {"symbol": self.symbol, "limit": self.limit}
+        if from_id is not None:
+            params["fromId"] = from_id
+        if start_time is not None:
+            params["startTime"] = start_time
+        return self._get_json(self.binanc_api, "aggTrades", params, decode_agg_trades)
 
-        return df
+    def load_trades(self) -> pd.DataFrame:
+        return self.load_trade_tape().frame()
 
     def load_funding(self)-> pd.DataFrame:
-        url = f'{self.binanc_fapi}/fundingRate?symbol={self.symbol}&limit={self.limit}'
-        df = pd.DataFrame(requests.get(url).json())
-        df["funding_rate"] = df["fundingRate"].astype(float)
-        df["time"] = pd.to_datetime(df["fundingTime"], unit="ms")
-        return df[["time", "funding_rate"]]
+        data = self._get_json(self.binanc_fapi, "fundingRate", {"symbol": self.symbol, "limit": self.limit})
+        return funding_to_df(data)
 
     def load_oi(self)->pd.DataFrame:
-        url = f"{self.binanc_fapi}/openInterest?symbol={self.symbol}"
-        data = requests.get(url).json()
-        df = pd.DataFrame([data])
-        df["oi"] = df["openInterest"].astype(float)
-        df["time"] = pd.Timestamp.utcnow()
-        return df[["time", "oi"]]
+        data = self._get_json(self.binanc_fapi, "openInterest", {"symbol": self.symbol})
+        return oi_to_df(data)
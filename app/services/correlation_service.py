@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from functools import partial
+from os import environ
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from analytic import CorrelationMatrix, CorrelationSnapshot, PeerAnalyzer
+from .analytics_executor import analytics_executor
+from .fetch_planner import FetchPlan
+from .kline_store import load_candle_arrays_async, stack_series
+from .single_flight import coalesced
+from .universe import load_universe
+
+CORRELATION_UNIVERSE_SIZE = int(environ.get("CORRELATION_UNIVERSE_SIZE", "50"))
+CORRELATION_CLUSTER_THRESHOLD = float(environ.get("CORRELATION_CLUSTER_THRESHOLD", "0.8"))
+CORRELATION_MATRIX_CACHE = int(environ.get("CORRELATION_MATRIX_CACHE", "16"))
+PEERS_TOP = 5
+
+MatrixKey = Tuple[str, int, Tuple[str, ...]]
+
+# Matrix plus the open time of the bar its last return belongs to.
+_matrices: "OrderedDict[MatrixKey, Tuple[CorrelationMatrix, int]]" = OrderedDict()
+
+
+def _complete_closes(symbols: List[str], closes: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    complete = ~np.isnan(closes).any(axis=1)
+    return [s for s, ok in zip(symbols, complete) if ok], closes[complete]
+
+
+def update_matrix(
+    interval: str, symbols: List[str], times: np.ndarray, closes: np.ndarray
+) -> Optional[CorrelationMatrix]:
+    symbols, closes = _complete_closes(symbols, closes)
+    if len(symbols) < 2 or closes.shape[1] < 3:
+        return None
+
+    key = (interval, closes.shape[1], tuple(symbols))
+    last_open = int(times[-1])
+    cached = _matrices.get(key)
+
+    if cached is not None:
+        matrix, cached_open = cached
+        pos = int(np.searchsorted(times, cached_open))
+        if pos < len(times) and int(times[pos]) == cached_open:
+            # The bar we last saw may have moved or closed since; after it
+            # only the newly opened bars are pushed.
+            matrix.revise(closes[:, pos])
+            for col in range(pos + 1, len(times)):
+                matrix.push(closes[:, col])
+            _matrices[key] = (matrix, last_open)
+            _matrices.move_to_end(key)
+            return matrix
+
+    matrix = CorrelationMatrix(symbols, closes)
+    _matrices[key] = (matrix, last_open)
+    while len(_matrices) > CORRELATION_MATRIX_CACHE:
+        _matrices.popitem(last=False)
+    return matrix
+
+
+async def load_correlation_snapshot(
+    symbols: List[str], interval: str, candles_limit: int
+) -> Optional[CorrelationSnapshot]:
+    # A stable symbol order keeps the cached matrix valid when volume ranks shuffle.
+    plan = FetchPlan()
+    for symbol in sorted(set(symbols)):
+        plan.add(symbol, partial(load_candle_arrays_async, symbol, interval, candles_limit))
+    fetched = await plan.run_async()
+
+    stacked_symbols, times, stacked = stack_series(fetched.values, (3,))
+    matrix = update_matrix(interval, stacked_symbols, times, stacked[0])
+    return matrix.snapshot() if matrix is not None else None
+
+
+def render_peers_report(symbol: str, snapshot: Optional[CorrelationSnapshot], interval: str) -> str:
+    if snapshot is None:
+        return f"Похожие монеты для {symbol}: недостаточно данных."
+    analyzer = PeerAnalyzer(symbol, snapshot, interval, PEERS_TOP, CORRELATION_CLUSTER_THRESHOLD)
+    return analyzer.analyze().summary
+
+
+@coalesced("peers")
+async def build_peers_report_async(symbol: str, interval: str, candles_limit: int) -> str:
+    universe = await load_universe("CORRELATION_UNIVERSE", CORRELATION_UNIVERSE_SIZE)
+    if symbol not in universe:
+        universe = universe + [symbol]
+
+    snapshot = await load_correlation_snapshot(universe, interval, candles_limit)
+    return await analytics_executor.run(render_peers_report, symbol, snapshot, interval)
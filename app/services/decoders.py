@@ -0,0 +1,110 @@
+import json
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytic import BookLevels, TradeTape
+
+KLINE_WIDTH = 12
+KLINE_COLUMNS = ["open", "high", "low", "close", "volume"]
+AGG_TRADE_KEYS = ("a", "p", "q", "f", "l", "T", "m", "M")
+
+# Binance sends every number as a bare int or a quoted decimal string, so once
+# brackets and quotes are gone a payload is a flat comma-separated list that
+# NumPy parses straight into float64 without building Python objects.
+_KLINE_DELETE = b'[]"'
+_TRADE_DELETE = b'[]{}":' + "".join(AGG_TRADE_KEYS).encode()
+_NUMBER_BYTES = b"0123456789+-.eE,\t\n\r "
+
+KlineArrays = Tuple[np.ndarray, np.ndarray]
+
+
+def _numbers(text: bytes, width: int, rows: int) -> Optional[np.ndarray]:
+    # rows comes from the payload's own brackets. fromstring stops quietly at
+    # the first token it cannot read (older NumPy only warns), so anything but
+    # plain numbers, or a count that disagrees with the rows, goes to json.
+    if not rows and not text.strip():
+        return np.empty((0, width))
+    if text.translate(None, _NUMBER_BYTES) or text.count(b",") + 1 != rows * width:
+        return None
+    try:
+        flat = np.fromstring(text, sep=",")
+    except ValueError:
+        return None
+    if flat.size != rows * width:
+        return None
+    return flat.reshape(rows, width)
+
+
+def decode_klines(body: bytes) -> KlineArrays:
+    table = _numbers(body.translate(None, _KLINE_DELETE), KLINE_WIDTH, body.count(b"[") - 1)
+    if table is None:
+        rows = json.loads(body)
+        times = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        return times, np.array([row[1:6] for row in rows], dtype=np.float64).reshape(len(rows), 5)
+
+    # Open times are below 2**53, so the float64 round trip is exact.
+    return table[:, 0].astype(np.int64), np.ascontiguousarray(table[:, 1:6])
+
+
+def kline_frame(times: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    index = pd.DatetimeIndex(times.view("datetime64[ms]"), name="time")
+    return pd.DataFrame(values, index=index, columns=KLINE_COLUMNS, copy=False)
+
+
+def _side(body: bytes, key: bytes) -> np.ndarray:
+    start = body.index(b"[", body.index(b'"%s":' % key))
+    end = body.index(b"]]", start) + 2 if body[start + 1:start + 2] != b"]" else start + 2
+    side = body[start:end]
+    levels = _numbers(side.translate(None, _KLINE_DELETE), 2, side.count(b"[") - 1)
+    if levels is None:
+        levels = np.array(json.loads(side), dtype=np.float64).reshape(-1, 2)
+    return levels
+
+
+def _ordered(levels: np.ndarray, descending: bool) -> Tuple[np.ndarray, np.ndarray]:
+    prices = levels[:, 0]
+    steps = np.diff(prices)
+    if (steps > 0).any() if descending else (steps < 0).any():
+        order = np.argsort(-prices if descending else prices, kind="stable")
+        levels = levels[order]
+    return np.ascontiguousarray(levels[:, 0]), np.ascontiguousarray(levels[:, 1])
+
+
+def decode_depth(body: bytes) -> BookLevels:
+    bid_prices, bid_qty = _ordered(_side(body, b"bids"), descending=True)
+    ask_prices, ask_qty = _ordered(_side(body, b"asks"), descending=False)
+    return BookLevels(bid_prices=bid_prices, bid_qty=bid_qty, ask_prices=ask_prices, ask_qty=ask_qty)
+
+
+def _trade_keys_match(body: bytes) -> bool:
+    first = body.find(b"}")
+    if first < 0:
+        return True
+    return tuple(json.loads(body[body.index(b"{"):first + 1])) == AGG_TRADE_KEYS
+
+
+def decode_agg_trades(body: bytes) -> TradeTape:
+    table = None
+    if _trade_keys_match(body):
+        text = body.replace(b"true", b"1").replace(b"false", b"0").translate(None, _TRADE_DELETE)
+        table = _numbers(text, len(AGG_TRADE_KEYS), body.count(b"{"))
+
+    if table is None:
+        data = json.loads(body)
+        return TradeTape(
+            agg_id=np.fromiter((t["a"] for t in data), dtype=np.int64, count=len(data)),
+            price=np.array([t["p"] for t in data], dtype=np.float64),
+            qty=np.array([t["q"] for t in data], dtype=np.float64),
+            time=np.fromiter((t["T"] for t in data), dtype=np.int64, count=len(data)),
+            is_sell=np.fromiter((t["m"] for t in data), dtype=bool, count=len(data)),
+        )
+
+    return TradeTape(
+        agg_id=table[:, 0].astype(np.int64),
+        price=np.ascontiguousarray(table[:, 1]),
+        qty=np.ascontiguousarray(table[:, 2]),
+        time=table[:, 5].astype(np.int64),
+        is_sell=table[:, 6] != 0,
+    )
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from os import environ
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import errors_total
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(environ.get("FETCH_WORKERS", "16")),
+    thread_name_prefix="fetch",
+)
+
+
+@dataclass
+class FetchResults:
+    values: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    def ok(self, *names: str) -> bool:
+        return all(name in self.values for name in names)
+
+
+class FetchPlan:
+    def __init__(self):
+        self._jobs: Dict[str, Callable[[], Any]] = {}
+
+    def add(self, name: str, func: Callable[[], Any]) -> "FetchPlan":
+        self._jobs[name] = func
+        return self
+
+    def _record(self, results: FetchResults, name: str, value: Any, error: Optional[BaseException]) -> None:
+        if error is None:
+            results.values[name] = value
+        else:
+            logger.warning("fetch %s failed: %r", name, error)
+            errors_total.inc(stage="fetch", error=type(error).__name__)
+            results.errors[name] = error
+
+    def run(self, timeout: Optional[float] = None) -> FetchResults:
+        futures = {name: _executor.submit(func) for name, func in self._jobs.items()}
+        results = FetchResults()
+        for name, future in futures.items():
+            try:
+                value, error = future.result(timeout=timeout), None
+            except Exception as e:
+                value, error = None, e
+            self._record(results, name, value, error)
+        return results
+
+    async def run_async(self) -> FetchResults:
+        coros: Dict[str, Awaitable[Any]] = {name: func() for name, func in self._jobs.items()}
+        values = await asyncio.gather(*coros.values(), return_exceptions=True)
+        results = FetchResults()
+        for name, value in zip(coros.keys(), values):
+            if isinstance(value, BaseException):
+                self._record(results, name, None, value)
+            else:
+                self._record(results, name, value, None)
+        return results
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Set, Tuple
+
+INTERVAL_MS: Dict[str, int] = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+# Binance weekly candles open on Monday, the epoch was a Thursday.
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def interval_ms(interval: str) -> int:
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return INTERVAL_MS[interval]
+
+
+def interval_offset_ms(interval: str) -> int:
+    return _WEEK_OFFSET_MS if interval == "1w" else 0
+
+
+def candle_open_ms(interval: str, ts_ms: int) -> int:
+    if interval == "1M":
+        dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+        return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+    step = interval_ms(interval)
+    offset = interval_offset_ms(interval)
+    return (ts_ms - offset) // step * step + offset
+
+
+def next_candle_open_ms(interval: str, ts_ms: int) -> int:
+    if interval == "1M":
+        dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+        year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+        return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+    return candle_open_ms(interval, ts_ms) + interval_ms(interval)
+
+
+def next_close(intervals: Iterable[str], ts_ms: int) -> Tuple[int, Set[str]]:
+    # The nearest candle boundary among intervals and every interval that
+    # closes a candle on it (on a 4h boundary the 1h candle closes too).
+    intervals = set(intervals)
+    boundary = min(next_candle_open_ms(interval, ts_ms) for interval in intervals)
+    return boundary, {i for i in intervals if candle_open_ms(i, boundary) == boundary}
@@ -0,0 +1,250 @@
+import asyncio
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from os import environ
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .async_binance_api import AsyncBinanceApi
+from .decoders import KlineArrays
+from .intervals import INTERVAL_MS, candle_open_ms
+
+HISTORY_DIR = environ.get("KLINE_HISTORY_DIR", "kline_history")
+HISTORY_MAX_SERIES = int(environ.get("KLINE_HISTORY_MAX_SERIES", "256"))
+HISTORY_CONCURRENCY = int(environ.get("KLINE_HISTORY_CONCURRENCY", "4"))
+PAGE = 1000
+
+# One raw little-endian file per column; open_time is written last so a torn
+# append never exposes a time without its values.
+COLUMNS: Dict[str, np.dtype] = {
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+    "open_time": np.dtype("<i8"),
+}
+VALUE_COLUMNS = ["open", "high", "low", "close", "volume"]
+START_MARKER = "start_reached"
+
+
+class KlineHistory:
+    # Closed candles only, oldest first. New bars are appended in place;
+    # backfilling older bars writes a new generation directory and flips the
+    # CURRENT pointer atomically, so readers never see half-rewritten columns.
+    def __init__(self, root: str, symbol: str, interval: str):
+        self.path = os.path.join(root, symbol, interval)
+        self.symbol = symbol
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.memmap] = {}
+        os.makedirs(self.path, exist_ok=True)
+        self._generation = self._read_current()
+        self._rows = self._recover()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _read_current(self) -> str:
+        pointer = os.path.join(self.path, "CURRENT")
+        if os.path.exists(pointer):
+            with open(pointer, encoding="ascii") as f:
+                generation = f.read().strip()
+        else:
+            generation = "g0"
+        os.makedirs(os.path.join(self.path, generation), exist_ok=True)
+
+        # Leftovers from an interrupted backfill.
+        for name in os.listdir(self.path):
+            if name.startswith("g") and name != generation:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        return generation
+
+    def _column_path(self, name: str, generation: Optional[str] = None) -> str:
+        return os.path.join(self.path, generation or self._generation, f"{name}.bin")
+
+    def _recover(self) -> int:
+        sizes = {}
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            sizes[name] = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        rows = min(sizes.values())
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            if os.path.exists(path) and sizes[name] != rows:
+                os.truncate(path, rows * dtype.itemsize)
+        return rows
+
+    @property
+    def start_reached(self) -> bool:
+        return os.path.exists(os.path.join(self.path, START_MARKER))
+
+    def mark_start_reached(self) -> None:
+        open(os.path.join(self.path, START_MARKER), "a").close()
+
+    def _column(self, name: str) -> np.ndarray:
+        if not self._rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) != self._rows:
+            mapped = np.memmap(self._column_path(name), dtype=COLUMNS[name], mode="r", shape=(self._rows,))
+            self._maps[name] = mapped
+        return mapped
+
+    @property
+    def first_open_time(self) -> Optional[int]:
+        return int(self._column("open_time")[0]) if self._rows else None
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        return int(self._column("open_time")[-1]) if self._rows else None
+
+    def _write(self, generation: str, times: np.ndarray, values: np.ndarray, mode: str) -> None:
+        for i, name in enumerate(VALUE_COLUMNS):
+            with open(self._column_path(name, generation), mode) as f:
+                f.write(np.ascontiguousarray(values[:, i], dtype=COLUMNS[name]).tobytes())
+        with open(self._column_path("open_time", generation), mode) as f:
+            f.write(np.ascontiguousarray(times, dtype=COLUMNS["open_time"]).tobytes())
+
+    def append(self, times: np.ndarray, values: np.ndarray) -> None:
+        with self._lock:
+            if self._rows:
+                fresh = times > self.last_open_time
+                times, values = times[fresh], values[fresh]
+            if not len(times):
+                return
+            self._write(self._generation, times, values, "ab")
+            self._rows += len(times)
+
+    def prepend(self, times: np.ndarray, values: np.ndarray) -> None:
+        with self._lock:
+            if not self._rows:
+                self._write(self._generation, times, values, "ab")
+                self._rows = len(times)
+                return
+
+            older = times < self.first_open_time
+            times, values = times[older], values[older]
+            if not len(times):
+                return
+
+            generation = f"g{int(self._generation[1:]) + 1}"
+            os.makedirs(os.path.join(self.path, generation), exist_ok=True)
+            self._write(generation, times, values, "wb")
+            for name in COLUMNS:
+                with open(self._column_path(name, generation), "ab") as dst, \
+                        open(self._column_path(name), "rb") as src:
+                    shutil.copyfileobj(src, dst)
+
+            pointer = os.path.join(self.path, "CURRENT")
+            with open(pointer + ".tmp", "w", encoding="ascii") as f:
+                f.write(generation)
+            os.replace(pointer + ".tmp", pointer)
+
+            old = self._generation
+            self._maps.clear()
+            self._generation = generation
+            self._rows += len(times)
+            shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+
+    def arrays(self, limit: int) -> KlineArrays:
+        with self._lock:
+            start = max(self._rows - limit, 0)
+            # Only the requested tail is copied out of the mapped files.
+            times = np.array(self._column("open_time")[start:], dtype=np.int64)
+            values = np.empty((len(times), len(VALUE_COLUMNS)), dtype=np.float64)
+            for i, name in enumerate(VALUE_COLUMNS):
+                values[:, i] = self._column(name)[start:]
+            return times, values
+
+
+_histories: "OrderedDict[Tuple[str, str], KlineHistory]" = OrderedDict()
+_histories_lock = threading.Lock()
+
+
+def get_history(symbol: str, interval: str) -> KlineHistory:
+    key = (symbol, interval)
+    with _histories_lock:
+        history = _histories.get(key)
+        if history is None:
+            history = KlineHistory(HISTORY_DIR, symbol, interval)
+            _histories[key] = history
+            while len(_histories) > HISTORY_MAX_SERIES:
+                _histories.popitem(last=False)
+        else:
+            _histories.move_to_end(key)
+        return history
+
+
+def _concat(pages: List[KlineArrays]) -> KlineArrays:
+    pages = [page for page in pages if len(page[0])]
+    if not pages:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(VALUE_COLUMNS)))
+    times = np.concatenate([page[0] for page in pages])
+    values = np.concatenate([page[1] for page in pages])
+    times, first = np.unique(times, return_index=True)
+    return times, values[first]
+
+
+async def _fetch_before(symbol: str, interval: str, end_ms: int, needed: int) -> Tuple[KlineArrays, bool]:
+    # Pages are requested by endTime only. For fixed-size intervals the next
+    # few page boundaries are known up front, so they go out concurrently.
+    step = INTERVAL_MS.get(interval)
+    pages: List[KlineArrays] = []
+    cursor = end_ms
+    while needed > 0:
+        count = min(-(-needed // PAGE), HISTORY_CONCURRENCY) if step else 1
+        ends = [cursor - i * PAGE * (step or 0) for i in range(count)]
+        batch = await asyncio.gather(*(
+            AsyncBinanceApi(symbol, interval, PAGE).load_kline_arrays(end_time=end) for end in ends
+        ))
+        pages.extend(batch)
+
+        if any(len(times) < PAGE for times, _ in batch):
+            # A page came back short: the listing start is reached.
+            return _concat(pages), True
+        needed -= sum(len(times) for times, _ in batch)
+        cursor = int(batch[-1][0][0]) - 1
+    return _concat(pages), False
+
+
+async def load_history_arrays_async(symbol: str, interval: str, limit: int) -> KlineArrays:
+    # Every disk step (recovery, appends, the backfill's generation rewrite
+    # and copying the tail out) runs on a worker thread, off the event loop.
+    history = await asyncio.to_thread(get_history, symbol, interval)
+    current_open = candle_open_ms(interval, int(time.time() * 1000))
+    open_bar: Optional[KlineArrays] = None
+
+    def keep_closed(times: np.ndarray, values: np.ndarray) -> KlineArrays:
+        nonlocal open_bar
+        closed = times < current_open
+        if not closed.all():
+            open_bar = times[~closed][-1:], values[~closed][-1:]
+        return times[closed], values[closed]
+
+    if len(history):
+        cursor = history.last_open_time + 1
+        while True:
+            times, values = await AsyncBinanceApi(symbol, interval, PAGE).load_kline_arrays(start_time=cursor)
+            await asyncio.to_thread(history.append, *keep_closed(times, values))
+            if len(times) < PAGE:
+                break
+            cursor = int(times[-1]) + 1
+
+    missing = limit - len(history) - (1 if open_bar is not None else 0)
+    if missing > 0 and not history.start_reached:
+        end_ms = history.first_open_time - 1 if len(history) else int(time.time() * 1000)
+        (times, values), reached = await _fetch_before(symbol, interval, end_ms, missing)
+        await asyncio.to_thread(history.prepend, *keep_closed(times, values))
+        if reached:
+            await asyncio.to_thread(history.mark_start_reached)
+
+    times, values = await asyncio.to_thread(history.arrays, limit - (1 if open_bar is not None else 0))
+    if open_bar is not None:
+        times = np.concatenate([times, open_bar[0]])
+        values = np.concatenate([values, open_bar[1]])
+    return times, values
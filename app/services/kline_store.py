@@ -0,0 +1,262 @@
+import threading
+import time
+from collections import OrderedDict
+from os import environ
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytic import IndicatorEngine, IndicatorValues
+from .binance_api import BinanceApi
+from .async_binance_api import AsyncBinanceApi
+from .decoders import kline_frame
+from .intervals import interval_ms
+from .kline_history import load_history_arrays_async
+from .metrics import stage_seconds
+
+COLUMNS = ["open", "high", "low", "close", "volume"]
+MAX_PAGE = 1000
+
+STORE_CAPACITY = int(environ.get("KLINE_STORE_CAPACITY", "1000"))
+STORE_MAX_SERIES = int(environ.get("KLINE_STORE_MAX_SERIES", "512"))
+
+
+class KlineStore:
+    def __init__(self, symbol: str, interval: str, capacity: int = STORE_CAPACITY):
+        self.symbol = symbol
+        self.interval = interval
+        self.capacity = capacity
+        self._slack = max(capacity // 4, 1)
+        self._times, self._values = self._allocate()
+        self._start = 0
+        self._end = 0
+        # Seeded on the first snapshot, then fed every bar as it arrives.
+        self._engine: Optional[IndicatorEngine] = None
+        # Set once a frame has been handed out as a view of the buffers.
+        self._shared = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def _allocate(self) -> Tuple[np.ndarray, np.ndarray]:
+        size = self.capacity + self._slack
+        return np.empty(size, dtype=np.int64), np.empty((size, len(COLUMNS)), dtype=np.float64)
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        return int(self._times[self._end - 1]) if len(self) else None
+
+    def missing_candles(self, now_ms: int) -> int:
+        return (now_ms - self.last_open_time) // interval_ms(self.interval) + 1
+
+    def needs_reset(self, limit: int, now_ms: int) -> bool:
+        return len(self) < limit or self.missing_candles(now_ms) > MAX_PAGE
+
+    def reset(self, times: np.ndarray, values: np.ndarray) -> None:
+        n = min(len(times), self.capacity)
+        new_times, new_values = self._allocate()
+        new_times[:n] = times[len(times) - n:]
+        new_values[:n] = values[len(values) - n:]
+
+        with self._lock:
+            # Fresh buffers, so frames handed out earlier keep their data.
+            self._times, self._values = new_times, new_values
+            self._start, self._end = 0, n
+            self._shared = False
+            self._engine = None
+
+    def merge(self, times: np.ndarray, values: np.ndarray) -> None:
+        if not len(self):
+            self.reset(times, values)
+            return
+
+        with self._lock:
+            last = self._times[self._end - 1]
+
+            # The still-open bar is revised, but never inside a frame already
+            # handed out: analyzers may be reading it on another thread.
+            # New bars go past _end, which no earlier frame covers.
+            same = times == last
+            if same.any():
+                if self._shared:
+                    self._compact(0)
+                self._values[self._end - 1] = values[same][-1]
+                if self._engine is not None:
+                    self._engine.revise(*self._hlc(self._end - 1))
+
+            fresh = times > last
+            times, values = times[fresh], values[fresh]
+            n = len(times)
+            if n == 0:
+                return
+
+            if n >= self.capacity:
+                times, values = times[n - self.capacity:], values[n - self.capacity:]
+                n = self.capacity
+                # Bars were skipped; the engine would run across the gap.
+                self._engine = None
+
+            if self._end + n > len(self._times):
+                self._compact(n)
+
+            self._times[self._end:self._end + n] = times
+            self._values[self._end:self._end + n] = values
+            self._end += n
+            self._start = max(self._start, self._end - self.capacity)
+            if self._engine is not None:
+                for i in range(self._end - n, self._end):
+                    self._engine.append(*self._hlc(i))
+
+    def _compact(self, incoming: int) -> None:
+        keep = min(len(self), self.capacity - incoming)
+        new_times, new_values = self._allocate()
+        new_times[:keep] = self._times[self._end - keep:self._end]
+        new_values[:keep] = self._values[self._end - keep:self._end]
+        self._times, self._values = new_times, new_values
+        self._start, self._end = 0, keep
+        self._shared = False
+
+    def _hlc(self, i: int) -> Tuple[float, float, float]:
+        _, high, low, close, _ = self._values[i]
+        return float(high), float(low), float(close)
+
+    def _frame_unlocked(self, limit: int) -> pd.DataFrame:
+        start = max(self._end - limit, self._start)
+        times = self._times[start:self._end]
+        values = self._values[start:self._end]
+
+        index = pd.DatetimeIndex(times.view("datetime64[ms]"), name="time")
+        self._shared = True
+        return pd.DataFrame(values, index=index, columns=COLUMNS, copy=False)
+
+    def arrays(self, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            start = max(self._end - limit, self._start)
+            return self._times[start:self._end].copy(), self._values[start:self._end].copy()
+
+    def frame(self, limit: int) -> pd.DataFrame:
+        with self._lock:
+            return self._frame_unlocked(limit)
+
+    def snapshot(self, limit: int) -> Tuple[pd.DataFrame, Optional[IndicatorValues]]:
+        with self._lock:
+            if self._engine is None:
+                with stage_seconds.time(stage="indicators", report="candles"):
+                    self._engine = IndicatorEngine.from_frame(self._frame_unlocked(len(self)))
+            # One engine serves every limit: moving averages, RSI and ATR
+            # match a pass over the last `limit` candles, MACD's EMAs run
+            # over the whole stored series.
+            return self._frame_unlocked(limit), self._engine.latest(max_bars=limit)
+
+
+_stores: "OrderedDict[Tuple[str, str], KlineStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_store(symbol: str, interval: str) -> KlineStore:
+    key = (symbol, interval)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = KlineStore(symbol, interval)
+            _stores[key] = store
+            while len(_stores) > STORE_MAX_SERIES:
+                _stores.popitem(last=False)
+        else:
+            _stores.move_to_end(key)
+        return store
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _refresh(store: KlineStore, limit: int) -> None:
+    now_ms = _now_ms()
+    if store.needs_reset(limit, now_ms):
+        store.reset(*BinanceApi(store.symbol, store.interval, limit).load_kline_arrays())
+    else:
+        api = BinanceApi(store.symbol, store.interval, store.missing_candles(now_ms))
+        store.merge(*api.load_kline_arrays(start_time=store.last_open_time))
+
+
+async def _refresh_async(store: KlineStore, limit: int) -> None:
+    now_ms = _now_ms()
+    if store.needs_reset(limit, now_ms):
+        store.reset(*await AsyncBinanceApi(store.symbol, store.interval, limit).load_kline_arrays())
+    else:
+        api = AsyncBinanceApi(store.symbol, store.interval, store.missing_candles(now_ms))
+        store.merge(*await api.load_kline_arrays(start_time=store.last_open_time))
+
+
+def load_candles(symbol: str, interval: str, limit: int) -> pd.DataFrame:
+    if limit > STORE_CAPACITY:
+        return BinanceApi(symbol, interval, limit).load_klines()
+
+    store = get_store(symbol, interval)
+    _refresh(store, limit)
+    return store.frame(limit)
+
+
+def load_candle_snapshot(
+    symbol: str, interval: str, limit: int
+) -> Tuple[pd.DataFrame, Optional[IndicatorValues]]:
+    if limit > STORE_CAPACITY:
+        return BinanceApi(symbol, interval, limit).load_klines(), None
+
+    store = get_store(symbol, interval)
+    _refresh(store, limit)
+    return store.snapshot(limit)
+
+
+async def load_candles_async(symbol: str, interval: str, limit: int) -> pd.DataFrame:
+    if limit > STORE_CAPACITY:
+        return kline_frame(*await load_history_arrays_async(symbol, interval, limit))
+
+    store = get_store(symbol, interval)
+    await _refresh_async(store, limit)
+    return store.frame(limit)
+
+
+async def load_candle_snapshot_async(
+    symbol: str, interval: str, limit: int
+) -> Tuple[pd.DataFrame, Optional[IndicatorValues]]:
+    if limit > STORE_CAPACITY:
+        return kline_frame(*await load_history_arrays_async(symbol, interval, limit)), None
+
+    store = get_store(symbol, interval)
+    await _refresh_async(store, limit)
+    return store.snapshot(limit)
+
+
+def stack_series(
+    series: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    columns: Sequence[int],
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    series = {symbol: arrays for symbol, arrays in series.items() if len(arrays[0])}
+    if not series:
+        return [], np.empty(0, dtype=np.int64), np.empty((len(columns), 0, 0))
+
+    # Symbols whose last candle lags the rest (halted or delisted) are dropped
+    # so every row ends on the same open time; shorter rows are NaN-padded on the left.
+    latest = max(int(times[-1]) for times, _ in series.values())
+    symbols = [symbol for symbol, (times, _) in series.items() if int(times[-1]) == latest]
+    longest = max(symbols, key=lambda symbol: len(series[symbol][0]))
+    times = series[longest][0]
+
+    stacked = np.full((len(columns), len(symbols), len(times)), np.nan)
+    for row, symbol in enumerate(symbols):
+        values = series[symbol][1]
+        stacked[:, row, len(times) - len(values):] = values[:, list(columns)].T
+    return symbols, times, stacked
+
+
+async def load_candle_arrays_async(symbol: str, interval: str, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    if limit > STORE_CAPACITY:
+        return await load_history_arrays_async(symbol, interval, limit)
+
+    store = get_store(symbol, interval)
+    await _refresh_async(store, limit)
+    return store.arrays(limit)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import time
+from os import environ
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Protocol
+
+import numpy as np
+
+from analytic import BookLevels
+from .async_binance_api import AsyncBinanceApi
+
+logger = logging.getLogger(__name__)
+
+MAX_BOOK_AGE = float(environ.get("LIVE_ORDERBOOK_MAX_AGE", "5"))
+SNAPSHOT_LIMIT = int(environ.get("LIVE_ORDERBOOK_SNAPSHOT_LIMIT", "1000"))
+
+
+class DepthEventSource(Protocol):
+    def events(self) -> AsyncIterator[Dict[str, Any]]:
+        ...
+
+
+class BinanceDepthStream:
+    def __init__(self, symbol: str, speed: str = "100ms", reconnect_delay: float = 1.0):
+        self.symbol = symbol
+        self.speed = speed
+        self.reconnect_delay = reconnect_delay
+        self.binanc_ws = environ.get("BINANCE_WS", "wss://stream.binance.com:9443/ws")
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        url = f"{self.binanc_ws}/{self.symbol.lower()}@depth@{self.speed}"
+        while True:
+            try:
+                async with AsyncBinanceApi.session().ws_connect(url, heartbeat=30) as ws:
+                    async for msg in ws:
+                        yield json.loads(msg.data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("depth stream %s dropped: %r", self.symbol, e)
+            # The gap after a reconnect is caught by update-ID sequencing.
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class ReplayDepthSource:
+    def __init__(self, path: str, delay: float = 0.0):
+        self.path = path
+        self.delay = delay
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                yield json.loads(line)
+                await asyncio.sleep(self.delay)
+
+
+class _BookSide:
+    def __init__(self):
+        # Ascending by price for both sides; bids are read from the tail.
+        self.prices = np.empty(0, dtype=np.float64)
+        self.qty = np.empty(0, dtype=np.float64)
+
+    def reset(self, levels: List[List[str]]) -> None:
+        arr = np.array(levels, dtype=np.float64).reshape(-1, 2)
+        arr = arr[arr[:, 1] > 0]
+        order = np.argsort(arr[:, 0], kind="stable")
+        self.prices = arr[order, 0].copy()
+        self.qty = arr[order, 1].copy()
+
+    def apply(self, updates: List[List[str]]) -> None:
+        if not updates:
+            return
+
+        arr = np.array(updates, dtype=np.float64).reshape(-1, 2)
+        order = np.argsort(arr[:, 0], kind="stable")
+        prices, qty = arr[order, 0], arr[order, 1]
+
+        # Within one event the last update for a price wins.
+        last = np.append(prices[1:] != prices[:-1], True)
+        prices, qty = prices[last], qty[last]
+
+        idx = np.searchsorted(self.prices, prices)
+        found = idx < len(self.prices)
+        found[found] = self.prices[idx[found]] == prices[found]
+
+        self.qty[idx[found]] = qty[found]
+
+        new = ~found & (qty > 0)
+        if new.any():
+            self.prices = np.insert(self.prices, idx[new], prices[new])
+            self.qty = np.insert(self.qty, idx[new], qty[new])
+
+        if (qty[found] == 0).any():
+            keep = self.qty > 0
+            self.prices = self.prices[keep]
+            self.qty = self.qty[keep]
+
+
+class LiveOrderBook:
+    def __init__(
+        self,
+        symbol: str,
+        source: DepthEventSource,
+        snapshot_loader: Callable[[], Awaitable[Dict[str, Any]]],
+        resync_delay: float = 1.0,
+    ):
+        self.symbol = symbol
+        self.source = source
+        self.snapshot_loader = snapshot_loader
+        self.resync_delay = resync_delay
+        self.bids = _BookSide()
+        self.asks = _BookSide()
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.updated_at = 0.0
+        self.resyncs = 0
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        self.bids.reset(snapshot["bids"])
+        self.asks.reset(snapshot["asks"])
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.synced = False
+        self.updated_at = time.time()
+
+    def apply_event(self, event: Dict[str, Any]) -> bool:
+        first_id, final_id = int(event["U"]), int(event["u"])
+
+        if final_id <= self.last_update_id:
+            return True
+
+        if self.synced:
+            if first_id != self.last_update_id + 1:
+                return False
+        elif not first_id <= self.last_update_id + 1 <= final_id:
+            return False
+
+        self.bids.apply(event["b"])
+        self.asks.apply(event["a"])
+        self.last_update_id = final_id
+        self.synced = True
+        self.updated_at = time.time()
+        return True
+
+    def is_fresh(self, max_age: float = MAX_BOOK_AGE) -> bool:
+        return self.synced and time.time() - self.updated_at <= max_age
+
+    def levels(self, depth: Optional[int] = None) -> BookLevels:
+        n_bid = len(self.bids.prices) if depth is None else min(depth, len(self.bids.prices))
+        n_ask = len(self.asks.prices) if depth is None else min(depth, len(self.asks.prices))
+        return BookLevels(
+            bid_prices=self.bids.prices[len(self.bids.prices) - n_bid:][::-1].copy(),
+            bid_qty=self.bids.qty[len(self.bids.qty) - n_bid:][::-1].copy(),
+            ask_prices=self.asks.prices[:n_ask].copy(),
+            ask_qty=self.asks.qty[:n_ask].copy(),
+        )
+
+    async def _pump(self, queue: "asyncio.Queue[Optional[Dict[str, Any]]]") -> None:
+        try:
+            async for event in self.source.events():
+                queue.put_nowait(event)
+        finally:
+            queue.put_nowait(None)
+
+    async def run(self) -> None:
+        # Events are buffered from the moment the stream opens, so none are
+        # lost while the REST snapshot is in flight.
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        pump = asyncio.create_task(self._pump(queue))
+        try:
+            while True:
+                try:
+                    self.load_snapshot(await self.snapshot_loader())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("depth snapshot %s failed: %r", self.symbol, e)
+                    await asyncio.sleep(self.resync_delay)
+                    continue
+
+                while True:
+                    event = await queue.get()
+                    if event is None:
+                        return
+                    if not self.apply_event(event):
+                        logger.info("order book %s out of sequence, resyncing", self.symbol)
+                        self.synced = False
+                        self.resyncs += 1
+                        await asyncio.sleep(self.resync_delay)
+                        break
+        finally:
+            pump.cancel()
+
+
+_live_books: Dict[str, LiveOrderBook] = {}
+
+
+def get_live_book(symbol: str) -> Optional[LiveOrderBook]:
+    book = _live_books.get(symbol)
+    if book is None or not book.is_fresh():
+        return None
+    return book
+
+
+def start_live_books(symbols: List[str]) -> List[asyncio.Task]:
+    tasks = []
+    for symbol in symbols:
+        api = AsyncBinanceApi(symbol, limit=SNAPSHOT_LIMIT)
+        book = LiveOrderBook(symbol, BinanceDepthStream(symbol), api.load_depth_snapshot)
+        _live_books[symbol] = book
+        tasks.append(asyncio.create_task(book.run()))
+    return tasks
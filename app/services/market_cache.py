@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import environ
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .intervals import next_candle_open_ms
+
+ENDPOINT_TTLS: Dict[str, float] = {
+    "depth": 2,
+    "aggTrades": 2,
+    "fundingRate": 60,
+    "openInterest": 10,
+    "ticker/24hr": 60,
+}
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MarketDataCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._size -= size
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+
+            self._entries[key] = (time.time() + ttl, size, value)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self.max_bytes,
+            )
+
+
+def cache_key(endpoint: str, params: Dict[str, Any]) -> Hashable:
+    return (
+        endpoint,
+        params.get("symbol"),
+        params.get("interval"),
+        params.get("limit"),
+        tuple(sorted((k, v) for k, v in params.items() if k not in ("symbol", "interval", "limit"))),
+    )
+
+
+def ttl_for(endpoint: str, params: Dict[str, Any]) -> float:
+    if endpoint == "klines":
+        now_ms = int(time.time() * 1000)
+        return max((next_candle_open_ms(params["interval"], now_ms) - now_ms) / 1000, 1.0)
+    return ENDPOINT_TTLS.get(endpoint, 0)
+
+
+market_cache = MarketDataCache(
+    max_bytes=int(environ.get("MARKET_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
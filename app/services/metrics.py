@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from os import environ
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from analytic.base import set_analyze_observer
+from .market_cache import market_cache
+from .report_cache import report_cache
+from .single_flight import report_flights
+from .weight_governor import futures_governor, spot_governor
+
+METRICS_HOST = environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = environ.get("METRICS_PORT", "")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def items(self) -> List[Tuple[Labels, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(k)} {v:g}" for k, v in self.items())
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.total = 0.0
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.bounds = tuple(buckets)
+        self._series: Dict[Labels, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        # Buckets are stored non-cumulative and summed on render.
+        slot = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds) + 1)
+            series.buckets[slot] += 1
+            series.count += 1
+            series.total += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def quantile(self, series: _Series, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation.
+        rank = q * series.count
+        seen = 0
+        for bound, n in zip(self.bounds, series.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def items(self) -> List[Tuple[Labels, _Series]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in self.items():
+            seen = 0
+            for bound, n in zip(self.bounds, series.buckets):
+                seen += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {seen}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series.count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series.total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+
+stage_seconds = Histogram("cryptoscope_stage_seconds", "Report pipeline stage latency by report type.")
+request_seconds = Histogram("cryptoscope_binance_request_seconds", "Binance HTTP round trip by endpoint.")
+decode_seconds = Histogram("cryptoscope_binance_decode_seconds", "Binance payload decode time by endpoint.")
+analyze_seconds = Histogram("cryptoscope_analyze_seconds", "Analyzer analyze() time by analyzer.")
+requests_total = Counter("cryptoscope_binance_requests_total", "Binance requests by endpoint and status.")
+weight_total = Counter("cryptoscope_binance_weight_total", "Binance request weight spent by endpoint.")
+used_weight = Gauge("cryptoscope_binance_used_weight", "Last X-MBX-USED-WEIGHT-1M reported by Binance.")
+errors_total = Counter("cryptoscope_errors_total", "Failures by stage and error type.")
+
+METRICS = (
+    stage_seconds, request_seconds, decode_seconds, analyze_seconds,
+    requests_total, weight_total, used_weight, errors_total,
+)
+
+
+def record_request(
+    api: str, endpoint: str, status: str, seconds: float, weight: int, used: Optional[str] = None
+) -> None:
+    request_seconds.observe(seconds, endpoint=endpoint)
+    requests_total.inc(endpoint=endpoint, status=status)
+    weight_total.inc(weight, endpoint=endpoint)
+    if used:
+        # Spot and futures keep separate weight limits.
+        used_weight.set(float(used), api=api)
+
+
+def cache_samples() -> List[Tuple[str, float]]:
+    # Caches already count their own hits; they are read at scrape time.
+    market = market_cache.stats()
+    return [
+        ('cryptoscope_cache_hits_total{cache="market"}', market.hits),
+        ('cryptoscope_cache_misses_total{cache="market"}', market.misses),
+        ('cryptoscope_cache_evictions_total{cache="market"}', market.evictions),
+        ('cryptoscope_cache_bytes{cache="market"}', market.size_bytes),
+        ('cryptoscope_cache_hits_total{cache="report"}', report_cache.hits),
+        ('cryptoscope_cache_misses_total{cache="report"}', report_cache.misses),
+        ('cryptoscope_flights_total{result="started"}', report_flights.started),
+        ('cryptoscope_flights_total{result="shared"}', report_flights.shared),
+        ('cryptoscope_binance_weight_spare{api="spot"}', spot_governor.spare()),
+        ('cryptoscope_binance_weight_spare{api="futures"}', futures_governor.spare()),
+    ]
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for sample, value in cache_samples():
+        lines.append(f"{sample} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _ratio(hits: float, misses: float) -> str:
+    total = hits + misses
+    return f"{hits / total:.0%}" if total else "—"
+
+
+def render_stats() -> str:
+    # Human-readable digest of the same metrics for the /stats command.
+    lines = ["Задержки: запросов / среднее / p95, мс"]
+    for metric, title in ((stage_seconds, "Этапы отчётов"), (request_seconds, "Запросы к Binance"),
+                          (decode_seconds, "Разбор ответов"), (analyze_seconds, "Анализаторы")):
+        lines.append(f"\n<b>{title}</b>")
+        for key, series in metric.items():
+            name = " ".join(v for _, v in key)
+            avg = series.total / series.count * 1000 if series.count else 0.0
+            p95 = metric.quantile(series, 0.95) * 1000
+            lines.append(f"• {name}: {series.count} / {avg:.1f} / ≤{p95:g}")
+
+    weight = sum(v for _, v in weight_total.items())
+    used = ", ".join(f"{dict(k)['api']} {v:g}" for k, v in used_weight.items()) or "—"
+    lines.append("")
+    lines.append(f"<b>Binance</b>: потрачено веса {weight:g}, USED-WEIGHT-1M: {used}")
+    lines.append(f"Свободно для фоновых задач: spot {spot_governor.spare():.0f}, futures {futures_governor.spare():.0f}")
+    failed = [(k, v) for k, v in requests_total.items() if not dict(k)["status"].startswith("2")]
+    lines.extend(f"• {dict(k)['endpoint']} {dict(k)['status']}: {v:g}" for k, v in failed)
+    lines.extend(f"• ошибка {dict(k)['stage']}: {dict(k)['error']} — {n:g}" for k, n in errors_total.items())
+
+    market = market_cache.stats()
+    lines.append("")
+    lines.append(
+        f"<b>Кэш</b>: рынок {_ratio(market.hits, market.misses)} "
+        f"({market.size_bytes / 2 ** 20:.1f} MiB), "
+        f"отчёты {_ratio(report_cache.hits, report_cache.misses)}, "
+        f"склеено запросов {report_flights.shared} из {report_flights.started + report_flights.shared}"
+    )
+    return "\n".join(lines)
+
+
+def _observe_analyze(analyzer: str, seconds: float) -> None:
+    analyze_seconds.observe(seconds, analyzer=analyzer)
+
+
+set_analyze_observer(_observe_analyze)
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server() -> Optional[web.AppRunner]:
+    if not METRICS_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, int(METRICS_PORT)).start()
+    return runner
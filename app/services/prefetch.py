@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import threading
+import time
+from os import environ
+from typing import Dict, List, Optional, Set, Tuple
+
+from .analytic_service import BENCHMARKS, build_sections_async
+from .analytics_executor import AnalyticsOverloaded, AnalyticsTimeout
+from .intervals import next_close
+from .kline_store import MAX_PAGE
+from .user_settings import settings_store
+from .weight_governor import BACKGROUND, request_priority, spot_governor
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_TOP = int(environ.get("PREFETCH_TOP", "50"))
+PREFETCH_WEIGHT_BUDGET = int(environ.get("PREFETCH_WEIGHT_BUDGET", "300"))
+PREFETCH_CONCURRENCY = int(environ.get("PREFETCH_CONCURRENCY", "4"))
+# Binance needs a moment to open the new candle after the boundary.
+PREFETCH_DELAY = float(environ.get("PREFETCH_DELAY", "2"))
+PREFETCH_HALF_LIFE = float(environ.get("PREFETCH_HALF_LIFE", str(6 * 3600)))
+MAX_TRACKED = 10_000
+# A configured user counts for this many report requests when seeding.
+SETTINGS_SEED_WEIGHT = 0.2
+KLINES_WEIGHT = 2
+
+PREFETCH_SECTIONS = ("candles", "correlation")
+
+Combo = Tuple[str, str, int]
+
+
+class DemandTracker:
+    # Request counts per (symbol, interval, candles_limit) that halve every
+    # PREFETCH_HALF_LIFE seconds, so yesterday's favourites fade out.
+    def __init__(self, half_life: float = PREFETCH_HALF_LIFE):
+        self.half_life = half_life
+        self._scores: Dict[Combo, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, stamp: float, now: float) -> float:
+        return score * 0.5 ** ((now - stamp) / self.half_life)
+
+    def record(self, symbol: str, interval: str, candles_limit: int, weight: float = 1.0) -> None:
+        now = time.time()
+        key = (symbol, interval, candles_limit)
+        with self._lock:
+            score, stamp = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, stamp, now) + weight, now)
+            if len(self._scores) > MAX_TRACKED:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        ranked = sorted(self._scores, key=lambda k: self._decayed(*self._scores[k], now))
+        for key in ranked[:len(ranked) - MAX_TRACKED // 2]:
+            del self._scores[key]
+
+    def top(self, n: int, intervals: Optional[Set[str]] = None) -> List[Combo]:
+        now = time.time()
+        with self._lock:
+            scored = [
+                (self._decayed(score, stamp, now), key)
+                for key, (score, stamp) in self._scores.items()
+                if intervals is None or key[1] in intervals
+            ]
+        scored.sort(reverse=True)
+        return [key for _, key in scored[:n]]
+
+    def intervals(self) -> Set[str]:
+        with self._lock:
+            return {interval for _, interval, _ in self._scores}
+
+
+demand = DemandTracker()
+
+
+def klines_weight(candles_limit: int) -> int:
+    return KLINES_WEIGHT * -(-candles_limit // MAX_PAGE)
+
+
+def plan_prefetch(combos: List[Combo], budget: int) -> List[Combo]:
+    # Every combo loads its own klines plus the benchmarks' for the
+    # correlation section; series shared between combos are paid once.
+    charged: Set[Combo] = set()
+    spent = 0
+    chosen = []
+    for symbol, interval, limit in combos:
+        series = {(name, interval, limit) for name in (symbol, *BENCHMARKS)} - charged
+        cost = sum(klines_weight(limit) for _ in series)
+        if spent + cost > budget:
+            continue
+        spent += cost
+        charged |= series
+        chosen.append((symbol, interval, limit))
+    return chosen
+
+
+async def prefetch(combos: List[Combo]) -> int:
+    semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+    warmed = 0
+
+    async def warm(symbol: str, interval: str, limit: int) -> None:
+        nonlocal warmed
+        async with semaphore:
+            try:
+                await build_sections_async(symbol, PREFETCH_SECTIONS, interval, limit)
+                warmed += 1
+            except (AnalyticsOverloaded, AnalyticsTimeout):
+                # Users are ahead of us; the warm-up is only an optimisation.
+                pass
+            except Exception as e:
+                logger.warning("prefetch %s %s failed: %r", symbol, interval, e)
+
+    await asyncio.gather(*(warm(*combo) for combo in combos))
+    return warmed
+
+
+def seed_from_settings() -> None:
+    for symbol, interval, limit, users in settings_store.popular(PREFETCH_TOP):
+        demand.record(symbol, interval, limit, users * SETTINGS_SEED_WEIGHT)
+
+
+async def run_prefetch() -> None:
+    request_priority.set(BACKGROUND)
+    await asyncio.to_thread(seed_from_settings)
+    while True:
+        intervals = demand.intervals()
+        if not intervals:
+            await asyncio.sleep(60)
+            continue
+
+        now_ms = int(time.time() * 1000)
+        boundary, due = next_close(intervals, now_ms)
+        await asyncio.sleep(max(boundary - now_ms, 0) / 1000 + PREFETCH_DELAY)
+
+        # Intervals closing on the same boundary share the budget, which
+        # never takes more than users leave spare right now.
+        budget = min(PREFETCH_WEIGHT_BUDGET, int(spot_governor.spare()))
+        combos = plan_prefetch(demand.top(PREFETCH_TOP, due), budget)
+        started = time.perf_counter()
+        warmed = await prefetch(combos)
+        logger.info(
+            "prefetched %d/%d combos for %s in %.1fs",
+            warmed, len(combos), ",".join(sorted(due)), time.perf_counter() - started,
+        )
+
+
+def start_prefetch() -> asyncio.Task:
+    return asyncio.create_task(run_prefetch())
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from os import environ
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .intervals import next_candle_open_ms
+
+CANDLE_SECTIONS = ("candles", "correlation", "timeframes")
+
+SECTION_TTLS: Dict[str, float] = {
+    "orderbook": 3,
+    "volume": 3,
+    "derivatives": 30,
+}
+
+
+class ReportCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def section_key(
+    section: str,
+    symbol: str,
+    interval: Optional[str] = None,
+    candles_limit: Optional[int] = None,
+    fetch_limit: Optional[int] = None,
+) -> Hashable:
+    if section in CANDLE_SECTIONS:
+        # Candle-based text only changes once the current candle closes.
+        candle_close = next_candle_open_ms(interval, int(time.time() * 1000))
+        return section, symbol, interval, candles_limit, candle_close
+    if section in ("orderbook", "volume"):
+        # The full report fetches the book at a different depth than the button.
+        return section, symbol, fetch_limit
+    return section, symbol
+
+
+def section_expires_at(section: str, interval: Optional[str] = None) -> float:
+    now = time.time()
+    if section in CANDLE_SECTIONS:
+        return next_candle_open_ms(interval, int(now * 1000)) / 1000
+    return now + SECTION_TTLS[section]
+
+
+report_cache = ReportCache(max_entries=int(environ.get("REPORT_CACHE_MAX_ENTRIES", "4096")))
@@ -0,0 +1,49 @@
+from functools import partial
+from os import environ
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from analytic import MarketScreener, compute_batch_indicators
+from .analytics_executor import analytics_executor
+from .fetch_planner import FetchPlan
+from .kline_store import load_candle_arrays_async, stack_series
+from .metrics import stage_seconds
+from .single_flight import coalesced
+from .universe import load_universe
+
+SCREENER_CANDLES = int(environ.get("SCREENER_CANDLES", "250"))
+SCREENER_UNIVERSE_SIZE = int(environ.get("SCREENER_UNIVERSE_SIZE", "300"))
+SCREENER_TOP = int(environ.get("SCREENER_TOP", "20"))
+
+
+def stack_hlc(
+    series: Dict[str, Tuple[np.ndarray, np.ndarray]],
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    symbols, _, hlc = stack_series(series, (1, 2, 3))
+    return symbols, hlc[0], hlc[1], hlc[2]
+
+
+def render_scan_report(
+    symbols: Sequence[str],
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    interval: str,
+    filters: Sequence[str],
+    top: int = SCREENER_TOP,
+) -> str:
+    with stage_seconds.time(stage="indicators", report="scan"):
+        indicators = compute_batch_indicators(high, low, close)
+    return MarketScreener(symbols, indicators, interval, filters, top).analyze().summary
+
+
+@coalesced("scan")
+async def build_scan_report_async(interval: str, filters: Tuple[str, ...]) -> str:
+    plan = FetchPlan()
+    for symbol in await load_universe("SCREENER_UNIVERSE", SCREENER_UNIVERSE_SIZE):
+        plan.add(symbol, partial(load_candle_arrays_async, symbol, interval, SCREENER_CANDLES))
+    fetched = await plan.run_async()
+
+    symbols, high, low, close = stack_hlc(fetched.values)
+    return await analytics_executor.run(render_scan_report, symbols, high, low, close, interval, filters)
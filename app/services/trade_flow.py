@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from os import environ
+from typing import List, Optional, Tuple
+
+from analytic import TradeTape
+from analytic.trade_flow import TradeFlow, TradeRing
+from .async_binance_api import AsyncBinanceApi
+from .binance_api import BinanceApi
+from .intervals import interval_ms
+
+TRADE_PAGE = 1000
+TRADE_FLOW_WINDOWS: Tuple[Tuple[str, int], ...] = tuple(
+    (label, interval_ms(label)) for label in environ.get("TRADE_FLOW_WINDOWS", "1m,5m,1h").split(",")
+)
+LONGEST_WINDOW_MS = max(ms for _, ms in TRADE_FLOW_WINDOWS)
+# A liquid pair prints far more trades per hour than is worth paging for;
+# past this many pages the longest window is reported as partially covered.
+TRADE_FLOW_MAX_PAGES = int(environ.get("TRADE_FLOW_MAX_PAGES", "30"))
+TRADE_RING_CAPACITY = int(environ.get("TRADE_RING_CAPACITY", "100000"))
+TRADE_FLOW_MAX_SYMBOLS = int(environ.get("TRADE_FLOW_MAX_SYMBOLS", "32"))
+CVD_POINTS = 24
+
+
+class _Feed:
+    def __init__(self):
+        self.ring = TradeRing(TRADE_RING_CAPACITY)
+        # Held across the fetch, so concurrent reports of one symbol page once.
+        self.fill_lock = asyncio.Lock()
+        self.lock = threading.Lock()
+
+
+_feeds: "OrderedDict[str, _Feed]" = OrderedDict()
+_feeds_lock = threading.Lock()
+
+
+def _get_feed(symbol: str) -> _Feed:
+    with _feeds_lock:
+        feed = _feeds.get(symbol)
+        if feed is None:
+            feed = _feeds[symbol] = _Feed()
+            while len(_feeds) > TRADE_FLOW_MAX_SYMBOLS:
+                _feeds.popitem(last=False)
+        else:
+            _feeds.move_to_end(symbol)
+        return feed
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _start_id(ring: TradeRing, latest: TradeTape) -> int:
+    # Where forward paging resumes, or -1 when the buffer must be refilled.
+    if ring.last_id is None or latest.agg_id[0] - ring.last_id > TRADE_FLOW_MAX_PAGES * TRADE_PAGE:
+        return -1
+    return ring.last_id + 1
+
+
+def _page_ids(start_id: int, stop_id: int) -> List[int]:
+    # Aggregate trade ids are sequential, so every page is known up front.
+    return list(range(start_id, stop_id, TRADE_PAGE))
+
+
+def _store(ring: TradeRing, pages: List[TradeTape], origin: Optional[int]) -> None:
+    # origin is set when the buffer is refilled rather than extended.
+    if origin is not None:
+        ring.clear(origin)
+    for page in pages:
+        ring.extend(page)
+
+
+def _refresh(feed: _Feed, symbol: str, now_ms: int) -> None:
+    api = BinanceApi(symbol, limit=TRADE_PAGE)
+    latest = api.load_trade_tape()
+    if not len(latest):
+        return
+
+    pages: List[TradeTape] = []
+    origin: Optional[int] = None
+    start_id = _start_id(feed.ring, latest)
+    if start_id < 0:
+        since = now_ms - LONGEST_WINDOW_MS
+        head = api.load_trade_tape(start_time=since)
+        origin = since
+        pages = [head] if len(head) else []
+        start_id = int(head.agg_id[-1]) + 1 if len(head) else int(latest.agg_id[0])
+
+    from_ids = _page_ids(start_id, int(latest.agg_id[0]))
+    truncated = len(from_ids) > TRADE_FLOW_MAX_PAGES
+    if truncated:
+        # Only a refill gets here; keep the newest pages and start there.
+        pages, from_ids = [], from_ids[-TRADE_FLOW_MAX_PAGES:]
+    pages.extend(api.load_trade_tape(from_id=i) for i in from_ids)
+    if truncated:
+        origin = int(pages[0].time[0])
+    with feed.lock:
+        _store(feed.ring, pages + [latest], origin)
+
+
+async def _refresh_async(feed: _Feed, symbol: str, now_ms: int) -> None:
+    api = AsyncBinanceApi(symbol, limit=TRADE_PAGE)
+    latest = await api.load_trade_tape()
+    if not len(latest):
+        return
+
+    pages: List[TradeTape] = []
+    origin: Optional[int] = None
+    start_id = _start_id(feed.ring, latest)
+    if start_id < 0:
+        since = now_ms - LONGEST_WINDOW_MS
+        head = await api.load_trade_tape(start_time=since)
+        origin = since
+        pages = [head] if len(head) else []
+        start_id = int(head.agg_id[-1]) + 1 if len(head) else int(latest.agg_id[0])
+
+    from_ids = _page_ids(start_id, int(latest.agg_id[0]))
+    truncated = len(from_ids) > TRADE_FLOW_MAX_PAGES
+    if truncated:
+        # Only a refill gets here; keep the newest pages and start there.
+        pages, from_ids = [], from_ids[-TRADE_FLOW_MAX_PAGES:]
+    pages.extend(await asyncio.gather(*(api.load_trade_tape(from_id=i) for i in from_ids)))
+    if truncated:
+        origin = int(pages[0].time[0])
+    with feed.lock:
+        _store(feed.ring, pages + [latest], origin)
+
+
+def _snapshot(feed: _Feed, now_ms: int) -> TradeFlow:
+    with feed.lock:
+        return feed.ring.flow(TRADE_FLOW_WINDOWS, now_ms, CVD_POINTS)
+
+
+def load_trade_flow(symbol: str) -> TradeFlow:
+    feed = _get_feed(symbol)
+    now_ms = _now_ms()
+    _refresh(feed, symbol, now_ms)
+    return _snapshot(feed, now_ms)
+
+
+async def load_trade_flow_async(symbol: str) -> TradeFlow:
+    feed = _get_feed(symbol)
+    now_ms = _now_ms()
+    async with feed.fill_lock:
+        await _refresh_async(feed, symbol, now_ms)
+    return _snapshot(feed, now_ms)
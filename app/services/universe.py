@@ -0,0 +1,33 @@
+from os import environ
+from typing import List
+
+from .async_binance_api import AsyncBinanceApi
+
+# Leveraged tokens and stablecoin pairs only add noise to market-wide scans.
+EXCLUDED_SUFFIXES = ("UPUSDT", "DOWNUSDT", "BULLUSDT", "BEARUSDT")
+EXCLUDED_SYMBOLS = {"USDCUSDT", "FDUSDUSDT", "TUSDUSDT", "BUSDUSDT", "DAIUSDT", "USDPUSDT"}
+
+
+def env_symbols(name: str) -> List[str]:
+    return [
+        s.strip().upper()
+        for s in environ.get(name, "").split(",")
+        if s.strip()
+    ]
+
+
+async def load_universe(env_name: str, size: int) -> List[str]:
+    symbols = env_symbols(env_name)
+    if symbols:
+        return symbols
+
+    tickers = await AsyncBinanceApi("").load_tickers_24hr()
+    usdt = [
+        t for t in tickers
+        if t["symbol"].endswith("USDT")
+        and not t["symbol"].endswith(EXCLUDED_SUFFIXES)
+        and t["symbol"] not in EXCLUDED_SYMBOLS
+        and float(t["quoteVolume"]) > 0
+    ]
+    usdt.sort(key=lambda t: float(t["quoteVolume"]), reverse=True)
+    return [t["symbol"] for t in usdt[:size]]
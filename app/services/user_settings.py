@@ -1,5 +1,17 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict
+from os import environ
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_DB = environ.get("USER_SETTINGS_DB", "user_settings.sqlite3")
+SETTINGS_CACHE_SIZE = int(environ.get("USER_SETTINGS_CACHE_SIZE", "200000"))
+SETTINGS_FLUSH_INTERVAL = float(environ.get("USER_SETTINGS_FLUSH_INTERVAL", "2"))
 
 
 @dataclass
@@ -9,28 +21,178 @@ class UserSettings:
     candles_limit: int = 100
 
 
-_user_settings: Dict[int, UserSettings] = {}
+class SettingsStore:
+    # Reads are served from an LRU of settings objects; a miss is loaded from
+    # SQLite off the event loop by load(), which the bot runs before every
+    # update. Changes only mark the chat dirty; a background task upserts all
+    # dirty chats in one transaction. The cache is per process, so only one
+    # process may serve a given database.
+    def __init__(self, path: str, cache_size: int = SETTINGS_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, UserSettings]" = OrderedDict()
+        self._dirty: Dict[int, UserSettings] = {}
+        # Taken out of _dirty by a flush that has not committed yet.
+        self._flushing: Dict[int, UserSettings] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._read_db: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # WAL keeps the read connection usable while a flush is writing.
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS user_settings ("
+            "chat_id INTEGER PRIMARY KEY, symbol TEXT NOT NULL, "
+            "interval TEXT NOT NULL, candles_limit INTEGER NOT NULL)"
+        )
+        return db
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = self._open()
+        return self._db
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._read_db is None:
+            self._read_db = self._open()
+        return self._read_db
+
+    def _load(self, chat_id: int) -> UserSettings:
+        with self._read_lock:
+            row = self._reader().execute(
+                "SELECT symbol, interval, candles_limit FROM user_settings WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        return UserSettings(*row) if row else UserSettings()
+
+    def _cached(self, chat_id: int) -> Optional[UserSettings]:
+        with self._lock:
+            settings = self._cache.get(chat_id)
+            if settings is not None:
+                self._cache.move_to_end(chat_id)
+                return settings
+            # Unflushed changes stay readable after eviction.
+            return self._dirty.get(chat_id) or self._flushing.get(chat_id)
+
+    def _remember(self, chat_id: int, settings: UserSettings) -> UserSettings:
+        with self._lock:
+            # Another caller may have loaded it meanwhile; keep one object per chat.
+            settings = self._cache.setdefault(chat_id, settings)
+            self._cache.move_to_end(chat_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return settings
+
+    def get(self, chat_id: int) -> UserSettings:
+        # Only reads SQLite when load() was skipped, e.g. outside the bot.
+        settings = self._cached(chat_id)
+        return self._remember(chat_id, settings if settings is not None else self._load(chat_id))
+
+    async def load(self, chat_id: int) -> UserSettings:
+        settings = self._cached(chat_id)
+        if settings is None:
+            settings = await asyncio.to_thread(self._load, chat_id)
+        return self._remember(chat_id, settings)
+
+    def mark_dirty(self, chat_id: int, settings: UserSettings) -> None:
+        with self._lock:
+            self._dirty[chat_id] = settings
+
+    def flush(self) -> int:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._flushing = dirty
+        if not dirty:
+            return 0
+
+        rows = [(chat_id, s.symbol, s.interval, s.candles_limit) for chat_id, s in dirty.items()]
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute("BEGIN")
+                db.executemany(
+                    "INSERT INTO user_settings (chat_id, symbol, interval, candles_limit) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(chat_id) DO UPDATE SET symbol = excluded.symbol, "
+                    "interval = excluded.interval, candles_limit = excluded.candles_limit",
+                    rows,
+                )
+                db.execute("COMMIT")
+        except sqlite3.Error:
+            if self._db is not None and self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            with self._lock:
+                # Newer changes made during the failed write win.
+                for chat_id, settings in dirty.items():
+                    self._dirty.setdefault(chat_id, settings)
+                self._flushing = {}
+            raise
+        with self._lock:
+            self._flushing = {}
+        return len(rows)
+
+    def popular(self, n: int) -> List[Tuple[str, str, int, int]]:
+        # (symbol, interval, candles_limit, chats) by the number of chats using it.
+        with self._read_lock:
+            return self._reader().execute(
+                "SELECT symbol, interval, candles_limit, COUNT(*) AS chats FROM user_settings "
+                "GROUP BY symbol, interval, candles_limit ORDER BY chats DESC LIMIT ?", (n,)
+            ).fetchall()
+
+    async def run_writer(self, interval: float = SETTINGS_FLUSH_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except sqlite3.Error as e:
+                logger.warning("user settings flush failed: %r", e)
+
+    def close(self) -> None:
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        with self._read_lock:
+            if self._read_db is not None:
+                self._read_db.close()
+                self._read_db = None
+
+
+settings_store = SettingsStore(SETTINGS_DB)
+
+
+def start_settings_writer() -> asyncio.Task:
+    return asyncio.create_task(settings_store.run_writer())
 
 
 def get_user_settings(chat_id: int) -> UserSettings:
-    if chat_id not in _user_settings:
-        _user_settings[chat_id] = UserSettings()
-    return _user_settings[chat_id]
+    return settings_store.get(chat_id)
+
+
+async def load_user_settings(chat_id: int) -> UserSettings:
+    return await settings_store.load(chat_id)
 
 
 def set_symbol(chat_id: int, symbol: str) -> UserSettings:
     settings = get_user_settings(chat_id)
     settings.symbol = symbol.upper()
+    settings_store.mark_dirty(chat_id, settings)
     return settings
 
 
 def set_interval(chat_id: int, interval: str) -> UserSettings:
     settings = get_user_settings(chat_id)
     settings.interval = interval
+    settings_store.mark_dirty(chat_id, settings)
     return settings
 
 
 def set_candles_limit(chat_id: int, limit: int) -> UserSettings:
     settings = get_user_settings(chat_id)
     settings.candles_limit = limit
+    settings_store.mark_dirty(chat_id, settings)
     return settings
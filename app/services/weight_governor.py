@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from os import environ
+from typing import Mapping, Optional
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Background tasks (prefetch, alerts) set this for everything they await.
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+SPOT_WEIGHT_LIMIT = int(environ.get("BINANCE_WEIGHT_LIMIT", "6000"))
+FUTURES_WEIGHT_LIMIT = int(environ.get("BINANCE_FAPI_WEIGHT_LIMIT", "2400"))
+# Share of the per-minute limit we allow ourselves, and the part of it that
+# only interactive requests may dip into.
+WEIGHT_HEADROOM = float(environ.get("BINANCE_WEIGHT_HEADROOM", "0.8"))
+INTERACTIVE_RESERVE = float(environ.get("BINANCE_INTERACTIVE_RESERVE", "0.3"))
+# An interactive request fails fast instead of waiting longer than this.
+MAX_INTERACTIVE_WAIT = float(environ.get("BINANCE_MAX_INTERACTIVE_WAIT", "10"))
+
+MAX_RETRIES = int(environ.get("BINANCE_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 5.0
+RETRY_STATUSES = frozenset({429, 418, 500, 502, 503, 504})
+# Binance does not always send Retry-After with a 418; bans start at 2 minutes.
+DEFAULT_BAN_SECONDS = 120
+
+
+class BinanceBackoff(Exception):
+    pass
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter: spreads retries of concurrent callers over the window.
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class WeightGovernor:
+    # Token bucket refilled at the per-minute limit. Binance counts weight
+    # per IP in fixed minute windows, so whenever a response reports the
+    # used weight the bucket is clamped to what is really left; that also
+    # covers weight spent by other processes behind the same IP.
+    def __init__(self, name: str, limit_per_minute: int):
+        self.name = name
+        self.capacity = limit_per_minute * WEIGHT_HEADROOM
+        self.rate = self.capacity / 60
+        self.reserve = self.capacity * INTERACTIVE_RESERVE
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._interactive_waiting = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _try_take(self, weight: int, priority: int) -> float:
+        # Returns 0 when the weight was taken, otherwise how long to wait.
+        now = time.monotonic()
+        with self._lock:
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            floor = 0.0 if priority == INTERACTIVE else self.reserve
+            if priority != INTERACTIVE and self._interactive_waiting:
+                return max((weight + floor - self._tokens) / self.rate, 0.05)
+            if self._tokens - weight >= floor:
+                self._tokens -= weight
+                return 0.0
+            return (weight + floor - self._tokens) / self.rate
+
+    def _check_wait(self, waited: float, delay: float, priority: int) -> None:
+        if priority == INTERACTIVE and waited + delay > MAX_INTERACTIVE_WAIT:
+            raise BinanceBackoff(f"Binance {self.name} weight exhausted, retry in {delay:.0f}s")
+
+    def acquire(self, weight: int) -> None:
+        priority = request_priority.get()
+        waited = 0.0
+        while True:
+            delay = self._try_take(weight, priority)
+            if not delay:
+                return
+            self._check_wait(waited, delay, priority)
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self, weight: int) -> None:
+        priority = request_priority.get()
+        waited = 0.0
+        if priority == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += 1
+        try:
+            while True:
+                delay = self._try_take(weight, priority)
+                if not delay:
+                    return
+                self._check_wait(waited, delay, priority)
+                await asyncio.sleep(delay)
+                waited += delay
+        finally:
+            if priority == INTERACTIVE:
+                with self._lock:
+                    self._interactive_waiting -= 1
+
+    def observe(self, status: int, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        used = headers.get("X-MBX-USED-WEIGHT-1M")
+        with self._lock:
+            if used is not None and used.isdigit():
+                self._refill(now)
+                self._tokens = min(self._tokens, self.capacity - int(used))
+            if status in (429, 418):
+                retry_after = headers.get("Retry-After")
+                seconds = float(retry_after) if retry_after and retry_after.isdigit() else (
+                    DEFAULT_BAN_SECONDS if status == 418 else 60 - time.time() % 60
+                )
+                # Nothing goes out until the ban or the window is over.
+                self._blocked_until = max(self._blocked_until, now + seconds)
+                self._tokens = min(self._tokens, 0.0)
+
+    def spare(self) -> float:
+        # Weight available to background work right now.
+        now = time.monotonic()
+        with self._lock:
+            if now < self._blocked_until:
+                return 0.0
+            self._refill(now)
+            return max(self._tokens - self.reserve, 0.0)
+
+
+spot_governor = WeightGovernor("spot", SPOT_WEIGHT_LIMIT)
+futures_governor = WeightGovernor("futures", FUTURES_WEIGHT_LIMIT)
+
+
+def governor_for(api: str) -> WeightGovernor:
+    return futures_governor if api == "futures" else spot_governor
+
+
+def retry_wait(status: Optional[int], attempt: int) -> float:
+    # 429 and 418 are waited out by the governor itself.
+    return 0.0 if status in (429, 418) else backoff_delay(attempt)
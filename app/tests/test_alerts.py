@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from analytic.alerts import AlertCondition
+from bot.handlers import alerts as handlers
+from services import alert_service
+from services.alert_service import AlertStore, add_alert, alert_book, remove_alerts
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(alert_service, "alert_store", AlertStore(str(tmp_path / "alerts.sqlite3")))
+    monkeypatch.setattr(alert_service, "alert_book", alert_service.AlertBook())
+    monkeypatch.setattr(handlers, "alert_book", alert_service.alert_book)
+    monkeypatch.setattr(alert_service, "_changes", asyncio.Lock())
+    return alert_service.alert_store
+
+
+def _message(text: str):
+    replies = []
+
+    async def answer(reply, **kwargs):
+        replies.append(reply)
+
+    return SimpleNamespace(text=text, chat=SimpleNamespace(id=1), answer=answer), replies
+
+
+@pytest.mark.parametrize("text", ["/alert rsi_above 120", "/alert rsi_below 0", "/alert rsi_below -5",
+                                  "/alert imbalance 150", "/alert funding nan"])
+def test_thresholds_that_cannot_fire_are_rejected(store, text):
+    message, replies = _message(text)
+    asyncio.run(handlers.cmd_alert(message))
+
+    assert "Порог" in replies[0]
+    assert store.load() == []
+
+
+def test_concurrent_duplicates_are_stored_once(store):
+    condition = AlertCondition("rsi_above", 70.0)
+
+    async def scenario():
+        return await asyncio.gather(*(add_alert(1, "BTCUSDT", "1h", condition) for _ in range(3)))
+
+    added = [sub for sub in asyncio.run(scenario()) if sub is not None]
+    assert len(added) == 1
+    assert store.load() == added
+
+    assert asyncio.run(remove_alerts(1)) == added
+    assert store.load() == []
+
+
+def test_concurrent_adds_respect_the_per_chat_cap(store, monkeypatch):
+    monkeypatch.setattr(alert_service, "ALERTS_PER_CHAT", 2)
+
+    async def add(threshold):
+        try:
+            return await add_alert(1, "BTCUSDT", "1h", AlertCondition("rsi_above", threshold))
+        except alert_service.AlertLimitReached:
+            return None
+
+    async def scenario():
+        return await asyncio.gather(*(add(60.0 + n) for n in range(5)))
+
+    added = [sub for sub in asyncio.run(scenario()) if sub is not None]
+    assert len(added) == 2
+    assert len(store.load()) == 2
+
+
+def test_repeated_positions_remove_one_alert(store):
+    for threshold in (60.0, 70.0):
+        asyncio.run(add_alert(1, "BTCUSDT", "1h", AlertCondition("rsi_above", threshold)))
+
+    message, replies = _message("/unalert 1 1")
+    asyncio.run(handlers.cmd_unalert(message))
+
+    assert "Удалено алертов: 1" in replies[0]
+    assert [sub.condition.threshold for sub in store.load()] == [70.0]
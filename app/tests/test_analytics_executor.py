@@ -0,0 +1,32 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.analytics_executor import AnalyticsExecutor, AnalyticsOverloaded, AnalyticsTimeout
+
+
+def test_timed_out_job_holds_its_slot_until_it_finishes():
+    executor = AnalyticsExecutor(kind="thread", workers=2, max_pending=1, timeout=0.05)
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(AnalyticsTimeout):
+            await executor.run(release.wait, 5)
+        assert executor.pending == 1
+        with pytest.raises(AnalyticsOverloaded):
+            await executor.run(sum, [1, 2])
+
+        release.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.pending == 0
+        assert await executor.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
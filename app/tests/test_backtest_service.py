@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services import backtest_service
+from services.analytics_executor import AnalyticsOverloaded, AnalyticsTimeout
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pools = []
+
+    def use(workers: int, chunks: int):
+        pools.append(ThreadPoolExecutor(max_workers=workers))
+        monkeypatch.setattr(backtest_service, "_get_pool", lambda: pools[-1])
+        monkeypatch.setattr(backtest_service, "BACKTEST_WORKERS", chunks)
+
+    yield use
+    for p in pools:
+        p.shutdown(wait=True)
+
+
+def test_second_sweep_is_rejected_as_a_whole(pool, monkeypatch):
+    pool(workers=2, chunks=2)
+    release = threading.Event()
+    monkeypatch.setattr(backtest_service, "sweep", lambda close, kind, combos, horizons: release.wait(5) and combos)
+    close = np.ones(100)
+
+    async def scenario():
+        first = asyncio.ensure_future(backtest_service._sweep(close, "macd"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(AnalyticsOverloaded):
+            await backtest_service._sweep(close, "macd")
+        release.set()
+        assert len(await first) == len(backtest_service.expand_grid("macd"))
+        await asyncio.sleep(0)
+        assert backtest_service._running == 0
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_sweep_drops_queued_chunks_and_holds_its_slot(pool, monkeypatch):
+    pool(workers=1, chunks=3)
+    monkeypatch.setattr(backtest_service, "BACKTEST_TIMEOUT", 0.05)
+    release = threading.Event()
+    calls = []
+
+    def blocking(close, kind, combos, horizons):
+        calls.append(combos)
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(backtest_service, "sweep", blocking)
+
+    async def scenario():
+        with pytest.raises(AnalyticsTimeout):
+            await backtest_service._sweep(np.ones(100), "rsi")
+        # The running chunk still occupies the worker.
+        assert backtest_service._running == 1
+        release.set()
+        for _ in range(100):
+            if backtest_service._running == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert backtest_service._running == 0
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_handler_sends_notice_and_result_through_the_outbox(monkeypatch):
+    from types import SimpleNamespace
+
+    from bot.handlers import backtest as handler
+    from bot.outbox import Outbox
+
+    sent = []
+
+    class Bot:
+        async def send_message(self, chat_id, text, **kwargs):
+            sent.append(text)
+
+    async def fake_backtest(symbol, interval, kind, candles):
+        return "result"
+
+    async def direct_reply(text, **kwargs):
+        raise AssertionError("replies must go through the outbox")
+
+    monkeypatch.setattr(handler, "run_backtest", fake_backtest)
+    monkeypatch.setattr(handler, "get_user_settings", lambda chat_id: SimpleNamespace(symbol="BTCUSDT", interval="1h"))
+    message = SimpleNamespace(text="/backtest rsi", chat=SimpleNamespace(id=1), answer=direct_reply)
+
+    async def scenario():
+        box = Outbox()
+        monkeypatch.setattr(handler, "outbox", box)
+        runner = box.start(Bot())
+        await handler.cmd_backtest(message)
+        runner.cancel()
+
+    asyncio.run(scenario())
+    assert sent[0].startswith("Считаю бэктест") and sent[1] == "result"
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from analytic import CorrelationAnalyzer
+
+
+def _closes(seed: int, n: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="h", name="time")
+    return pd.DataFrame({"close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))}, index=index)
+
+
+def test_symbol_is_not_its_own_benchmark():
+    btc, eth = _closes(1), _closes(2)
+    result = CorrelationAnalyzer("BTCUSDT", btc, {"BTCUSDT": btc, "ETHUSDT": eth}).analyze()
+
+    assert set(result.data) == {"ETHUSDT"}
+    assert "- BTCUSDT" not in result.summary
+
+
+def test_other_benchmarks_unchanged():
+    btc, eth, sol = _closes(1), _closes(2), _closes(3)
+    result = CorrelationAnalyzer("SOLUSDT", sol, {"BTCUSDT": btc, "ETHUSDT": eth}).analyze()
+
+    # The last `window` candles, returns taken inside that window.
+    expected = sol["close"].iloc[-100:].pct_change().corr(btc["close"].iloc[-100:].pct_change())
+    assert result.data["BTCUSDT"] == expected
+    assert set(result.data) == {"BTCUSDT", "ETHUSDT"}
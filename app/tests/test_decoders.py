@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+
+from services.decoders import _numbers, decode_agg_trades, decode_depth, decode_klines
+
+
+def _kline(open_time, close, last="0"):
+    return [open_time, "1.0", "2.0", "0.5", close, "10.0", open_time + 59_999, "0", 5, "0", "0", last]
+
+
+def test_klines_fast_path():
+    times, values = decode_klines(json.dumps([_kline(0, "1.5"), _kline(60_000, "1.75")]).encode())
+    assert times.tolist() == [0, 60_000]
+    assert values[:, 3].tolist() == [1.5, 1.75]
+    assert decode_klines(b"[]")[1].shape == (0, 5)
+
+
+def test_unreadable_token_is_not_silently_truncated():
+    # Cut at the bad token, these would still be a whole number of rows.
+    assert _numbers(b"1,2,x,4", 2, 2) is None
+    assert _numbers(b"1,2,3,4x", 2, 2) is None
+    assert _numbers(b"1,2,3", 3, 2) is None
+
+
+def test_malformed_depth_falls_back_to_json():
+    # A null price at the start of a level: read up to it, the bids would be
+    # one well-formed level.
+    body = b'{"lastUpdateId":1,"bids":[["1.0","2.0"],[null,"4.0"]],"asks":[["5.0","1.0"]]}'
+    book = decode_depth(body)
+    assert len(book.bid_prices) == 2
+    assert book.bid_qty.tolist() == [2.0, 4.0]
+
+
+def test_malformed_kline_row_falls_back_to_json():
+    rows = [_kline(0, "1.5"), _kline(60_000, "1.75", last=None)]
+    times, values = decode_klines(json.dumps(rows).encode())
+    assert times.tolist() == [0, 60_000]
+    assert values[:, 3].tolist() == [1.5, 1.75]
+
+
+def test_agg_trades_fast_path():
+    trades = [
+        {"a": 7, "p": "10.5", "q": "2", "f": 1, "l": 2, "T": 1000, "m": True, "M": True},
+        {"a": 8, "p": "10.25", "q": "1", "f": 3, "l": 3, "T": 1001, "m": False, "M": True},
+    ]
+    tape = decode_agg_trades(json.dumps(trades).encode())
+    assert tape.agg_id.tolist() == [7, 8]
+    assert tape.price.tolist() == [10.5, 10.25]
+    assert tape.is_sell.tolist() == [True, False]
+    assert np.issubdtype(tape.time.dtype, np.integer)
+
+
+def test_plain_numbers_are_read_as_one_table():
+    assert _numbers(b"1,2,3,4", 2, 2).tolist() == [[1, 2], [3, 4]]
@@ -0,0 +1,17 @@
+import asyncio
+
+from services.fetch_planner import FetchPlan
+
+
+def test_cancelled_job_is_an_error_not_a_value():
+    async def ok():
+        return 1
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    results = asyncio.run(FetchPlan().add("ok", ok).add("cancelled", cancelled).run_async())
+
+    assert results.values == {"ok": 1}
+    assert isinstance(results.errors["cancelled"], asyncio.CancelledError)
+    assert not results.ok("cancelled")
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+import pytest
+
+from services import kline_history
+from services.kline_history import KlineHistory, load_history_arrays_async
+
+HOUR_MS = 3_600_000
+
+
+def _bars(start: int, stop: int):
+    times = np.arange(start, stop, dtype=np.int64) * HOUR_MS
+    values = np.column_stack([times / HOUR_MS + k for k in range(5)]).astype(np.float64)
+    return times, values
+
+
+def test_prepend_swaps_generation(tmp_path):
+    history = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    history.append(*_bars(10, 20))
+    history.prepend(*_bars(0, 15))
+
+    assert len(history) == 20
+    times, values = history.arrays(100)
+    np.testing.assert_array_equal(times, _bars(0, 20)[0])
+    np.testing.assert_array_equal(values, _bars(0, 20)[1])
+
+    with open(os.path.join(history.path, "CURRENT")) as f:
+        assert f.read() == "g1"
+    assert sorted(n for n in os.listdir(history.path) if n.startswith("g")) == ["g1"]
+
+    reopened = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    np.testing.assert_array_equal(reopened.arrays(5)[0], _bars(15, 20)[0])
+
+
+def test_torn_append_is_truncated_on_recovery(tmp_path):
+    history = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    history.append(*_bars(0, 10))
+    # A crash mid-append: two value columns got a row, open_time did not.
+    for name in ("open", "high"):
+        with open(os.path.join(history.path, "g0", f"{name}.bin"), "ab") as f:
+            f.write(np.float64(1.0).tobytes())
+
+    reopened = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    assert len(reopened) == 10
+    assert os.path.getsize(os.path.join(reopened.path, "g0", "open.bin")) == 10 * 8
+    reopened.append(*_bars(10, 12))
+    np.testing.assert_array_equal(reopened.arrays(12)[1], _bars(0, 12)[1])
+
+
+def test_interrupted_first_backfill_keeps_original_generation(tmp_path):
+    history = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    history.append(*_bars(10, 20))
+    # A backfill that died before CURRENT was written leaves a partial g1.
+    os.makedirs(os.path.join(history.path, "g1"))
+    with open(os.path.join(history.path, "g1", "open.bin"), "wb") as f:
+        f.write(b"\0" * 24)
+
+    reopened = KlineHistory(str(tmp_path), "BTCUSDT", "1h")
+    assert not os.path.exists(os.path.join(reopened.path, "g1"))
+    np.testing.assert_array_equal(reopened.arrays(100)[0], _bars(10, 20)[0])
+
+
+class _FakeApi:
+    # Binance /klines over a listing that starts at LISTED and runs to now.
+    LISTED = 100
+    calls = []
+
+    def __init__(self, symbol, interval, limit):
+        self.limit = limit
+
+    async def load_kline_arrays(self, start_time=None, end_time=None):
+        _FakeApi.calls.append((start_time, end_time))
+        now = int(time.time() * 1000) // HOUR_MS + 1
+        times, values = _bars(self.LISTED, now)
+        if start_time is not None:
+            keep = times >= start_time
+            return times[keep][:self.limit], values[keep][:self.limit]
+        keep = times <= end_time
+        return times[keep][-self.limit:], values[keep][-self.limit:]
+
+
+@pytest.fixture
+def fake_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_history, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(kline_history, "_histories", type(kline_history._histories)())
+    monkeypatch.setattr(kline_history, "AsyncBinanceApi", _FakeApi)
+    _FakeApi.calls = []
+    return _FakeApi
+
+
+def test_start_marker_stops_further_backfill(fake_api):
+    listed = int(time.time() * 1000) // HOUR_MS + 1 - 1500
+    fake_api.LISTED = listed
+
+    times, values = asyncio.run(load_history_arrays_async("BTCUSDT", "1h", 5000))
+    # Everything since the listing, the open candle last.
+    assert len(times) == 1500
+    assert times[0] == listed * HOUR_MS
+    history = kline_history.get_history("BTCUSDT", "1h")
+    assert history.start_reached
+    assert len(history) == 1499
+
+    fake_api.calls = []
+    times, _ = asyncio.run(load_history_arrays_async("BTCUSDT", "1h", 5000))
+    assert len(times) == 1500
+    # Only the forward refresh; no page is requested before the listing.
+    assert all(end is None for _, end in fake_api.calls)
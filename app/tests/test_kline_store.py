@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytic import IndicatorEngine, IndicatorFrame
+from services.kline_store import KlineStore
+
+HOUR_MS = 3_600_000
+
+
+def _candles(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, n))
+    volume = rng.uniform(1, 10, n)
+    times = np.arange(n, dtype=np.int64) * HOUR_MS
+    return times, np.column_stack([open_, high, low, close, volume])
+
+
+ROLLING = ("ma20", "ma50", "ma200", "rsi14", "atr14")
+EMAS = ("macd", "macd_signal", "macd_hist")
+
+
+def _last(df: pd.DataFrame, names) -> dict:
+    frame = IndicatorFrame(df.copy())
+    return {name: frame.last(name) for name in names}
+
+
+def _series(times: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    index = pd.DatetimeIndex(times.view("datetime64[ms]"), name="time")
+    return pd.DataFrame(values, index=index, columns=["open", "high", "low", "close", "volume"])
+
+
+@pytest.mark.parametrize("limit", [100, 250, 500])
+def test_streamed_indicators_match_batch(limit):
+    # A capacity below the series length makes the store compact while the
+    # engine keeps streaming.
+    times, values = _candles(limit + 400)
+    store = KlineStore("BTCUSDT", "1h", capacity=limit + 50)
+    store.reset(times[:limit], values[:limit])
+    store.snapshot(limit)
+
+    for i in range(limit, len(times)):
+        revised = values[i].copy()
+        revised[3] *= 1.001
+        # A new candle opens, then the open candle is revised in place.
+        for bar in (revised, values[i]):
+            store.merge(times[i:i + 1], bar[None, :])
+            df, streamed = store.snapshot(limit)
+            assert len(df) == limit
+
+            series = np.vstack([values[:i], bar[None, :]])
+            expected = _last(df, ROLLING)
+            expected.update(_last(_series(times[:i + 1], series), EMAS))
+            for name in ROLLING + EMAS:
+                assert getattr(streamed, name) == pytest.approx(expected[name], rel=1e-9, nan_ok=True), (i, name)
+
+
+def test_engine_is_fed_not_reseeded(monkeypatch):
+    times, values = _candles(300)
+    store = KlineStore("BTCUSDT", "1h", capacity=1000)
+    store.reset(times[:200], values[:200])
+    store.snapshot(200)
+
+    monkeypatch.setattr(IndicatorEngine, "from_frame", None)
+    for i in range(200, 300):
+        store.merge(times[i:i + 1], values[i:i + 1])
+        store.snapshot(200)
+
+
+def test_frames_handed_out_are_never_mutated():
+    times, values = _candles(60)
+    store = KlineStore("BTCUSDT", "1h", capacity=50)
+    store.reset(times[:40], values[:40])
+    before = store.frame(40)
+    expected = before.to_numpy().copy()
+
+    revised = values[39].copy()
+    revised[3] = 999.0
+    store.merge(times[39:40], revised[None, :])
+    assert store.frame(1)["close"].iloc[-1] == 999.0
+    store.merge(times[40:60], values[40:60])
+
+    np.testing.assert_array_equal(before.to_numpy(), expected)
+    assert before.index[-1] == pd.Timestamp(times[39], unit="ms")
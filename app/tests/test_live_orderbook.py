@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from services.live_orderbook import LiveOrderBook, ReplayDepthSource, _BookSide
+
+
+def _event(first_id, final_id, bids=(), asks=()):
+    return {"e": "depthUpdate", "U": first_id, "u": final_id,
+            "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks]}
+
+
+def _snapshot(update_id, bids, asks):
+    return {"lastUpdateId": update_id,
+            "bids": [[str(p), str(q)] for p, q in bids], "asks": [[str(p), str(q)] for p, q in asks]}
+
+
+def _replay(tmp_path, snapshots, events) -> LiveOrderBook:
+    path = tmp_path / "depth.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in events), encoding="utf-8")
+    pending = list(snapshots)
+
+    async def load_snapshot():
+        return pending.pop(0)
+
+    book = LiveOrderBook("BTCUSDT", ReplayDepthSource(str(path)), load_snapshot, resync_delay=0)
+    asyncio.run(book.run())
+    assert not pending, "every snapshot should have been used"
+    return book
+
+
+def _book(book: LiveOrderBook):
+    levels = book.levels()
+    return (list(zip(levels.bid_prices.tolist(), levels.bid_qty.tolist())),
+            list(zip(levels.ask_prices.tolist(), levels.ask_qty.tolist())))
+
+
+def test_replay_drops_stale_events_and_applies_the_rest(tmp_path):
+    book = _replay(tmp_path, [_snapshot(100, [(10, 1), (9, 2)], [(11, 1), (12, 3)])], [
+        # Already contained in the snapshot.
+        _event(90, 95, bids=[(10, 99)]),
+        _event(96, 100, asks=[(11, 99)]),
+        # First event straddles lastUpdateId + 1.
+        _event(99, 103, bids=[(10, 5)], asks=[(11, 0)]),
+        _event(104, 105, bids=[(9.5, 1)]),
+    ])
+
+    assert book.synced and book.resyncs == 0
+    assert book.last_update_id == 105
+    assert _book(book) == ([(10, 5), (9.5, 1), (9, 2)], [(12, 3)])
+
+
+def test_first_event_must_cover_the_snapshot(tmp_path):
+    book = _replay(tmp_path, [
+        _snapshot(100, [(10, 1)], [(11, 1)]),
+        _snapshot(110, [(10, 2)], [(11, 2)]),
+    ], [
+        # Starts past lastUpdateId + 1: update 101 was missed.
+        _event(102, 105, bids=[(10, 7)]),
+        _event(106, 110, bids=[(10, 8)]),
+        _event(111, 112, asks=[(11.5, 1)]),
+    ])
+
+    assert book.resyncs == 1
+    assert book.last_update_id == 112
+    assert _book(book) == ([(10, 2)], [(11, 2), (11.5, 1)])
+
+
+def test_gap_after_sync_triggers_resync(tmp_path):
+    book = _replay(tmp_path, [
+        _snapshot(100, [(10, 1)], [(11, 1)]),
+        _snapshot(106, [(10, 4)], [(11, 4)]),
+    ], [
+        _event(101, 103, bids=[(10, 2)]),
+        # 104 is missing.
+        _event(105, 106, bids=[(10, 3)]),
+        _event(107, 108, bids=[(9, 1)]),
+    ])
+
+    assert book.resyncs == 1
+    assert book.last_update_id == 108
+    assert _book(book) == ([(10, 4), (9, 1)], [(11, 4)])
+
+
+def test_zero_quantity_removes_level():
+    side = _BookSide()
+    side.reset([["1.0", "1"], ["2.0", "2"], ["3.0", "3"]])
+    side.apply([["2.0", "0"], ["4.0", "0"], ["3.0", "5"], ["3.0", "6"], ["0.5", "1"]])
+
+    assert side.prices.tolist() == [0.5, 1.0, 3.0]
+    assert side.qty.tolist() == [1.0, 1.0, 6.0]
+
+    side.apply([["0.5", "0"], ["1.0", "0"], ["3.0", "0"]])
+    assert side.prices.tolist() == [] and side.qty.tolist() == []
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from bot import outbox as outbox_module
+from bot.outbox import BULK, INTERACTIVE, Outbox, TokenBucket, split_message
+
+
+def test_split_keeps_lines_whole():
+    lines = [f"line {n:02d}" for n in range(10)]
+    chunks = split_message("\n".join(lines), limit=25)
+
+    assert all(len(chunk) <= 25 for chunk in chunks)
+    assert chunks[0] == "line 00\nline 01\nline 02"
+    assert "\n".join(chunks).split("\n") == lines
+
+
+def test_split_cuts_only_an_overlong_line():
+    text = "head\n" + "x" * 23 + "\ntail"
+    assert split_message(text, limit=10) == ["head", "x" * 10, "x" * 10, "xxx\ntail"]
+
+
+def test_bucket_wait_times(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(outbox_module.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert [bucket.take() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+    now[0] += 1.0
+    assert bucket.take() == 0.5
+
+    bucket.pause(3)
+    assert bucket.take() == 3.5
+    assert not bucket.idle()
+    now[0] += 10
+    assert bucket.idle()
+
+
+class _FakeBot:
+    def __init__(self, flood_once=()):
+        self.sent = []
+        self.flood_once = set(flood_once)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if text in self.flood_once:
+            self.flood_once.discard(text)
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "flood", retry_after=0)
+        await asyncio.sleep(0)
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture(autouse=True)
+def fast_chats(monkeypatch):
+    monkeypatch.setattr(outbox_module, "CHAT_RATE", 100.0)
+
+
+def _run(bot, scenario):
+    async def main():
+        box = Outbox()
+        runner = box.start(bot)
+        try:
+            await scenario(box)
+        finally:
+            runner.cancel()
+
+    asyncio.run(main())
+
+
+def test_interactive_goes_ahead_of_bulk():
+    bot = _FakeBot()
+
+    async def scenario(box):
+        futures = [f for chat in (1, 2, 3) for f in box.post(chat, f"bulk {chat}", BULK)]
+        futures += box.post(4, "reply", INTERACTIVE)
+        await asyncio.gather(*futures)
+
+    _run(bot, scenario)
+    assert bot.sent[0] == (4, "reply")
+    assert sorted(bot.sent[1:]) == [(1, "bulk 1"), (2, "bulk 2"), (3, "bulk 3")]
+
+
+def test_chat_order_survives_retry_after():
+    bot = _FakeBot(flood_once={"first"})
+
+    async def scenario(box):
+        futures = []
+        for text in ("first", "second", "third"):
+            futures += box.post(5, text, INTERACTIVE)
+        futures += box.post(6, "other", INTERACTIVE)
+        await asyncio.gather(*futures)
+
+    _run(bot, scenario)
+    assert [text for chat, text in bot.sent if chat == 5] == ["first", "second", "third"]
+    assert (6, "other") in bot.sent
@@ -0,0 +1,18 @@
+import time
+
+from services.report_cache import ReportCache, section_key
+
+
+def test_orderbook_depths_do_not_collide():
+    cache = ReportCache(max_entries=16)
+    shallow = section_key("orderbook", "BTCUSDT", "1h", 100, fetch_limit=100)
+    deep = section_key("orderbook", "BTCUSDT", "1h", 100, fetch_limit=500)
+    assert shallow != deep
+
+    cache.put(shallow, "100 levels", time.time() + 3)
+    assert cache.get(deep) is None
+    assert cache.get(shallow) == "100 levels"
+
+
+def test_orderbook_key_ignores_candles():
+    assert section_key("orderbook", "BTCUSDT", "1h", 100, 500) == section_key("orderbook", "BTCUSDT", "4h", 1000, 500)
@@ -0,0 +1,31 @@
+import asyncio
+
+from services.user_settings import SettingsStore, UserSettings
+
+
+def test_load_is_not_blocked_by_flush(tmp_path):
+    store = SettingsStore(str(tmp_path / "settings.sqlite3"))
+    store.mark_dirty(1, UserSettings("ETHUSDT", "4h", 200))
+    store.flush()
+    store._cache.clear()
+
+    async def load_during_flush():
+        # A flush holds the writer lock for its whole transaction.
+        with store._db_lock:
+            return await asyncio.wait_for(store.load(1), 5)
+
+    assert asyncio.run(load_during_flush()) == UserSettings("ETHUSDT", "4h", 200)
+    store.close()
+
+
+def test_change_stays_readable_until_flush_commits(tmp_path):
+    store = SettingsStore(str(tmp_path / "settings.sqlite3"), cache_size=1)
+    settings = store.get(1)
+    settings.symbol = "SOLUSDT"
+    store.mark_dirty(1, settings)
+    store.get(2)
+
+    # Evicted from the cache and taken out of _dirty by a flush in progress.
+    store._dirty, store._flushing = {}, {1: settings}
+    assert store.get(1).symbol == "SOLUSDT"
+    store.close()